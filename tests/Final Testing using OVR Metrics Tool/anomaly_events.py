@@ -0,0 +1,46 @@
+"""Anomaly events in OVR Metrics Tool exports.
+
+Runs the rolling-baseline detector (see anomaly_detection) over each run's
+frame rate, app GPU time and battery temperature, so sudden hitches stand
+out from a run's own normal level rather than from fixed thresholds that do
+not suit every scene.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import anomaly_detection
+
+ANOMALY_COLUMNS = ['average_frame_rate', 'app_gpu_time_microseconds', 'battery_temperature_celcius']
+
+def run_anomalies(df, group_col='Source_File'):
+    """Event table over every run, times in seconds since each export started."""
+    data = df[[group_col, 'Time Stamp', *[c for c in ANOMALY_COLUMNS if c in df.columns]]].copy()
+    data['Seconds'] = data['Time Stamp'].to_numpy(dtype=np.float64) / 1000
+    metrics = [c for c in ANOMALY_COLUMNS if c in data.columns]
+    return anomaly_detection.detect_anomalies(data, 'Seconds', metrics, group_col=group_col)
+
+def print_anomaly_report(events, labels=None, group_col='Source_File', limit=10):
+    """Prints event counts per run and metric, then each run's most severe events."""
+    print("\n" + "="*50)
+    print("--- ANOMALY EVENTS (ROLLING BASELINE) ---")
+    print("="*50)
+    if events.empty:
+        print("No anomalies detected.")
+        print("="*50)
+        return
+
+    counts = events.groupby([group_col, 'metric', 'severity'], observed=True).size().unstack(fill_value=0)
+    if labels:
+        counts.index = counts.index.map(lambda key: (labels.get(key[0], key[0]), key[1]))
+    counts.index.names = ['Run', 'Metric']
+    print(counts.to_string())
+
+    for name, run_events in events.groupby(group_col, observed=True):
+        label = labels.get(name, name) if labels else name
+        print(f"\n{label}, most severe:")
+        print(anomaly_detection.format_events(run_events.drop(columns=[group_col]), limit), end='')
+    print("="*50)
@@ -1,12 +1,33 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import parse_cache
+import html_report
+import anomaly_detection
+import stage_profiler
+from stage_profiler import stage
+import frame_pacing
+import scaling_analysis
+import cpu_cores
+import thermal_power
+import memory_growth
+import anomaly_events
+import gpu_bottleneck
 
 # --- Configuration ---
 CSV_FILES = [
     'NormalGameRun1.csv',
     'GameRun2 (5 Restaurants).csv',
-    'GameRun3(25 Restaurants).csv',
+    'GameRun3(25 restaurants).csv',
     'GameRun4(15 Restaurants).csv'
 ]
 
@@ -17,49 +38,272 @@ AVERAGE_METRICS = [
     'battery_temperature_celcius'
 ]
 
-# --- Helper Function for Data Preparation (Unchanged) ---
+# A mapping for clean console labels (optional, but helpful)
+LEGEND_MAPPING = {
+    'NormalGameRun1.csv': 'Game Run 1 (Normal)',
+    'GameRun2 (5 Restaurants).csv': 'Game Run 2 (5 Restaurants)',
+    'GameRun3(25 restaurants).csv': 'Game Run 3 (25 Restaurants)',
+    'GameRun4(15 Restaurants).csv': 'Game Run 4 (15 Restaurants)',
+}
 
-def load_and_merge_data(file_list):
-    """Loads CSV data, converts 'Time Stamp' (ms) to 'Time (Minutes)', and merges."""
-    all_data = []
+# Interactive HTML report panels: (title, unit, column), one series per run
+HTML_PANELS = [
+    ('Frame Rate', 'FPS', 'average_frame_rate'),
+    ('App GPU Time', 'µs', 'app_gpu_time_microseconds'),
+    ('CPU Utilisation', '%', 'cpu_utilization_percentage'),
+    ('GPU Utilisation', '%', 'gpu_utilization_percentage'),
+    ('Battery Temperature', '°C', 'battery_temperature_celcius'),
+    ('Battery Level', '%', 'battery_level_percentage'),
+    ('App PSS', 'MB', 'app_pss_MB'),
+    ('Available Memory', 'MB', 'available_memory_MB'),
+]
+
+# Parsed runs are cached here; bump OVR_CACHE_KIND when the parser output changes
+CACHE_DIR = parse_cache.DEFAULT_CACHE_DIR
+OVR_CACHE_KIND = 'ovr-v2'
+
+# Compact dtypes for the OVR Metrics export columns. Counters and levels use the
+# smallest integer type that holds their expected range (levels, percentages,
+# clocks in MHz and eye buffer sizes fit int16; memory in MB, currents, power
+# and GPU times in µs need int32); anything that may carry a decimal comma is
+# read as float32. Integer columns are checked after reading (see
+# compact_integer_columns), so a value outside the range widens the column
+# rather than wrapping around.
+OVR_COLUMN_DTYPES = {
+    'Time Stamp': 'int64',
+    'Time (Seconds)': 'float32',
+    'available_memory_MB': 'int32',
+    'app_pss_MB': 'int32',
+    'battery_level_percentage': 'int16',
+    'battery_temperature_celcius': 'float32',
+    'battery_current_now_milliamps': 'int32',
+    'sensor_temperature_celcius': 'float32',
+    'power_current': 'int32',
+    'power_level_state': 'int16',
+    'power_voltage': 'int32',
+    'power_wattage': 'int32',
+    'cpu_level': 'int16',
+    'gpu_level': 'int16',
+    'cpu_frequency_MHz': 'int16',
+    'gpu_frequency_MHz': 'int16',
+    'mem_frequency_MHz': 'int16',
+    'minimum_vsyncs': 'int16',
+    'extra_latency_mode': 'int16',
+    'phase_sync_mode': 'int16',
+    'average_frame_rate': 'float32',
+    'display_refresh_rate': 'float32',
+    'average_prediction_milliseconds': 'float32',
+    'screen_tear_count': 'int16',
+    'early_frame_count': 'int16',
+    'stale_frame_count': 'int16',
+    'maximum_rotational_speed_degrees_per_second': 'float32',
+    'foveation_level': 'int16',
+    'eye_buffer_width': 'int16',
+    'eye_buffer_height': 'int16',
+    'app_gpu_time_microseconds': 'int32',
+    'timewarp_gpu_time_microseconds': 'int32',
+    'guardian_gpu_time_microseconds': 'int32',
+    'cpu_utilization_percentage': 'float32',
+    **{f'cpu_utilization_percentage_core{i}': 'float32' for i in range(8)},
+    'gpu_utilization_percentage': 'float32',
+    'spacewarp_motion_vector_type': 'int16',
+    'spacewarped_frames_per_second': 'float32',
+    'app_vss_MB': 'int32',
+    'app_rss_MB': 'int32',
+    'app_dalvik_pss_MB': 'int32',
+    'app_private_dirty_MB': 'int32',
+    'app_private_clean_MB': 'int32',
+    'app_uss_MB': 'int32',
+    'stale_frames_consecutive': 'int16',
+    'max_repeated_frames': 'int16',
+    'avg_vertices_per_frame': 'float32',
+    'avg_fill_percentage': 'float32',
+    'avg_inst_per_frag': 'float32',
+    'avg_inst_per_vert': 'float32',
+    'avg_frag_inst_per_pixel': 'float32',
+    'avg_vert_inst_per_pixel': 'float32',
+    'avg_textures_per_frag': 'float32',
+    'percent_time_shading_frags': 'float32',
+    'percent_time_shading_verts': 'float32',
+    'percent_time_compute': 'float32',
+    'percent_vertex_fetch_stall': 'float32',
+    'percent_texture_fetch_stall': 'float32',
+    'percent_texture_l1_miss': 'float32',
+    'percent_texture_l2_miss': 'float32',
+    'percent_texture_nearest_filtered': 'float32',
+    'percent_texture_linear_filtered': 'float32',
+    'percent_texture_anisotropic_filtered': 'float32',
+    'vrshell_average_frame_rate': 'float32',
+    'vrshell_gpu_time_microseconds': 'int32',
+    'vrshell_and_guardian_gpu_time_microseconds': 'int32',
+    'render_scale': 'int16',
+    'dynres_recommendation_percentage': 'float32',
+    'dynres_recommendation_width': 'int16',
+    'dynres_recommendation_height': 'int16',
+}
+
+# --- Helper Functions for Data Preparation ---
+
+def clean_column_name(name):
+    """Strips whitespace and a UTF-8 BOM from an OVR Metrics header."""
+    return name.lstrip('\ufeff').strip()
+
+def compact_integer_columns(df):
+    """Narrow the integer columns of OVR_COLUMN_DTYPES, read as float64, in place.
+
+    A column takes its listed dtype, or the next wider integer type if its
+    values do not fit. A column holding blanks stays floating point: float32,
+    or float64 for 'Time Stamp'.
+    """
+    for column, dtype in OVR_COLUMN_DTYPES.items():
+        if column not in df.columns or not np.issubdtype(np.dtype(dtype), np.integer):
+            continue
+        values = df[column].to_numpy()
+        if np.isnan(values).any():
+            df[column] = values.astype(np.float64 if column == 'Time Stamp' else np.float32)
+            continue
+        low, high = (values.min(), values.max()) if len(values) else (0, 0)
+        for candidate in dict.fromkeys([dtype, 'int32', 'int64']):
+            info = np.iinfo(candidate)
+            if info.min <= low and high <= info.max and np.dtype(candidate).itemsize >= np.dtype(dtype).itemsize:
+                df[column] = values.astype(candidate)
+                break
+    return df
+
+def read_ovr_csv(file_path, metrics=None):
+    """Reads one OVR Metrics export with compact dtypes.
+    
+    If `metrics` is given, only 'Time Stamp' and those columns are parsed.
+    Integer columns are parsed as float64 and narrowed afterwards by
+    compact_integer_columns, so a column holding blanks stays float32 while
+    the others keep their integer dtypes, in a single pass over the file.
+    """
+    wanted = None if metrics is None else {'Time Stamp', *metrics}
+    usecols = None if wanted is None else (lambda c: clean_column_name(c) in wanted)
+    dtypes = {column: 'float64' if np.issubdtype(np.dtype(dtype), np.integer) else dtype
+              for column, dtype in OVR_COLUMN_DTYPES.items()}
+    
+    with stage(f'read {os.path.basename(file_path)}'):
+        df = pd.read_csv(
+            file_path,
+            delimiter=';',
+            decimal=',',
+            usecols=usecols,
+            dtype=dtypes
+        )
+    
+    df.columns = [clean_column_name(c) for c in df.columns]
+    return compact_integer_columns(df)
+
+def parse_ovr_run(file_path, metrics=None):
+    """Parses one OVR Metrics export and adds 'Time (Minutes)' from 'Time Stamp' (ms)."""
+    df = read_ovr_csv(file_path, metrics)
+    
+    if 'Time (Seconds)' in df.columns:
+        df = df.drop(columns=['Time (Seconds)'])
+        
+    df['Time (Minutes)'] = df['Time Stamp'] / 1000 / 60
+    return df
+
+def load_ovr_run(file_path, metrics=None, cache_dir=None):
+    """Loads one parsed run, going through the columnar parse cache if `cache_dir` is set.
+    
+    The cache always holds the full export, so any metric subset can be
+    memory-mapped from the same entry.
+    """
+    if cache_dir is None:
+        return parse_ovr_run(file_path, metrics)
+    
+    columns = None if metrics is None else ['Time Stamp', *metrics, 'Time (Minutes)']
+    df, _ = parse_cache.cached_parse(
+        file_path, OVR_CACHE_KIND,
+        lambda path: (parse_ovr_run(path), {}),
+        cache_dir, columns
+    )
+    return df
+
+def timed_load_ovr_run(file_path, metrics=None, cache_dir=None):
+    """Loads one run and reports how long it took. Top-level so worker processes can pickle it."""
+    start = time.perf_counter()
+    df = load_ovr_run(file_path, metrics, cache_dir)
+    return file_path, df, time.perf_counter() - start
+
+def iter_runs_parallel(file_list, metrics=None, cache_dir=None, workers=None):
+    """Parses runs across a process pool, yielding (file_path, df, seconds) as each finishes.
+    
+    Files that fail to load are reported and skipped.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(timed_load_ovr_run, file_path, metrics, cache_dir): file_path
+            for file_path in file_list
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"Error loading {futures[future]}: {e}")
 
+def run_labels(file_list):
+    """'Source_File' label of every path: its file name, suffixed with the parent
+    directory (or, failing that, replaced by the full path) where names collide."""
+    names = Counter(os.path.basename(file_path) for file_path in file_list)
+    labels = {}
     for file_path in file_list:
-        try:
-            if not os.path.exists(file_path):
-                continue
-                
-            df = pd.read_csv(
-                file_path,
-                delimiter=';',
-                decimal=','
-            )
-            
-            df.columns = df.columns.str.strip()
-            if df.columns[0].startswith('\ufeff'):
-                df.columns.values[0] = df.columns[0].lstrip('\ufeff').strip()
-            
-            if 'Time (Seconds)' in df.columns:
-                df = df.drop(columns=['Time (Seconds)'])
-                
-            df['Time Stamp'] = pd.to_numeric(df['Time Stamp'], errors='coerce')
-            df['Time (Minutes)'] = df['Time Stamp'] / 1000 / 60
-            
-            df['Source_File'] = os.path.basename(file_path)
-            all_data.append(df)
+        name = os.path.basename(file_path)
+        if names[name] > 1:
+            name = f"{name} ({os.path.basename(os.path.dirname(os.path.abspath(file_path)))})"
+        labels[file_path] = name
+    repeated = Counter(labels.values())
+    return {file_path: os.path.abspath(file_path) if repeated[label] > 1 else label
+            for file_path, label in labels.items()}
 
-        except Exception as e:
-            print(f"Error loading {file_path}: {e}")
-            pass 
+def load_and_merge_data(file_list, metrics=None, cache_dir=None, workers=None):
+    """Loads CSV data, converts 'Time Stamp' (ms) to 'Time (Minutes)', and merges.
+    
+    Pass `metrics` to read only those columns instead of the full export, and
+    `cache_dir` to reuse previously parsed runs. With `workers` set, files are
+    parsed in that many worker processes and per-file timings are printed.
+    'Source_File' is categorical, in the order of `file_list`, labelled by
+    run_labels; a path listed more than once is loaded once.
+    """
+    unique = {}
+    for file_path in file_list:
+        unique.setdefault(os.path.abspath(file_path), file_path)
+    file_list = list(unique.values())
+    missing = [file_path for file_path in file_list if not os.path.exists(file_path)]
+    for file_path in missing:
+        print(f"Warning: {file_path} not found, skipping.")
+    file_list = [file_path for file_path in file_list if file_path not in missing]
+    loaded = {}
+
+    if workers:
+        for file_path, df, elapsed in iter_runs_parallel(file_list, metrics, cache_dir, workers):
+            print(f"  Parsed {os.path.basename(file_path)}: {len(df)} rows in {elapsed:.3f}s")
+            loaded[file_path] = df
+    else:
+        for file_path in file_list:
+            try:
+                loaded[file_path] = load_ovr_run(file_path, metrics, cache_dir)
+            except Exception as e:
+                print(f"Error loading {file_path}: {e}")
+                pass 
 
-    if not all_data:
+    if not loaded:
         raise ValueError("No valid CSV files were loaded.")
 
+    # Tag every run with the same categories so the concat stays categorical
+    ordered = [file_path for file_path in file_list if file_path in loaded]
+    labels = run_labels(ordered)
+    names = [labels[file_path] for file_path in ordered]
+    all_data = []
+    for code, file_path in enumerate(ordered):
+        df = loaded.pop(file_path)
+        df['Source_File'] = pd.Categorical.from_codes(np.full(len(df), code), categories=names)
+        all_data.append(df)
+
     merged_df = pd.concat(all_data, ignore_index=True)
     
-    for col in merged_df.columns:
-        if col not in ['Source_File', 'Time (Minutes)', 'Time Stamp'] and merged_df[col].dtype != object:
-             merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce')
-    
     return merged_df
 
 # --- Calculation Function ---
@@ -75,18 +319,10 @@ def calculate_and_print_averages(df, metrics):
     calc_df = df[['Source_File'] + [m for m in metrics if m in df.columns]]
 
     # 2. Group the data by source file and calculate the mean for each metric
-    average_results = calc_df.groupby('Source_File')[metrics].mean()
+    average_results = calc_df.groupby('Source_File', observed=True)[metrics].mean()
     
     # --- Formatting Output ---
     
-    # A mapping for clean console labels (optional, but helpful)
-    LEGEND_MAPPING = {
-        'NormalGameRun1.csv': 'Game Run 1 (Normal)',
-        'GameRun2 (5 Restaurants).csv': 'Game Run 2 (5 Restaurants)',
-        'GameRun3(25 Restaurants).csv': 'Game Run 3 (25 Restaurants)',
-        'GameRun4(15 Restaurants).csv': 'Game Run 4 (15 Restaurants)',
-    }
-    
     # Rename index for better display
     average_results.index = average_results.index.map(lambda x: LEGEND_MAPPING.get(x, x))
     
@@ -101,21 +337,227 @@ def calculate_and_print_averages(df, metrics):
     print(average_results.to_string(float_format="%.2f"))
     print("="*50)
 
+def create_html_report(df, output_path, sections=(), events=None):
+    """Writes an interactive HTML report with one zoomable chart per HTML_PANELS metric.
+    
+    Runs are overlaid on a shared time axis (seconds since each run started);
+    anomaly `events` from anomaly_events.run_anomalies are shaded on their
+    run's series. Returns the file size.
+    """
+    runs = list(df.groupby('Source_File', observed=True))
+    panels = []
+    for title, unit, column in HTML_PANELS:
+        if column not in df.columns:
+            continue
+        series = []
+        for source_file, run in runs:
+            stamp = run['Time Stamp'].to_numpy(dtype=np.float64)
+            run_events = [] if events is None else events[(events['Source_File'] == source_file)
+                                                          & (events['metric'] == column)]
+            series.append({
+                'label': LEGEND_MAPPING.get(source_file, source_file),
+                'x': (stamp - stamp.min()) / 1000,
+                'y': run[column].to_numpy(),
+                'events': [] if events is None else zip(run_events['start_s'] - stamp.min() / 1000,
+                                                        run_events['end_s'] - stamp.min() / 1000,
+                                                        run_events['severity']),
+            })
+        panels.append({'title': title, 'unit': unit, 'series': series})
+    
+    return html_report.write_report(output_path, 'OVR Metrics Game Runs', panels, sections,
+                                    subtitle=', '.join(LEGEND_MAPPING.get(name, name) for name, _ in runs))
+
 # --- Main Execution ---
 
 if __name__ == "__main__":
-    print("Loading files...")
+    parser = argparse.ArgumentParser(description="Summarise OVR Metrics Tool exports.")
+    parser.add_argument('files', nargs='*', default=CSV_FILES,
+                        help="OVR Metrics CSV exports (default: the built-in game runs)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="parse files in this many worker processes")
+    parser.add_argument('--scaling', action='store_true',
+                        help="fit performance against scenario load (restaurant count)")
+    parser.add_argument('--manifest', default=scaling_analysis.DEFAULT_MANIFEST,
+                        help="JSON mapping export filenames to their load, for --scaling")
+    parser.add_argument('--cores', action='store_true',
+                        help="per-core CPU saturation analysis with a heatmap per run")
+    parser.add_argument('--saturation', type=float, default=cpu_cores.SATURATION_PCT,
+                        help="core utilisation (%%) counted as saturated, for --cores")
+    parser.add_argument('--heatmap-dir', default='.',
+                        help="where --cores writes the per-run heatmaps")
+    parser.add_argument('--thermal', action='store_true',
+                        help="fit battery drain and heating and project a fixed-length session")
+    parser.add_argument('--session-minutes', type=float, default=thermal_power.thermal_model.SESSION_MINUTES,
+                        help="session length projected by --thermal and --memory")
+    parser.add_argument('--thermal-limit', type=float, default=thermal_power.thermal_model.THERMAL_LIMIT_C,
+                        help="temperature (°C) a session must stay below, for --thermal")
+    parser.add_argument('--memory', action='store_true',
+                        help="detect memory growth and project PSS against a budget")
+    parser.add_argument('--pss-budget', type=float, default=memory_growth.PSS_BUDGET_MB,
+                        help="PSS (MB) a session must stay below, for --memory")
+    parser.add_argument('--gpu-bottleneck', action='store_true',
+                        help="classify time windows as CPU-, fragment-, vertex- or texture-bound")
+    parser.add_argument('--gpu-bottleneck-window', type=float, default=gpu_bottleneck.WINDOW_S,
+                        help="window length (s) classified by --gpu-bottleneck")
+    parser.add_argument('--anomalies', action='store_true',
+                        help="detect FPS, GPU time and temperature anomalies against each run's rolling baseline")
+    parser.add_argument('--config-impact', action='store_true',
+                        help="compare rendering settings (foveation, spacewarp, eye buffer, clock levels) "
+                             "on frame time, GPU time, power and temperature")
+    parser.add_argument('--html', default=None, metavar='PATH',
+                        help="also write an interactive HTML report of every run to PATH")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every pipeline stage and write the breakdown to --profile-output")
+    parser.add_argument('--profile-output', default='ovr_profile',
+                        help="--profile writes <prefix>.json (and <prefix>.trace.json with --chrome-trace)")
+    parser.add_argument('--chrome-trace', action='store_true',
+                        help="--profile also writes a Chrome trace-event file")
+    parser.add_argument('--pstats-dir', default=None,
+                        help="--profile also dumps a cProfile stats file per stage here")
+    args = parser.parse_args()
+
+    profiler = stage_profiler.StageProfiler(pstats_dir=args.pstats_dir) if args.profile else None
+    merged_data = None
+    with profiler.activate() if profiler else contextlib.nullcontext():
+        print("Loading files...")
     
-    try:
-        merged_data = load_and_merge_data(CSV_FILES)
+        try:
+            needed = AVERAGE_METRICS + frame_pacing.PACING_COLUMNS
+            if args.scaling:
+                needed += scaling_analysis.SCALING_METRICS
+            if args.cores:
+                needed += cpu_cores.CORE_ANALYSIS_COLUMNS
+            if args.thermal:
+                needed += thermal_power.THERMAL_COLUMNS
+            if args.memory:
+                needed += memory_growth.MEMORY_COLUMNS
+            if args.anomalies:
+                needed += anomaly_events.ANOMALY_COLUMNS
+            if args.gpu_bottleneck:
+                needed += gpu_bottleneck.BOTTLENECK_COLUMNS
+            if args.config_impact:
+                # Imported here: config_impact uses perf_gate, which imports this module
+                import config_impact
+                needed += config_impact.CONFIG_IMPACT_COLUMNS
+            if args.html:
+                needed += [column for _, _, column in HTML_PANELS]
+            needed = list(dict.fromkeys(needed))
+            with stage('load'):
+                merged_data = load_and_merge_data(args.files, metrics=needed,
+                                                  cache_dir=CACHE_DIR, workers=args.workers)
 
-        # ----------------------------------------------------
-        # 1. CALCULATE AND PRINT AVERAGES
-        # ----------------------------------------------------
-        calculate_and_print_averages(merged_data, AVERAGE_METRICS)
+            # ----------------------------------------------------
+            # 1. CALCULATE AND PRINT AVERAGES
+            # ----------------------------------------------------
+            with stage('averages'):
+                calculate_and_print_averages(merged_data, AVERAGE_METRICS)
+
+            # ----------------------------------------------------
+            # 2. FRAME PACING (PERCENTILES, 1% LOWS, STUTTERS)
+            # ----------------------------------------------------
+            with stage('frame pacing'):
+                pacing = frame_pacing.frame_pacing_summary(merged_data)
+                frame_pacing.print_frame_pacing(pacing, LEGEND_MAPPING)
+
+            # ----------------------------------------------------
+            # 3. SCALABILITY AGAINST SCENARIO LOAD (OPTIONAL)
+            # ----------------------------------------------------
+            if args.scaling:
+                with stage('scaling'):
+                    manifest = scaling_analysis.load_manifest(args.manifest)
+                    scaling_analysis.print_scaling_report(*scaling_analysis.scaling_report(merged_data, manifest))
+
+            events = None
+            if args.anomalies:
+                with stage('anomaly detection'):
+                    events = anomaly_events.run_anomalies(merged_data)
+
+            # ----------------------------------------------------
+            # 4. PER-CORE CPU SATURATION (OPTIONAL)
+            # ----------------------------------------------------
+            if args.cores:
+                with stage('per-core CPU'):
+                    runs, per_core = cpu_cores.core_summary(merged_data, threshold=args.saturation)
+                    cpu_cores.print_core_report(runs, per_core, LEGEND_MAPPING, args.saturation)
+                    os.makedirs(args.heatmap_dir, exist_ok=True)
+                    for source_file, run in merged_data.groupby('Source_File', observed=True):
+                        stem = os.path.splitext(source_file)[0].replace(' ', '_')
+                        output_path = os.path.join(args.heatmap_dir, f"core_heatmap_{stem}.png")
+                        run_events = None if events is None else events[events['Source_File'] == source_file]
+                        cpu_cores.plot_core_heatmap(run, output_path, LEGEND_MAPPING.get(source_file, source_file),
+                                                    args.saturation, events=run_events)
+                        print(f"Heatmap saved to: {output_path}")
+
+            # ----------------------------------------------------
+            # 5. THERMAL & BATTERY SESSION PROJECTION (OPTIONAL)
+            # ----------------------------------------------------
+            if args.thermal:
+                with stage('thermal projection'):
+                    runs, throttles = thermal_power.thermal_summary(merged_data, session_minutes=args.session_minutes,
+                                                                    thermal_limit=args.thermal_limit)
+                    thermal_power.print_thermal_report(runs, throttles, LEGEND_MAPPING, args.session_minutes,
+                                                       args.thermal_limit)
+
+            # ----------------------------------------------------
+            # 6. MEMORY GROWTH / LEAK DETECTION (OPTIONAL)
+            # ----------------------------------------------------
+            if args.memory:
+                with stage('memory growth'):
+                    trends = memory_growth.memory_trends(merged_data)
+                    projection = memory_growth.pss_projection(trends, budget=args.pss_budget,
+                                                              session_minutes=args.session_minutes)
+                    memory_growth.print_memory_report(trends, projection, LEGEND_MAPPING, args.pss_budget,
+                                                      args.session_minutes)
+
+            # ----------------------------------------------------
+            # 7. ANOMALY EVENTS (OPTIONAL)
+            # ----------------------------------------------------
+            if args.anomalies:
+                anomaly_events.print_anomaly_report(events, LEGEND_MAPPING)
+
+            # ----------------------------------------------------
+            # 8. GPU BOTTLENECK CLASSIFICATION (OPTIONAL)
+            # ----------------------------------------------------
+            if args.gpu_bottleneck:
+                with stage('bottleneck classification'):
+                    _, runs, scenarios = gpu_bottleneck.bottleneck_summary(
+                        merged_data, window_s=args.gpu_bottleneck_window,
+                        manifest=scaling_analysis.load_manifest(args.manifest))
+                    gpu_bottleneck.print_bottleneck_report(runs, scenarios, LEGEND_MAPPING)
+
+            # ----------------------------------------------------
+            # 9. RENDERING CONFIGURATION IMPACT (OPTIONAL)
+            # ----------------------------------------------------
+            if args.config_impact:
+                with stage('config impact'):
+                    table, effects, constant = config_impact.config_impact(
+                        merged_data, manifest=scaling_analysis.load_manifest(args.manifest))
+                    config_impact.print_config_report(table, effects, constant)
+
+            # ----------------------------------------------------
+            # 10. INTERACTIVE HTML REPORT (OPTIONAL)
+            # ----------------------------------------------------
+            if args.html:
+                with stage('HTML report'):
+                    averages = merged_data.groupby('Source_File', observed=True)[AVERAGE_METRICS].mean()
+                    sections = [
+                        ('Average Metrics', averages.rename(index=LEGEND_MAPPING).to_string(float_format="%.2f")),
+                        ('Frame Pacing', pacing.rename(index=LEGEND_MAPPING).T.to_string(float_format="%.2f")),
+                    ]
+                    if events is not None:
+                        sections.append(('Anomaly Events', anomaly_detection.format_events(events, limit=20)))
+                    size = create_html_report(merged_data, args.html, sections, events)
+                print(f"\nInteractive report saved to: {args.html} ({size / 1024:.0f} KB)")
 
         
-    except ValueError as e:
-        print(f"\nFATAL ERROR: {e}")
-    except Exception as e:
-        print(f"\nAn unexpected error occurred: {e}")
\ No newline at end of file
+        except ValueError as e:
+            print(f"\nFATAL ERROR: {e}")
+        except Exception as e:
+            print(f"\nAn unexpected error occurred: {e}")
+
+    if profiler:
+        print("\nStage profile:")
+        print(profiler.format_table())
+        paths = profiler.write(args.profile_output, args.chrome_trace, script='auto_plot_metrics',
+                               inputs=args.files, rows=None if merged_data is None else len(merged_data))
+        print(f"Profile saved to: {', '.join(paths)}")
@@ -0,0 +1,183 @@
+"""Rendering-configuration impact analysis for OVR Metrics Tool exports.
+
+Groups samples by the rendering settings recorded in each export
+(foveation, spacewarp, eye buffer size, extra latency and phase sync modes,
+CPU/GPU clock levels). For every setting with more than one value it
+compares each value against the most common one on frame time, app GPU
+time, power and battery temperature, using perf_gate's median bootstrap
+confidence interval and Mann-Whitney U test.
+
+Comparisons are made within each scenario load (see scaling_analysis), so
+a setting used only in a heavier scene is not credited with that scene's
+cost. Samples are treated as independent; consecutive samples are
+correlated, so intervals from a single long run are optimistic and a
+setting is best judged from several runs per value.
+"""
+
+import numpy as np
+import pandas as pd
+
+from perf_gate import mann_whitney_u, bootstrap_median_change
+from scaling_analysis import scenario_load
+
+# Settings compared, in report order ('spacewarp' and 'eye_buffer' are derived)
+SETTINGS = ['foveation_level', 'spacewarp', 'eye_buffer', 'extra_latency_mode', 'phase_sync_mode',
+            'cpu_level', 'gpu_level']
+
+CONFIG_COLUMNS = [
+    'foveation_level',
+    'spacewarp_motion_vector_type',
+    'spacewarped_frames_per_second',
+    'eye_buffer_width',
+    'eye_buffer_height',
+    'extra_latency_mode',
+    'phase_sync_mode',
+    'cpu_level',
+    'gpu_level',
+]
+
+# Outcome: (source column, scale to the reported unit, unit)
+IMPACT_METRICS = {
+    'frame_time_ms': ('average_frame_rate', None, 'ms'),
+    'app_gpu_time_ms': ('app_gpu_time_microseconds', 1e-3, 'ms'),
+    'power_w': ('power_wattage', 1e-3, 'W'),
+    'temperature_c': ('battery_temperature_celcius', 1.0, '°C'),
+}
+
+# Columns needed by config_impact
+CONFIG_IMPACT_COLUMNS = CONFIG_COLUMNS + [source for source, _, _ in IMPACT_METRICS.values()]
+
+# A setting value needs this many samples in a scenario to be compared
+MIN_SAMPLES = 30
+DEFAULT_ALPHA = 0.05
+
+def config_frame(df, group_col='Source_File', manifest=None):
+    """One row per sample: its run, scenario load, settings and outcome metrics."""
+    frame = pd.DataFrame({group_col: df[group_col].astype(str)})
+    frame['load'] = frame[group_col].map({name: scenario_load(name, manifest) for name in frame[group_col].unique()})
+
+    for setting in ['foveation_level', 'extra_latency_mode', 'phase_sync_mode', 'cpu_level', 'gpu_level']:
+        if setting in df.columns:
+            frame[setting] = df[setting].astype('Int64').astype(str)
+    if {'spacewarp_motion_vector_type', 'spacewarped_frames_per_second'} <= set(df.columns):
+        active = df['spacewarped_frames_per_second'].astype(np.float64) > 0
+        frame['spacewarp'] = np.where(active, 'on (type ' + df['spacewarp_motion_vector_type'].astype(str) + ')', 'off')
+    if {'eye_buffer_width', 'eye_buffer_height'} <= set(df.columns):
+        frame['eye_buffer'] = df['eye_buffer_width'].astype(str) + 'x' + df['eye_buffer_height'].astype(str)
+
+    for metric, (source, scale, _) in IMPACT_METRICS.items():
+        if source not in df.columns:
+            continue
+        values = df[source].to_numpy(dtype=np.float64)
+        if scale is None:
+            with np.errstate(divide='ignore'):
+                values = np.where(values > 0, 1000 / values, np.nan)
+        else:
+            values = values * scale
+        frame[metric] = values
+    return frame
+
+def configurations(frame, group_col='Source_File'):
+    """Samples, runs and median outcomes of every distinct combination of settings."""
+    settings = [s for s in SETTINGS if s in frame.columns]
+    metrics = [m for m in IMPACT_METRICS if m in frame.columns]
+    grouped = frame.groupby(settings, observed=True, dropna=False)
+    table = grouped[metrics].median()
+    table.insert(0, 'runs', grouped[group_col].nunique())
+    table.insert(0, 'samples', grouped.size())
+    return table.sort_values('samples', ascending=False)
+
+def setting_effects(frame, min_samples=MIN_SAMPLES, alpha=DEFAULT_ALPHA):
+    """Effect of each setting value against the setting's most common value, per scenario load.
+
+    Returns (effects, constant): one effects row per (setting, value, load,
+    metric) with both medians, the relative change and its 95% CI, and the
+    p-value; and {setting: value} for settings that never change.
+    """
+    rows, constant = [], {}
+    metrics = [m for m in IMPACT_METRICS if m in frame.columns]
+    for setting in [s for s in SETTINGS if s in frame.columns]:
+        counts = frame[setting].value_counts()
+        if len(counts) == 1:
+            constant[setting] = counts.index[0]
+            continue
+        reference = counts.index[0]
+        for load, scene in frame.groupby('load', dropna=False):
+            by_value = scene.groupby(setting)
+            sizes = by_value.size()
+            if sizes.get(reference, 0) < min_samples:
+                continue
+            base = by_value.get_group(reference)
+            for value, size in sizes.items():
+                if value == reference or size < min_samples:
+                    continue
+                other = by_value.get_group(value)
+                for metric in metrics:
+                    a = base[metric].dropna().to_numpy()
+                    b = other[metric].dropna().to_numpy()
+                    if len(a) < min_samples or len(b) < min_samples:
+                        continue
+                    base_median, value_median = float(np.median(a)), float(np.median(b))
+                    ci_low, ci_high = bootstrap_median_change(a, b)
+                    _, p_value = mann_whitney_u(b, a)
+                    rows.append({
+                        'setting': setting,
+                        'value': value,
+                        'reference': reference,
+                        'load': load,
+                        'metric': metric,
+                        'samples': len(b),
+                        'reference_samples': len(a),
+                        'reference_median': base_median,
+                        'value_median': value_median,
+                        'change_pct': (value_median - base_median) / abs(base_median) * 100 if base_median else np.nan,
+                        'ci_low_pct': ci_low,
+                        'ci_high_pct': ci_high,
+                        'p_value': p_value,
+                        'significant': bool(p_value < alpha and (ci_low > 0 or ci_high < 0)),
+                    })
+    return pd.DataFrame(rows), constant
+
+def config_impact(df, group_col='Source_File', manifest=None, min_samples=MIN_SAMPLES, alpha=DEFAULT_ALPHA):
+    """Configuration table, setting effects and constant settings of the merged runs."""
+    frame = config_frame(df, group_col, manifest)
+    effects, constant = setting_effects(frame, min_samples, alpha)
+    return configurations(frame, group_col), effects, constant
+
+def print_config_report(table, effects, constant, min_samples=MIN_SAMPLES):
+    """Prints the configurations seen, each setting's effects and which settings could not be compared."""
+    print("\n" + "="*50)
+    print("--- RENDERING CONFIGURATION IMPACT ---")
+    print("="*50)
+    print("Configurations (median outcomes):")
+    print(table.reset_index().to_string(index=False, float_format="%.2f"))
+
+    if effects.empty:
+        print(f"\nNo setting has two values with at least {min_samples} samples in the same scenario.")
+    else:
+        print("\nEffect against each setting's most common value (95% bootstrap CI):")
+        for (setting, value, reference), rows in effects.groupby(['setting', 'value', 'reference'], sort=False):
+            print(f"\n{setting} = {value} vs {reference}:")
+            for _, r in rows.iterrows():
+                unit = IMPACT_METRICS[r['metric']][2]
+                ci = f"[{r['ci_low_pct']:+.1f}%, {r['ci_high_pct']:+.1f}%]"
+                flag = '*' if r['significant'] else ''
+                print(f"  load {r['load']:>4g}  {r['metric']:<16}{r['reference_median']:>9.2f} -> "
+                      f"{r['value_median']:>9.2f} {unit:<3}{r['change_pct']:>+8.1f}% {ci:>20}  "
+                      f"p={r['p_value']:.4f} {flag}")
+            # Every outcome here is lower-is-better, so a significant rise is worse
+            verdicts = []
+            for metric, metric_rows in rows.groupby('metric', sort=False):
+                significant = metric_rows[metric_rows['significant']]
+                worse, better = (significant['change_pct'] > 0).sum(), (significant['change_pct'] < 0).sum()
+                if worse or better:
+                    verdicts.append(f"{metric} {'worse' if worse >= better else 'better'} in "
+                                    f"{max(worse, better)}/{len(metric_rows)} scenario(s)")
+            print(f"  => {'; '.join(verdicts) if verdicts else 'no significant difference'}")
+        print("\n* significant: p below alpha and the CI excludes zero")
+
+    if constant:
+        print("\nConstant in every sample (record runs with other values to compare):")
+        for setting, value in constant.items():
+            print(f"  {setting}: {value}")
+    print("="*50)
@@ -0,0 +1,258 @@
+"""Per-core CPU analytics for OVR Metrics Tool exports.
+
+The aggregate `cpu_utilization_percentage` averages eight cores, so a main or
+render thread pinned to one core barely moves it. This module works on the
+`cpu_utilization_percentage_core0..7` columns as one (samples x cores) array:
+it flags saturated samples (any core at or above the saturation threshold),
+marks the "hidden" ones where the aggregate still looks fine, groups
+consecutive saturated samples into windows and relates them to drops in
+`average_frame_rate`. `plot_core_heatmap` draws the time x core heatmap with
+the frame rate underneath.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from frame_pacing import run_ids, sample_intervals
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import anomaly_detection
+
+CORE_PREFIX = 'cpu_utilization_percentage_core'
+CORE_COLUMNS = [f'{CORE_PREFIX}{i}' for i in range(8)]
+
+# Columns needed by core_summary and plot_core_heatmap
+CORE_ANALYSIS_COLUMNS = CORE_COLUMNS + [
+    'cpu_utilization_percentage',
+    'cpu_frequency_MHz',
+    'gpu_frequency_MHz',
+    'cpu_level',
+    'gpu_level',
+    'average_frame_rate',
+]
+
+# A core at or above this utilisation (%) counts as saturated
+SATURATION_PCT = 90.0
+
+# Saturation is "hidden" while the aggregate utilisation stays below this (%)
+AGGREGATE_OK_PCT = 60.0
+
+# A sample is an FPS drop below this fraction of its run's median FPS
+FPS_DROP_FRACTION = 0.9
+
+def core_columns(df):
+    """The per-core utilisation columns present in `df`, in core order."""
+    return [c for c in CORE_COLUMNS if c in df.columns]
+
+def core_number(column):
+    """Core index of a per-core utilisation column."""
+    return int(column[len(CORE_PREFIX):])
+
+def core_load(df, threshold=SATURATION_PCT):
+    """Per-sample view across the cores.
+
+    Returns a frame aligned with `df` holding the busiest core's index and
+    utilisation, the number of saturated cores, the spread between the
+    busiest and the mean core, and the `saturated` / `hidden_saturation`
+    flags.
+    """
+    columns = core_columns(df)
+    if not columns:
+        raise ValueError("No per-core CPU utilisation columns were loaded.")
+
+    cores = df[columns].to_numpy(dtype=np.float64)
+    filled = np.where(np.isnan(cores), -np.inf, cores)
+    busiest = filled.argmax(axis=1)
+    peak = cores[np.arange(len(cores)), busiest]
+
+    load = pd.DataFrame({
+        'busiest_core': np.array([core_number(c) for c in columns])[busiest],
+        'busiest_core_pct': peak,
+        'saturated_cores': (cores >= threshold).sum(axis=1),
+        'core_spread_pct': peak - np.nanmean(cores, axis=1),
+    }, index=df.index)
+    load['saturated'] = load['saturated_cores'] > 0
+
+    if 'cpu_utilization_percentage' in df.columns:
+        aggregate = df['cpu_utilization_percentage'].to_numpy(dtype=np.float64)
+    else:
+        aggregate = np.nanmean(cores, axis=1)
+    load['hidden_saturation'] = load['saturated'] & (aggregate < AGGREGATE_OK_PCT)
+    return load
+
+def fps_drops(df, group_col='Source_File', fraction=FPS_DROP_FRACTION):
+    """Boolean Series: samples whose FPS is below `fraction` of their run's median."""
+    fps = df['average_frame_rate'].astype(np.float64)
+    return fps < fps.groupby(df[group_col], observed=True).transform('median') * fraction
+
+def saturation_windows(df, load, group_col='Source_File'):
+    """One row per run of consecutive saturated samples.
+
+    Returns the run's group, first/last 'Time Stamp', sample count, duration,
+    the core saturated most often and its peak, mean FPS inside the window
+    and the share of its samples that were FPS drops.
+    """
+    window = run_ids(load['saturated'], df[group_col])
+    windows = pd.DataFrame({
+        group_col: df[group_col],
+        'window': window,
+        'Time Stamp': df['Time Stamp'],
+        'dt': sample_intervals(df, group_col),
+        'core': load['busiest_core'],
+        'peak': load['busiest_core_pct'],
+        'fps': df['average_frame_rate'].astype(np.float64),
+        'drop': fps_drops(df, group_col),
+    }).dropna(subset=['window'])
+
+    return windows.groupby('window').agg(
+        **{group_col: (group_col, 'first')},
+        start_ms=('Time Stamp', 'first'),
+        end_ms=('Time Stamp', 'last'),
+        samples=('fps', 'size'),
+        duration_s=('dt', 'sum'),
+        core=('core', lambda c: c.mode().iat[0]),
+        peak_pct=('peak', 'max'),
+        mean_fps=('fps', 'mean'),
+        drop_pct=('drop', lambda d: d.mean() * 100),
+    ).reset_index(drop=True)
+
+def core_summary(df, group_col='Source_File', threshold=SATURATION_PCT):
+    """Per-run core statistics and the saturation / FPS relationship.
+
+    Returns (runs, per_core): `runs` has one row per run, `per_core` one row
+    per run and core with its mean, P95 and time saturated.
+    """
+    df = df.reset_index(drop=True)
+    groups = df[group_col]
+    load = core_load(df, threshold)
+    columns = core_columns(df)
+
+    # Per-core table: stack the core columns into long form once
+    cores = df[columns].set_axis([core_number(c) for c in columns], axis=1)
+    long = cores.assign(**{group_col: groups}).melt(id_vars=group_col, var_name='core', value_name='pct')
+    by_core = long.groupby([group_col, 'core'], observed=True)['pct']
+    per_core = pd.DataFrame({
+        'mean_pct': by_core.mean(),
+        'p95_pct': by_core.quantile(0.95),
+        'saturated_pct': (long['pct'] >= threshold).groupby([long[group_col], long['core']], observed=True).mean() * 100,
+    })
+
+    fps = df['average_frame_rate'].astype(np.float64)
+    drop = fps_drops(df, group_col)
+    saturated = load['saturated']
+    by_run = load.groupby(groups, observed=True)
+
+    runs = pd.DataFrame({
+        'aggregate_cpu_pct': df['cpu_utilization_percentage'].astype(np.float64).groupby(groups, observed=True).mean()
+        if 'cpu_utilization_percentage' in df.columns else np.nan,
+        'busiest_core_mean_pct': by_run['busiest_core_pct'].mean(),
+        'core_spread_mean_pct': by_run['core_spread_pct'].mean(),
+        'dominant_core': by_run['busiest_core'].agg(lambda c: c.mode().iat[0]),
+        'saturated_pct': by_run['saturated'].mean() * 100,
+        'hidden_saturation_pct': by_run['hidden_saturation'].mean() * 100,
+    })
+
+    # Saturation vs. frame rate
+    runs['fps_saturated'] = fps.where(saturated).groupby(groups, observed=True).mean()
+    runs['fps_unsaturated'] = fps.where(~saturated).groupby(groups, observed=True).mean()
+    runs['drops_in_saturation_pct'] = ((drop & saturated).groupby(groups, observed=True).sum()
+                                       / drop.groupby(groups, observed=True).sum() * 100)
+    pair = pd.DataFrame({'peak': load['busiest_core_pct'], 'fps': fps, group_col: groups})
+    runs['corr_peak_core_fps'] = pair.groupby(group_col, observed=True)[['peak', 'fps']].corr().xs('peak', level=1)['fps']
+
+    # Whether the governor clocked up while a core was pinned
+    for column, name in (('cpu_frequency_MHz', 'cpu_mhz'), ('cpu_level', 'cpu_level')):
+        if column in df.columns:
+            values = df[column].astype(np.float64)
+            runs[f'{name}_saturated'] = values.where(saturated).groupby(groups, observed=True).mean()
+            runs[f'{name}_unsaturated'] = values.where(~saturated).groupby(groups, observed=True).mean()
+    for column, name in (('gpu_frequency_MHz', 'gpu_mhz'), ('gpu_level', 'gpu_level')):
+        if column in df.columns:
+            runs[f'{name}_mean'] = df[column].astype(np.float64).groupby(groups, observed=True).mean()
+
+    windows = saturation_windows(df, load, group_col)
+    by_window = windows.groupby(group_col, observed=True)
+    runs['saturation_windows'] = by_window.size()
+    runs['longest_window_s'] = by_window['duration_s'].max()
+    runs[['saturation_windows', 'longest_window_s']] = runs[['saturation_windows', 'longest_window_s']].fillna(0)
+
+    runs.index.name = group_col
+    return runs, per_core
+
+def plot_core_heatmap(df, output_path, title=None, threshold=SATURATION_PCT, dpi=150, events=None):
+    """Time x core utilisation heatmap of one run, with FPS and saturated samples underneath.
+
+    `events` (an anomaly_detection event table for this run) shades FPS anomalies.
+    """
+    columns = core_columns(df)
+    minutes = df['Time (Minutes)'].to_numpy(dtype=np.float64)
+    cores = df[columns].to_numpy(dtype=np.float64).T
+    load = core_load(df, threshold)
+
+    fig, (ax_heat, ax_fps) = plt.subplots(2, 1, figsize=(14, 7), sharex=True,
+                                          gridspec_kw={'height_ratios': [3, 1]})
+    extent = [minutes[0], minutes[-1], len(columns) - 0.5, -0.5] if len(minutes) else None
+    image = ax_heat.imshow(cores, aspect='auto', cmap='inferno', vmin=0, vmax=100,
+                           interpolation='nearest', extent=extent)
+    ax_heat.set_yticks(range(len(columns)))
+    ax_heat.set_yticklabels([f'core{core_number(c)}' for c in columns])
+    ax_heat.set_ylabel('CPU core')
+    ax_heat.set_title(title or 'Per-core CPU utilisation', fontweight='bold')
+    fig.colorbar(image, ax=[ax_heat, ax_fps], label='Utilisation (%)', pad=0.01)
+
+    if events is not None:
+        anomaly_detection.annotate_events(ax_fps, events, 'average_frame_rate', time_scale=1 / 60)
+    ax_fps.plot(minutes, df['average_frame_rate'], color='tab:blue', linewidth=1, label='FPS')
+    ax_fps.fill_between(minutes, 0, 1, where=load['saturated'].to_numpy(), color='tab:red', alpha=0.25,
+                        transform=ax_fps.get_xaxis_transform(), step='mid',
+                        label=f'Core >= {threshold:g}%')
+    ax_fps.set_xlabel('Time (Minutes)')
+    ax_fps.set_ylabel('FPS')
+    ax_fps.legend(loc='upper right')
+    ax_fps.grid(True, alpha=0.3)
+
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def print_core_report(runs, per_core, labels=None, threshold=SATURATION_PCT):
+    """Prints the per-run saturation table and each run's per-core utilisation."""
+    print("\n" + "="*50)
+    print(f"--- PER-CORE CPU SATURATION (core >= {threshold:g}%) ---")
+    print("="*50)
+
+    table = runs.copy()
+    if labels:
+        table.index = table.index.map(lambda x: labels.get(x, x))
+    table.rename(columns={
+        'aggregate_cpu_pct': 'Aggregate CPU (%)',
+        'busiest_core_mean_pct': 'Busiest Core Avg (%)',
+        'core_spread_mean_pct': 'Busiest - Mean Core (%)',
+        'dominant_core': 'Dominant Core',
+        'saturated_pct': 'Time Saturated (%)',
+        'hidden_saturation_pct': 'Hidden Saturation (%)',
+        'fps_saturated': 'FPS While Saturated',
+        'fps_unsaturated': 'FPS Otherwise',
+        'drops_in_saturation_pct': 'FPS Drops In Saturation (%)',
+        'corr_peak_core_fps': 'Corr(Busiest Core, FPS)',
+        'cpu_mhz_saturated': 'CPU MHz Saturated',
+        'cpu_mhz_unsaturated': 'CPU MHz Otherwise',
+        'cpu_level_saturated': 'CPU Level Saturated',
+        'cpu_level_unsaturated': 'CPU Level Otherwise',
+        'gpu_mhz_mean': 'GPU MHz',
+        'gpu_level_mean': 'GPU Level',
+        'saturation_windows': 'Saturation Windows',
+        'longest_window_s': 'Longest Window (s)',
+    }, inplace=True)
+    print(table.T.to_string(float_format="%.2f"))
+
+    print("\nMean utilisation per core (%):")
+    cores = per_core['mean_pct'].unstack('core')
+    if labels:
+        cores.index = cores.index.map(lambda x: labels.get(x, x))
+    cores.columns = [f'core{c}' for c in cores.columns]
+    print(cores.to_string(float_format="%.1f"))
+    print("="*50)
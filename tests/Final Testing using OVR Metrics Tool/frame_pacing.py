@@ -0,0 +1,160 @@
+"""Frame-pacing analytics for OVR Metrics Tool exports.
+
+Averages hide the hitches that cause VR sickness, so this module reports the
+distribution of `average_frame_rate` (P1/P5/P50/P95 and the 1% low), stutter
+episodes (consecutive samples below the display refresh rate), time in
+budget against `display_refresh_rate`, and the stale/early/repeated frame and
+screen-tear counters. Everything is computed with grouped, vectorised
+operations over the merged frame from `load_and_merge_data`.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns needed by frame_pacing_summary
+PACING_COLUMNS = [
+    'average_frame_rate',
+    'display_refresh_rate',
+    'stale_frame_count',
+    'stale_frames_consecutive',
+    'max_repeated_frames',
+    'early_frame_count',
+    'screen_tear_count',
+    'app_gpu_time_microseconds',
+]
+
+FPS_PERCENTILES = [1, 5, 50, 95]
+
+# A sample counts as stuttering below this fraction of the refresh rate
+STUTTER_TOLERANCE = 0.05
+
+# Used when an export has no display_refresh_rate
+DEFAULT_REFRESH_RATE = 72.0
+
+def sample_intervals(df, group_col='Source_File'):
+    """Seconds covered by each sample, from 'Time Stamp' (ms) differences within each run."""
+    dt = df.groupby(group_col, observed=True)['Time Stamp'].diff() / 1000
+    # A run's first sample gets that run's typical interval
+    return dt.fillna(dt.groupby(df[group_col], observed=True).transform('median')).fillna(1.0)
+
+def run_ids(flags, groups):
+    """Number each run of consecutive True flags (never spanning two groups); NaN where False."""
+    flags = pd.Series(np.asarray(flags, dtype=bool), index=groups.index)
+    new_group = groups.ne(groups.shift())
+    starts = flags & (new_group | ~flags.shift(fill_value=False))
+    return starts.cumsum().where(flags)
+
+def stutter_episodes(df, refresh, group_col='Source_File', tolerance=STUTTER_TOLERANCE):
+    """One row per stutter episode: a run of consecutive samples below the refresh rate.
+
+    Returns the run's group, first/last 'Time Stamp', sample count, duration
+    and lowest FPS.
+    """
+    fps = df['average_frame_rate'].to_numpy(dtype=np.float64)
+    episode = run_ids(fps < refresh * (1 - tolerance), df[group_col])
+
+    episodes = pd.DataFrame({
+        group_col: df[group_col],
+        'episode': episode,
+        'Time Stamp': df['Time Stamp'],
+        'fps': fps,
+        'dt': sample_intervals(df, group_col),
+    }).dropna(subset=['episode'])
+
+    return episodes.groupby('episode').agg(
+        **{group_col: (group_col, 'first')},
+        start_ms=('Time Stamp', 'first'),
+        end_ms=('Time Stamp', 'last'),
+        samples=('fps', 'size'),
+        duration_s=('dt', 'sum'),
+        min_fps=('fps', 'min'),
+    ).reset_index(drop=True)
+
+def frame_pacing_summary(df, group_col='Source_File', tolerance=STUTTER_TOLERANCE):
+    """Per-run frame-pacing statistics, one row per value of `group_col`."""
+    df = df.reset_index(drop=True)
+    groups = df[group_col]
+    fps = df['average_frame_rate'].astype(np.float64)
+    if 'display_refresh_rate' in df.columns:
+        refresh = df['display_refresh_rate'].astype(np.float64).where(lambda r: r > 0).fillna(DEFAULT_REFRESH_RATE)
+    else:
+        refresh = pd.Series(DEFAULT_REFRESH_RATE, index=df.index)
+    dt = sample_intervals(df, group_col)
+
+    by_run = fps.groupby(groups, observed=True)
+    summary = by_run.quantile([p / 100 for p in FPS_PERCENTILES]).unstack()
+    summary.columns = [f'fps_p{p}' for p in FPS_PERCENTILES]
+
+    # 1% low: mean FPS of the samples at or below each run's 1st percentile
+    p1 = by_run.transform('quantile', 0.01)
+    summary['fps_1pct_low'] = fps.where(fps <= p1).groupby(groups, observed=True).mean()
+    summary['fps_mean'] = by_run.mean()
+    summary['refresh_rate'] = refresh.groupby(groups, observed=True).median()
+
+    in_budget = fps >= refresh * (1 - tolerance)
+    summary['time_in_budget_pct'] = (dt.where(in_budget, 0).groupby(groups, observed=True).sum()
+                                     / dt.groupby(groups, observed=True).sum() * 100)
+
+    if 'app_gpu_time_microseconds' in df.columns:
+        budget_us = 1e6 / refresh
+        gpu_ok = df['app_gpu_time_microseconds'].astype(np.float64) <= budget_us
+        summary['gpu_in_budget_pct'] = gpu_ok.groupby(groups, observed=True).mean() * 100
+        summary['gpu_time_p95_us'] = df['app_gpu_time_microseconds'].astype(np.float64).groupby(
+            groups, observed=True).quantile(0.95)
+
+    episodes = stutter_episodes(df, refresh.to_numpy(), group_col, tolerance)
+    by_episode = episodes.groupby(group_col, observed=True)
+    summary['stutter_episodes'] = by_episode.size()
+    summary['longest_stutter_s'] = by_episode['duration_s'].max()
+    summary['stutter_time_s'] = by_episode['duration_s'].sum()
+    summary[['stutter_episodes', 'longest_stutter_s', 'stutter_time_s']] = summary[
+        ['stutter_episodes', 'longest_stutter_s', 'stutter_time_s']].fillna(0)
+
+    counters = {
+        'stale_frames_total': ('stale_frame_count', 'sum'),
+        'stale_consecutive_max': ('stale_frames_consecutive', 'max'),
+        'repeated_frames_max': ('max_repeated_frames', 'max'),
+        'early_frames_total': ('early_frame_count', 'sum'),
+        'screen_tears_total': ('screen_tear_count', 'sum'),
+    }
+    present = {name: spec for name, spec in counters.items() if spec[0] in df.columns}
+    if present:
+        counts = df.groupby(group_col, observed=True).agg(**present)
+        summary = summary.join(counts)
+
+    summary.index.name = group_col
+    return summary
+
+def print_frame_pacing(summary, labels=None):
+    """Prints the frame-pacing table, optionally relabelling runs with `labels`."""
+    print("\n" + "="*50)
+    print("--- FRAME PACING PER GAME RUN ---")
+    print("="*50)
+
+    table = summary.copy()
+    if labels:
+        table.index = table.index.map(lambda x: labels.get(x, x))
+    table.rename(columns={
+        'fps_p1': 'P1 FPS',
+        'fps_p5': 'P5 FPS',
+        'fps_p50': 'P50 FPS',
+        'fps_p95': 'P95 FPS',
+        'fps_1pct_low': '1% Low FPS',
+        'fps_mean': 'Mean FPS',
+        'refresh_rate': 'Refresh Rate (Hz)',
+        'time_in_budget_pct': 'In Budget (%)',
+        'gpu_in_budget_pct': 'GPU In Budget (%)',
+        'gpu_time_p95_us': 'P95 GPU Time (us)',
+        'stutter_episodes': 'Stutters',
+        'longest_stutter_s': 'Longest Stutter (s)',
+        'stutter_time_s': 'Stutter Time (s)',
+        'stale_frames_total': 'Stale Frames',
+        'stale_consecutive_max': 'Max Consecutive Stale',
+        'repeated_frames_max': 'Max Repeated Frames',
+        'early_frames_total': 'Early Frames',
+        'screen_tears_total': 'Screen Tears',
+    }, inplace=True)
+
+    # Transposed so the many metrics read down the page
+    print(table.T.to_string(float_format="%.2f"))
+    print("="*50)
@@ -0,0 +1,188 @@
+"""GPU bottleneck classification for OVR Metrics Tool exports.
+
+Each run is cut into fixed time windows and every window is classified by
+what limits its frame rate:
+
+- 'headroom': frame rate at refresh and app GPU time inside the budget
+- 'cpu': frame rate below refresh while the GPU finishes well inside the
+  budget (usually a saturated main or render thread, see cpu_cores)
+- 'fragment', 'vertex', 'texture': GPU-bound, split by the pipeline
+  counters: texture fetch stalls, vertex shading or fetch stalls, otherwise
+  fragment shading
+- 'gpu': GPU-bound, but the export has no pipeline counters to split it
+
+The pipeline counters are only written when the OVR Metrics Tool's advanced
+GPU counters are enabled; without them the columns are all zero.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cpu_cores import CORE_COLUMNS, core_load
+from scaling_analysis import scenario_load
+
+# Pipeline counters used to split GPU-bound windows
+GPU_COUNTER_COLUMNS = [
+    'avg_vertices_per_frame',
+    'avg_fill_percentage',
+    'avg_inst_per_frag',
+    'avg_textures_per_frag',
+    'percent_time_shading_frags',
+    'percent_time_shading_verts',
+    'percent_vertex_fetch_stall',
+    'percent_texture_fetch_stall',
+    'percent_texture_l1_miss',
+    'percent_texture_l2_miss',
+]
+
+# Columns needed by bottleneck_summary
+BOTTLENECK_COLUMNS = GPU_COUNTER_COLUMNS + CORE_COLUMNS + [
+    'average_frame_rate',
+    'display_refresh_rate',
+    'app_gpu_time_microseconds',
+    'gpu_utilization_percentage',
+    'eye_buffer_width',
+    'eye_buffer_height',
+]
+
+WINDOW_S = 10.0
+
+# Frame rate at or above this fraction of refresh counts as keeping up
+FPS_OK_FRACTION = 0.95
+
+# App GPU time at or above this fraction of the frame budget, or GPU
+# utilisation at or above GPU_BUSY_PCT, makes a window GPU-bound
+GPU_BOUND_FRACTION = 0.9
+GPU_BUSY_PCT = 90.0
+
+# A GPU-bound window stalled on fetches this often (% of GPU time) is
+# texture- or vertex-bound
+TEXTURE_STALL_PCT = 20.0
+VERTEX_STALL_PCT = 20.0
+
+LIMITERS = ['fragment', 'vertex', 'texture', 'gpu', 'cpu']
+
+ADVICE = {
+    'fragment': "cut shader cost and pixel count (simpler materials, less overdraw, lower render scale or "
+                "higher fixed foveation)",
+    'vertex': "cut geometry (LODs, lower-poly avatars, fewer skinned meshes)",
+    'texture': "cut texture bandwidth (lower resolution, ASTC compression, mipmaps)",
+    'gpu': "GPU-bound; enable the advanced GPU counters in OVR Metrics Tool to tell shading, geometry "
+           "and texture cost apart",
+    'cpu': "reduce main/render thread work (draw calls, scripts, physics)",
+}
+
+def has_counters(window_means):
+    """True for windows whose pipeline counters were actually recorded (not all zero)."""
+    present = [c for c in GPU_COUNTER_COLUMNS if c in window_means.columns]
+    if not present:
+        return pd.Series(False, index=window_means.index)
+    return window_means[present].fillna(0).ne(0).any(axis=1)
+
+def classify(window_means):
+    """Limiter of every window from its mean metrics (see module docstring)."""
+    budget_us = 1e6 / window_means['display_refresh_rate']
+    gpu_share = window_means['app_gpu_time_microseconds'] / budget_us
+    keeping_up = window_means['average_frame_rate'] >= FPS_OK_FRACTION * window_means['display_refresh_rate']
+    gpu_bound = (gpu_share >= GPU_BOUND_FRACTION)
+    if 'gpu_utilization_percentage' in window_means:
+        gpu_bound |= window_means['gpu_utilization_percentage'] >= GPU_BUSY_PCT
+
+    def counter(column):
+        return window_means[column] if column in window_means else pd.Series(0.0, index=window_means.index)
+
+    texture = counter('percent_texture_fetch_stall') >= TEXTURE_STALL_PCT
+    vertex = ((counter('percent_vertex_fetch_stall') >= VERTEX_STALL_PCT)
+              | (counter('percent_time_shading_verts') > counter('percent_time_shading_frags')))
+    split = np.select([texture, vertex], ['texture', 'vertex'], 'fragment')
+    gpu_kind = np.where(has_counters(window_means), split, 'gpu')
+
+    return pd.Series(np.select([keeping_up & ~gpu_bound, gpu_bound], ['headroom', gpu_kind], 'cpu'),
+                     index=window_means.index)
+
+def bottleneck_windows(df, group_col='Source_File', window_s=WINDOW_S):
+    """One row per run and time window with its mean metrics and limiter."""
+    present = [c for c in BOTTLENECK_COLUMNS if c in df.columns and c not in CORE_COLUMNS]
+    missing = {'average_frame_rate', 'display_refresh_rate', 'app_gpu_time_microseconds'} - set(present)
+    if missing:
+        raise ValueError(f"Bottleneck analysis needs {', '.join(sorted(missing))}.")
+
+    data = df[[group_col, *present]].astype({c: np.float64 for c in present})
+    load = core_load(df)
+    data['busiest_core_pct'] = load['busiest_core_pct'].to_numpy()
+    data['cpu_saturated'] = load['saturated'].to_numpy()
+    stamp = df['Time Stamp'].to_numpy(dtype=np.float64)
+    start = pd.Series(stamp).groupby(df[group_col].to_numpy()).transform('min').to_numpy()
+    data['window'] = ((stamp - start) / 1000 // window_s).astype(np.int64)
+
+    windows = data.groupby([group_col, 'window'], observed=True).mean()
+    windows['samples'] = data.groupby([group_col, 'window'], observed=True).size()
+    windows['frame_budget_ms'] = 1000 / windows['display_refresh_rate']
+    windows['gpu_time_ms'] = windows['app_gpu_time_microseconds'] / 1000
+    if {'eye_buffer_width', 'eye_buffer_height'} <= set(windows.columns):
+        windows['eye_buffer_mpix'] = windows['eye_buffer_width'] * windows['eye_buffer_height'] / 1e6
+    windows['limiter'] = classify(windows)
+    return windows.reset_index()
+
+def dominant(limiters):
+    """Most common limiter among the limited windows, or 'headroom' if none are limited."""
+    limited = limiters[limiters != 'headroom']
+    return limited.mode().iat[0] if len(limited) else 'headroom'
+
+def bottleneck_summary(df, group_col='Source_File', window_s=WINDOW_S, manifest=None):
+    """Per-window limiters, their time share per run, and the dominant limiter per run and scenario.
+
+    Returns (windows, runs, scenarios); `manifest` gives each run's load as
+    in scaling_analysis.
+    """
+    windows = bottleneck_windows(df, group_col, window_s)
+    shares = pd.crosstab(windows[group_col], windows['limiter'], values=windows['samples'],
+                         aggfunc='sum', normalize='index').fillna(0) * 100
+    shares = shares.reindex(columns=['headroom', *LIMITERS], fill_value=0.0)
+    shares.columns = [f'{c}_pct' for c in shares.columns]
+
+    by_run = windows.groupby(group_col, observed=True)
+    runs = pd.DataFrame({
+        'dominant_limiter': by_run['limiter'].agg(dominant),
+        'fps_mean': by_run['average_frame_rate'].mean(),
+        'gpu_time_ms': by_run['gpu_time_ms'].median(),
+        'frame_budget_ms': by_run['frame_budget_ms'].median(),
+        'busiest_core_pct': by_run['busiest_core_pct'].mean(),
+        'counters': by_run.apply(lambda w: bool(has_counters(w).any())),
+    }).join(shares)
+    runs['load'] = [scenario_load(str(name), manifest) for name in runs.index]
+
+    windows['load'] = windows[group_col].astype(str).map(runs['load'])
+    scenarios = windows.groupby('load', dropna=False).agg(
+        runs=(group_col, 'nunique'),
+        dominant_limiter=('limiter', dominant),
+        gpu_time_ms=('gpu_time_ms', 'median'),
+        fps_mean=('average_frame_rate', 'mean'),
+    )
+    return windows, runs, scenarios
+
+def print_bottleneck_report(runs, scenarios, labels=None):
+    """Prints each run's limiter shares, the dominant limiter per scenario and what to cut."""
+    print("\n" + "="*50)
+    print("--- GPU BOTTLENECK CLASSIFICATION ---")
+    print("="*50)
+
+    table = runs.copy()
+    if labels:
+        table.index = table.index.map(lambda x: labels.get(x, x))
+    table.index.name = 'Run'
+    print(table.round(2).T.to_string())
+
+    print("\nDominant limiter per scenario (load = restaurants):")
+    print(scenarios.to_string(float_format="%.2f"))
+
+    print("\nWhat to cut:")
+    for limiter in dict.fromkeys(runs['dominant_limiter']):
+        if limiter == 'headroom':
+            continue
+        names = [labels.get(n, n) if labels else n for n in runs.index[runs['dominant_limiter'] == limiter]]
+        print(f"  {limiter} ({', '.join(map(str, names))}): {ADVICE[limiter]}")
+    if not runs['counters'].all():
+        print("  Note: pipeline counters are all zero in "
+              f"{(~runs['counters']).sum()} run(s); GPU-bound windows there are not split further.")
+    print("="*50)
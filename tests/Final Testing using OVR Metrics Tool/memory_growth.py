@@ -0,0 +1,116 @@
+"""Memory-leak detection for OVR Metrics Tool exports.
+
+Fits a robust growth trend (see memory_trend) to every app memory series of
+every run, separating load steps from steady growth, and projects
+`app_pss_MB` to the end of a fixed-length session against a PSS budget. The
+low-memory killer ends a Quest app without warning, so the projection is
+what matters, not the run average. `available_memory_MB` is tracked the
+same way but shrinking is what counts there.
+
+The exports carry no scene name, so segments come from step jumps only.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import memory_trend
+
+# Series analysed, and whether growth (True) or shrinkage (False) is the concern
+MEMORY_SERIES = {
+    'app_pss_MB': True,
+    'app_uss_MB': True,
+    'app_private_dirty_MB': True,
+    'app_dalvik_pss_MB': True,
+    'available_memory_MB': False,
+}
+
+MEMORY_COLUMNS = list(MEMORY_SERIES)
+
+# PSS at which a session is flagged; tune to the headset's low-memory-killer threshold
+PSS_BUDGET_MB = 3000.0
+
+DEFAULT_SESSION_MINUTES = 45.0
+
+def memory_trends(df, group_col='Source_File'):
+    """One row per run and memory series with its growth_trend."""
+    rows = []
+    for name, run in df.groupby(group_col, observed=True):
+        for column, rising in MEMORY_SERIES.items():
+            if column not in run.columns:
+                continue
+            values = run[column].to_numpy(dtype=np.float64)
+            # Series the device does not report are all zeros
+            if not np.any(values):
+                continue
+            trend = memory_trend.growth_trend(run['Time (Minutes)'], values)
+            if trend is None:
+                continue
+            rows.append({
+                group_col: name,
+                'series': column,
+                **trend,
+                'leak_suspected': memory_trend.leak_suspected(trend, rising=rising),
+            })
+    return pd.DataFrame(rows)
+
+def pss_projection(trends, group_col='Source_File', budget=PSS_BUDGET_MB,
+                   session_minutes=DEFAULT_SESSION_MINUTES):
+    """Per-run PSS projection to the session end against `budget`."""
+    rows = {}
+    for _, trend in trends[trends['series'] == 'app_pss_MB'].iterrows():
+        projected, crossing = memory_trend.project_growth(trend, session_minutes, budget)
+        rows[trend[group_col]] = {
+            'pss_end_mb': trend['level_end_mb'],
+            'pss_growth_mb_per_min': trend['steady_mb_per_min'],
+            'pss_projected_mb': projected,
+            'minutes_to_budget': crossing,
+            'over_budget': bool(crossing <= session_minutes),
+        }
+    projection = pd.DataFrame.from_dict(rows, orient='index')
+    projection.index.name = group_col
+    return projection
+
+def print_memory_report(trends, projection, labels=None, budget=PSS_BUDGET_MB,
+                        session_minutes=DEFAULT_SESSION_MINUTES, group_col='Source_File'):
+    """Prints the per-series growth table and the PSS budget verdicts."""
+    print("\n" + "="*50)
+    print("--- MEMORY GROWTH & LEAK DETECTION ---")
+    print("="*50)
+
+    table = trends[[group_col, 'series', 'start_mb', 'level_end_mb', 'overall_mb_per_min',
+                    'steady_mb_per_min', 'steps', 'step_total_mb', 'leak_suspected']].copy()
+    if labels:
+        table[group_col] = table[group_col].astype(str).map(lambda x: labels.get(x, x))
+    table.rename(columns={
+        group_col: 'Run',
+        'series': 'Series',
+        'start_mb': 'Start (MB)',
+        'level_end_mb': 'End (MB)',
+        'overall_mb_per_min': 'Overall (MB/min)',
+        'steady_mb_per_min': 'Steady (MB/min)',
+        'steps': 'Steps',
+        'step_total_mb': 'Step Total (MB)',
+        'leak_suspected': 'Leak?',
+    }, inplace=True)
+    print(table.to_string(index=False, float_format="%.2f"))
+    print("Overall: net change from start to end per minute, steps included. "
+          "Steady: median growth between steps (the leak rate).")
+
+    print(f"\nPSS budget {budget:g} MB over a {session_minutes:g}-minute session:")
+    for name, row in projection.iterrows():
+        label = labels.get(name, name) if labels else name
+        if row['minutes_to_budget'] == 0:
+            when = "already over budget"
+        elif np.isinf(row['minutes_to_budget']):
+            when = "no steady growth towards the budget"
+        else:
+            when = f"budget reached at ~{row['minutes_to_budget']:.0f} min"
+        status = 'AT RISK' if row['over_budget'] else 'ok'
+        print(f"  {label}: {status} - {row['pss_end_mb']:.0f} MB now, "
+              f"{row['pss_growth_mb_per_min']:+.2f} MB/min steady, "
+              f"~{row['pss_projected_mb']:.0f} MB at {session_minutes:g} min ({when})")
+    print("="*50)
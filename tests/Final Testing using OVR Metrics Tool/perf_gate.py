@@ -0,0 +1,240 @@
+"""Performance regression gate for OVR Metrics Tool exports.
+
+Stores a baseline per scenario and compares new runs against it, exiting
+non-zero when a metric regresses past its tolerance. Each metric is compared
+on its median with a two-sided Mann-Whitney U test and a seeded bootstrap
+confidence interval for the relative change; a metric fails when the change
+is worse than the tolerance and significant at --alpha.
+
+Usage:
+    python perf_gate.py save normal NormalGameRun1.csv
+    python perf_gate.py compare normal NewBuildRun.csv --tolerance 5
+    python perf_gate.py list
+
+Exit codes: 0 = pass, 1 = regression, 2 = missing baseline or no data.
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from auto_plot_metrics import load_and_merge_data, CACHE_DIR
+
+# Gated metrics and whether a higher value is better
+GATE_METRICS = {
+    'average_frame_rate': True,
+    'app_gpu_time_microseconds': False,
+    'app_pss_MB': False,
+}
+
+BASELINE_DIR = 'perf_baselines'
+
+# Relative change (%) a metric may worsen by before the gate fails
+DEFAULT_TOLERANCE = 5.0
+DEFAULT_ALPHA = 0.05
+
+# Baselines keep at most this many samples per metric (evenly strided)
+MAX_BASELINE_SAMPLES = 5000
+BOOTSTRAP_RESAMPLES = 2000
+
+def baseline_path(scenario, baseline_dir=BASELINE_DIR):
+    return os.path.join(baseline_dir, f"{scenario}.json")
+
+def metric_samples(df, metric):
+    """Finite values of one metric, strided down to MAX_BASELINE_SAMPLES."""
+    values = df[metric].to_numpy(dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) > MAX_BASELINE_SAMPLES:
+        values = values[np.linspace(0, len(values) - 1, MAX_BASELINE_SAMPLES).astype(np.int64)]
+    return values
+
+def save_baseline(scenario, files, baseline_dir=BASELINE_DIR):
+    """Summarise the runs in `files` and store them as the scenario's baseline."""
+    df = load_and_merge_data(files, metrics=list(GATE_METRICS), cache_dir=CACHE_DIR)
+    baseline = {
+        'scenario': scenario,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'source_files': sorted(df['Source_File'].astype(str).unique().tolist()),
+        'metrics': {},
+    }
+    for metric in GATE_METRICS:
+        if metric not in df.columns:
+            continue
+        values = metric_samples(df, metric)
+        baseline['metrics'][metric] = {
+            'median': float(np.median(values)),
+            'mean': float(values.mean()),
+            'p5': float(np.percentile(values, 5)),
+            'p95': float(np.percentile(values, 95)),
+            'samples': np.round(values, 3).tolist(),
+        }
+
+    os.makedirs(baseline_dir, exist_ok=True)
+    with open(baseline_path(scenario, baseline_dir), 'w', encoding='utf-8') as f:
+        json.dump(baseline, f)
+    return baseline
+
+def load_baseline(scenario, baseline_dir=BASELINE_DIR):
+    with open(baseline_path(scenario, baseline_dir), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def average_ranks(values):
+    """1-based ranks with ties given their average rank, plus the tie group sizes."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    upper = np.cumsum(counts)
+    return (upper - (counts - 1) / 2)[inverse], counts
+
+def mann_whitney_u(a, b):
+    """Two-sided Mann-Whitney U test (normal approximation, tie-corrected).
+
+    Returns (U for `a`, p-value).
+    """
+    n1, n2 = len(a), len(b)
+    ranks, ties = average_ranks(np.concatenate([a, b]))
+    u1 = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    tie_term = (ties ** 3 - ties).sum() / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return u1, 1.0
+    z = (abs(u1 - n1 * n2 / 2) - 0.5) / sigma
+    return u1, math.erfc(max(z, 0) / math.sqrt(2))
+
+def bootstrap_median_change(baseline, current, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """95% bootstrap CI for the relative change (%) in median from baseline to current."""
+    rng = np.random.default_rng(seed)
+    base_medians = np.median(baseline[rng.integers(0, len(baseline), (resamples, len(baseline)))], axis=1)
+    curr_medians = np.median(current[rng.integers(0, len(current), (resamples, len(current)))], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes = (curr_medians - base_medians) / np.abs(base_medians) * 100
+    changes = changes[np.isfinite(changes)]
+    if len(changes) == 0:
+        return float('nan'), float('nan')
+    low, high = np.percentile(changes, [2.5, 97.5])
+    return float(low), float(high)
+
+def compare_to_baseline(baseline, df, tolerance=DEFAULT_TOLERANCE, alpha=DEFAULT_ALPHA, metric_tolerances=None):
+    """Compare a loaded run against a stored baseline. Returns one result dict per metric."""
+    metric_tolerances = metric_tolerances or {}
+    results = []
+    for metric, higher_is_better in GATE_METRICS.items():
+        if metric not in baseline['metrics'] or metric not in df.columns:
+            continue
+        base = np.asarray(baseline['metrics'][metric]['samples'], dtype=np.float64)
+        curr = metric_samples(df, metric)
+        if len(base) == 0 or len(curr) == 0:
+            continue
+
+        base_median, curr_median = float(np.median(base)), float(np.median(curr))
+        change = (curr_median - base_median) / abs(base_median) * 100 if base_median else float('nan')
+        ci_low, ci_high = bootstrap_median_change(base, curr)
+        _, p_value = mann_whitney_u(curr, base)
+
+        # Worsening is a drop for higher-is-better metrics and a rise otherwise
+        worsening = -change if higher_is_better else change
+        limit = metric_tolerances.get(metric, tolerance)
+        regressed = bool(worsening > limit and p_value < alpha)
+        improved = bool(-worsening > limit and p_value < alpha)
+
+        results.append({
+            'metric': metric,
+            'baseline_median': base_median,
+            'current_median': curr_median,
+            'change_pct': change,
+            'ci_low_pct': ci_low,
+            'ci_high_pct': ci_high,
+            'p_value': p_value,
+            'tolerance_pct': limit,
+            'status': 'REGRESSED' if regressed else 'IMPROVED' if improved else 'ok',
+        })
+    return results
+
+def print_gate_report(scenario, baseline, results):
+    """Print the compact diff table."""
+    print("\n" + "="*96)
+    print(f"--- PERFORMANCE GATE: '{scenario}' (baseline {baseline['created']}, "
+          f"{', '.join(baseline['source_files'])}) ---")
+    print("="*96)
+    print(f"{'Metric':<28}{'Baseline':>10}{'Current':>10}{'Change':>9}{'95% CI':>20}{'p-value':>9}{'Tol':>6}  Status")
+    for r in results:
+        ci = f"[{r['ci_low_pct']:+.1f}%, {r['ci_high_pct']:+.1f}%]"
+        print(f"{r['metric']:<28}{r['baseline_median']:>10.2f}{r['current_median']:>10.2f}"
+              f"{r['change_pct']:>+8.1f}%{ci:>20}{r['p_value']:>9.4f}{r['tolerance_pct']:>5.0f}%  {r['status']}")
+    print("="*96)
+
+def parse_metric_tolerances(items):
+    """Turn ['metric=pct', ...] into a dict."""
+    tolerances = {}
+    for item in items or []:
+        metric, _, value = item.partition('=')
+        if metric not in GATE_METRICS or not value:
+            raise SystemExit(f"Invalid --metric-tolerance '{item}', expected one of {list(GATE_METRICS)}=<pct>.")
+        tolerances[metric] = float(value)
+    return tolerances
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gate OVR Metrics runs against stored performance baselines.")
+    parser.add_argument('--baseline-dir', default=BASELINE_DIR, help="where baselines are stored")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    save_cmd = commands.add_parser('save', help="store runs as a scenario's baseline")
+    save_cmd.add_argument('scenario')
+    save_cmd.add_argument('files', nargs='+')
+
+    compare_cmd = commands.add_parser('compare', help="compare runs against a scenario's baseline")
+    compare_cmd.add_argument('scenario')
+    compare_cmd.add_argument('files', nargs='+')
+    compare_cmd.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                             help="allowed worsening of a metric's median, in percent")
+    compare_cmd.add_argument('--metric-tolerance', action='append', metavar='METRIC=PCT',
+                             help="per-metric tolerance override (repeatable)")
+    compare_cmd.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help="significance level")
+
+    commands.add_parser('list', help="list stored baselines")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'save':
+            baseline = save_baseline(args.scenario, args.files, args.baseline_dir)
+            print(f"Baseline '{args.scenario}' saved to: {baseline_path(args.scenario, args.baseline_dir)}")
+            for metric, stats in baseline['metrics'].items():
+                print(f"  {metric:<28} median {stats['median']:.2f}  (P5 {stats['p5']:.2f}, P95 {stats['p95']:.2f})")
+
+        elif args.command == 'compare':
+            try:
+                baseline = load_baseline(args.scenario, args.baseline_dir)
+            except FileNotFoundError:
+                print(f"FATAL ERROR: no baseline stored for scenario '{args.scenario}'.")
+                sys.exit(2)
+            df = load_and_merge_data(args.files, metrics=list(GATE_METRICS), cache_dir=CACHE_DIR)
+            results = compare_to_baseline(baseline, df, args.tolerance, args.alpha,
+                                          parse_metric_tolerances(args.metric_tolerance))
+            if not results:
+                print(f"FATAL ERROR: no gate metric ({', '.join(GATE_METRICS)}) could be compared; "
+                      "the baseline or the runs lack the columns or samples.")
+                sys.exit(2)
+            print_gate_report(args.scenario, baseline, results)
+            regressions = [r['metric'] for r in results if r['status'] == 'REGRESSED']
+            if regressions:
+                print(f"\nFAIL: {len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+                sys.exit(1)
+            print("\nPASS: no metric regressed past its tolerance.")
+
+        else:
+            names = sorted(f[:-5] for f in os.listdir(args.baseline_dir) if f.endswith('.json')) \
+                if os.path.isdir(args.baseline_dir) else []
+            for name in names:
+                baseline = load_baseline(name, args.baseline_dir)
+                print(f"{name:<24} {baseline['created']}  {', '.join(baseline['source_files'])}")
+            if not names:
+                print("No baselines stored.")
+
+    except ValueError as e:
+        print(f"\nFATAL ERROR: {e}")
+        sys.exit(2)
@@ -0,0 +1,392 @@
+"""SQLite catalog of ingested OVR Metrics runs.
+
+Each export is parsed once at ingestion and stored as one row: its path,
+size, mtime and content hash, scenario load, device and build tags, and the
+frame-pacing, GPU, thermal and memory statistics of the whole run. Queries
+such as "all 15-restaurant runs on build X by P5 FPS" then read the index
+only, never the CSVs. Every run also stores mergeable quantile sketches and
+histograms of its FPS, app GPU time and temperature (see quantile_sketch),
+so 'fleet' reports distribution-wide percentiles over any subset of runs
+by merging them, in memory independent of the number of runs.
+
+A scan skips files whose size and mtime are unchanged (or whose hash is,
+when only the mtime moved), so re-running it after dropping new exports
+into the data directory only parses the new ones.
+
+Usage:
+    python run_catalog.py scan                     # ingest new exports from ../../data
+    python run_catalog.py scan captures/ --build 1.4.2 --device quest2
+    python run_catalog.py query --load 15 --build 1.4.2 --sort fps_p5
+    python run_catalog.py query --where "stutter_episodes > 3" --paths | xargs -d '\\n' python auto_plot_metrics.py
+    python run_catalog.py fleet --build 1.4.2 --histogram average_frame_rate
+    python run_catalog.py tag "GameRun4*" --build 1.4.1
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import quantile_sketch
+import frame_pacing
+import scaling_analysis
+from auto_plot_metrics import CACHE_DIR, load_ovr_run, iter_runs_parallel
+from parse_cache import file_digest
+
+CATALOG_PATH = 'run_catalog.sqlite'
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+
+# Bump when the statistics change; older rows are re-ingested on the next scan
+STATS_VERSION = 3
+
+# Columns read from each export at ingestion
+CATALOG_METRICS = list(dict.fromkeys(frame_pacing.PACING_COLUMNS + [
+    'battery_temperature_celcius',
+    'battery_level_percentage',
+    'app_pss_MB',
+    'cpu_utilization_percentage',
+    'gpu_utilization_percentage',
+]))
+
+# Per-run statistics stored in the catalog, all REAL
+STAT_COLUMNS = [
+    'rows', 'duration_s',
+    'fps_mean', 'fps_p1', 'fps_p5', 'fps_p50', 'fps_p95', 'fps_1pct_low', 'refresh_rate',
+    'time_in_budget_pct', 'gpu_in_budget_pct', 'stutter_episodes', 'longest_stutter_s',
+    'stale_frames_total', 'gpu_time_p50_us', 'gpu_time_p95_us',
+    'cpu_util_mean', 'gpu_util_mean', 'temp_start_c', 'temp_max_c', 'battery_drain_pct',
+    'pss_p50_mb', 'pss_max_mb',
+]
+
+META_COLUMNS = ['path', 'name', 'size', 'mtime_ns', 'digest', 'ingested', 'stats_version',
+                'scenario_load', 'device', 'build']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    ingested TEXT NOT NULL,
+    stats_version INTEGER NOT NULL,
+    scenario_load REAL,
+    device TEXT,
+    build TEXT,
+    {', '.join(f'{c} REAL' for c in STAT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS runs_scenario ON runs (scenario_load, build);
+CREATE INDEX IF NOT EXISTS runs_build ON runs (build, device);
+CREATE INDEX IF NOT EXISTS runs_digest ON runs (digest);
+CREATE TABLE IF NOT EXISTS sketches (
+    path TEXT PRIMARY KEY REFERENCES runs (path) ON DELETE CASCADE,
+    payload TEXT NOT NULL
+);
+"""
+
+def connect(catalog_path=CATALOG_PATH):
+    """Open (creating if needed) the catalog database."""
+    conn = sqlite3.connect(catalog_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+def run_statistics(df):
+    """Catalog statistics of one parsed run (a frame from load_ovr_run)."""
+    df = df.assign(Source_File='run')
+    pacing = frame_pacing.frame_pacing_summary(df).iloc[0]
+    stamp = df['Time Stamp'].to_numpy(dtype=np.float64)
+
+    def column(name):
+        if name not in df.columns:
+            return None
+        values = df[name].to_numpy(dtype=np.float64)
+        values = values[np.isfinite(values)]
+        return values if len(values) else None
+
+    stats = {c: pacing.get(c) for c in STAT_COLUMNS if c in pacing.index}
+    stats['rows'] = len(df)
+    stats['duration_s'] = (stamp.max() - stamp.min()) / 1000 if len(stamp) else 0.0
+    summaries = {
+        'gpu_time_p50_us': ('app_gpu_time_microseconds', np.median),
+        'cpu_util_mean': ('cpu_utilization_percentage', np.mean),
+        'gpu_util_mean': ('gpu_utilization_percentage', np.mean),
+        'temp_start_c': ('battery_temperature_celcius', lambda v: v[0]),
+        'temp_max_c': ('battery_temperature_celcius', np.max),
+        'battery_drain_pct': ('battery_level_percentage', lambda v: v[0] - v[-1]),
+        'pss_p50_mb': ('app_pss_MB', np.median),
+        'pss_max_mb': ('app_pss_MB', np.max),
+    }
+    for stat, (name, fn) in summaries.items():
+        values = column(name)
+        stats[stat] = None if values is None else fn(values)
+    return {c: (None if stats.get(c) is None or pd.isna(stats[c]) else float(stats[c])) for c in STAT_COLUMNS}
+
+def collect_exports(paths):
+    """OVR CSV exports under the given files, directories or glob patterns, sorted and de-duplicated."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, '*.csv')))
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            files.extend(glob.glob(path))
+    return sorted(dict.fromkeys(os.path.abspath(f) for f in files))
+
+def stale_paths(conn, files):
+    """The files that are new, changed, or were ingested with older statistics."""
+    known = {row[0]: row[1:] for row in conn.execute("SELECT path, size, mtime_ns, digest, stats_version FROM runs")}
+    stale = []
+    for path in files:
+        entry = known.get(path)
+        stat = os.stat(path)
+        if entry is None or entry[3] != STATS_VERSION or entry[0] != stat.st_size:
+            stale.append(path)
+        elif entry[1] != stat.st_mtime_ns:
+            # Touched but possibly unchanged: the content hash decides
+            if file_digest(path) != entry[2]:
+                stale.append(path)
+            else:
+                conn.execute("UPDATE runs SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, path))
+    return stale
+
+def ingest(conn, path, df, manifest=None, device=None, build=None):
+    """Insert or replace one run's row. Tags already set on the run are kept unless overridden."""
+    stat = os.stat(path)
+    previous = conn.execute("SELECT device, build FROM runs WHERE path = ?", (path,)).fetchone()
+    if previous:
+        device = device or previous[0]
+        build = build or previous[1]
+    load = scaling_analysis.scenario_load(path, manifest)
+    row = {
+        'path': path,
+        'name': os.path.basename(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'digest': file_digest(path),
+        'ingested': datetime.now().isoformat(timespec='seconds'),
+        'stats_version': STATS_VERSION,
+        'scenario_load': None if np.isnan(load) else load,
+        'device': device,
+        'build': build,
+        **run_statistics(df),
+    }
+    columns = ', '.join(row)
+    placeholders = ', '.join('?' for _ in row)
+    conn.execute(f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({placeholders})", list(row.values()))
+    conn.execute("INSERT OR REPLACE INTO sketches (path, payload) VALUES (?, ?)",
+                 (path, json.dumps(quantile_sketch.metric_sketches(df))))
+
+def scan(conn, paths, manifest=None, device=None, build=None, workers=None):
+    """Ingest new or changed exports under `paths` and drop rows whose file is gone.
+
+    Returns (ingested paths, unchanged count, removed paths).
+    """
+    files = collect_exports(paths)
+    stale = stale_paths(conn, files)
+    ingested = []
+
+    def add(path, df, elapsed):
+        ingest(conn, path, df, manifest, device, build)
+        conn.commit()
+        ingested.append(path)
+        print(f"  Ingested {os.path.basename(path)}: {len(df)} rows in {elapsed:.3f}s")
+
+    if workers:
+        for path, df, elapsed in iter_runs_parallel(stale, CATALOG_METRICS, CACHE_DIR, workers):
+            add(path, df, elapsed)
+    else:
+        for path in stale:
+            start = time.perf_counter()
+            try:
+                df = load_ovr_run(path, CATALOG_METRICS, CACHE_DIR)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                continue
+            add(path, df, time.perf_counter() - start)
+
+    removed = [path for (path,) in conn.execute("SELECT path FROM runs") if not os.path.exists(path)]
+    conn.executemany("DELETE FROM runs WHERE path = ?", [(p,) for p in removed])
+    conn.commit()
+    return ingested, len(files) - len(stale), removed
+
+def run_filter(load=None, build=None, device=None, name=None, where=None):
+    """SQL WHERE clause (or '') and its parameters for the query filters.
+
+    `name` is a glob on the file name; `where` is an extra SQL condition on
+    the catalog columns (e.g. "fps_p5 < 30").
+    """
+    conditions, params = [], []
+    for column, value in (('scenario_load', load), ('build', build), ('device', device)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if name is not None:
+        conditions.append("name GLOB ?")
+        params.append(name)
+    if where:
+        conditions.append(f"({where})")
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+def query(conn, load=None, build=None, device=None, name=None, where=None, sort='fps_p5', descending=False,
+          limit=None):
+    """Catalog rows matching every given filter (see run_filter), as a DataFrame."""
+    if sort not in META_COLUMNS + STAT_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort}'; choose one of {', '.join(META_COLUMNS + STAT_COLUMNS)}.")
+    clause, params = run_filter(load, build, device, name, where)
+    sql = "SELECT * FROM runs" + clause + f" ORDER BY {sort} {'DESC' if descending else 'ASC'}, name"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    except pd.errors.DatabaseError as e:
+        raise ValueError(f"Invalid query: {e}") from e
+
+def fleet(conn, load=None, build=None, device=None, name=None, where=None):
+    """Merged sketches of every matching run: (run count, {metric: (QuantileSketch, Histogram)}).
+
+    Stored sketches are decoded and folded in one run at a time.
+    """
+    clause, params = run_filter(load, build, device, name, where)
+    sql = "SELECT payload FROM sketches JOIN runs USING (path)" + clause
+    runs = 0
+
+    def payloads():
+        nonlocal runs
+        for (payload,) in conn.execute(sql, params):
+            runs += 1
+            yield json.loads(payload)
+
+    try:
+        merged = quantile_sketch.merge_stored(payloads())
+    except sqlite3.Error as e:
+        raise ValueError(f"Invalid query: {e}") from e
+    return runs, merged
+
+def print_histogram(histogram, width=40):
+    """Prints the non-empty buckets of a histogram as text bars."""
+    total = histogram.counts.sum()
+    edges = histogram.edges
+    for i in np.flatnonzero(histogram.counts):
+        if i == 0:
+            label = f"< {edges[0]:g}"
+        elif i == len(edges):
+            label = f">= {edges[-1]:g}"
+        else:
+            label = f"{edges[i - 1]:g}-{edges[i]:g}"
+        share = histogram.counts[i] / total
+        print(f"  {label:>14} {share * 100:6.2f}% {'#' * max(1, round(share * width))}")
+
+def tag(conn, pattern, device=None, build=None):
+    """Set the device and/or build of every run whose file name matches the glob `pattern`."""
+    updates = {c: v for c, v in (('device', device), ('build', build)) if v is not None}
+    if not updates:
+        raise ValueError("Nothing to tag; pass --device and/or --build.")
+    assignments = ', '.join(f"{c} = ?" for c in updates)
+    cursor = conn.execute(f"UPDATE runs SET {assignments} WHERE name GLOB ?", [*updates.values(), pattern])
+    conn.commit()
+    return cursor.rowcount
+
+def print_runs(runs):
+    """Prints catalog rows as a table of the most useful columns."""
+    if runs.empty:
+        print("No runs match.")
+        return
+    columns = ['name', 'scenario_load', 'build', 'device', 'duration_s', 'fps_mean', 'fps_p5', 'fps_1pct_low',
+               'time_in_budget_pct', 'stutter_episodes', 'gpu_time_p95_us', 'temp_max_c', 'pss_max_mb']
+    table = runs[columns].rename(columns={'scenario_load': 'load'})
+    print(table.to_string(index=False, float_format="%.2f"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index OVR Metrics exports and query their summary statistics.")
+    parser.add_argument('--catalog', default=CATALOG_PATH, help="catalog database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan_cmd = commands.add_parser('scan', help="ingest new or changed exports")
+    scan_cmd.add_argument('paths', nargs='*', default=[DEFAULT_DATA_DIR],
+                          help="export files, directories or glob patterns (default: the repository's data/)")
+    scan_cmd.add_argument('--device', default=None, help="device tag for the runs ingested now")
+    scan_cmd.add_argument('--build', default=None, help="build tag for the runs ingested now")
+    scan_cmd.add_argument('--manifest', default=scaling_analysis.DEFAULT_MANIFEST,
+                          help="JSON mapping export filenames to their load")
+    scan_cmd.add_argument('--workers', type=int, default=None, help="parse files in this many worker processes")
+
+    query_cmd = commands.add_parser('query', help="list runs matching filters")
+    query_cmd.add_argument('--load', type=float, default=None, help="scenario load (restaurant count)")
+    query_cmd.add_argument('--build', default=None)
+    query_cmd.add_argument('--device', default=None)
+    query_cmd.add_argument('--name', default=None, help="glob on the export file name")
+    query_cmd.add_argument('--where', default=None, help="extra SQL condition, e.g. \"fps_p5 < 30\"")
+    query_cmd.add_argument('--sort', default='fps_p5', help="column to sort by")
+    query_cmd.add_argument('--desc', action='store_true', help="sort descending")
+    query_cmd.add_argument('--limit', type=int, default=None)
+    query_cmd.add_argument('--paths', action='store_true', help="print only the matching file paths")
+
+    fleet_cmd = commands.add_parser('fleet', help="distribution percentiles over all matching runs")
+    fleet_cmd.add_argument('--load', type=float, default=None, help="scenario load (restaurant count)")
+    fleet_cmd.add_argument('--build', default=None)
+    fleet_cmd.add_argument('--device', default=None)
+    fleet_cmd.add_argument('--name', default=None, help="glob on the export file name")
+    fleet_cmd.add_argument('--where', default=None, help="extra SQL condition, e.g. \"fps_p5 < 30\"")
+    fleet_cmd.add_argument('--histogram', action='append', default=[], metavar='METRIC',
+                           help="also print this metric's merged histogram (repeatable)")
+
+    tag_cmd = commands.add_parser('tag', help="set the device/build of runs by file name")
+    tag_cmd.add_argument('pattern', help="glob on the export file name")
+    tag_cmd.add_argument('--device', default=None)
+    tag_cmd.add_argument('--build', default=None)
+    args = parser.parse_args()
+
+    try:
+        conn = connect(args.catalog)
+        if args.command == 'scan':
+            start = time.perf_counter()
+            ingested, unchanged, removed = scan(conn, args.paths, scaling_analysis.load_manifest(args.manifest),
+                                                args.device, args.build, args.workers)
+            for path in removed:
+                print(f"  Removed {os.path.basename(path)} (file no longer exists)")
+            total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            print(f"{len(ingested)} ingested, {unchanged} unchanged, {len(removed)} removed; "
+                  f"{total} run(s) in {args.catalog} ({time.perf_counter() - start:.2f}s)")
+
+        elif args.command == 'query':
+            start = time.perf_counter()
+            runs = query(conn, args.load, args.build, args.device, args.name, args.where, args.sort, args.desc,
+                         args.limit)
+            elapsed = time.perf_counter() - start
+            if args.paths:
+                print('\n'.join(runs['path']))
+            else:
+                print_runs(runs)
+                print(f"\n{len(runs)} run(s) in {elapsed * 1000:.1f} ms")
+
+        elif args.command == 'fleet':
+            start = time.perf_counter()
+            count, merged = fleet(conn, args.load, args.build, args.device, args.name, args.where)
+            elapsed = time.perf_counter() - start
+            if not count:
+                print("No runs match.")
+            else:
+                print(f"Fleet distribution over {count} run(s), merged in {elapsed * 1000:.1f} ms:\n")
+                print(quantile_sketch.format_fleet(merged), end='')
+                for metric in args.histogram:
+                    if metric not in merged:
+                        raise ValueError(f"No sketches stored for '{metric}'.")
+                    print(f"\n{metric}:")
+                    print_histogram(merged[metric][1])
+
+        else:
+            print(f"Tagged {tag(conn, args.pattern, args.device, args.build)} run(s).")
+
+    except (ValueError, sqlite3.Error) as e:
+        print(f"\nFATAL ERROR: {e}")
+        sys.exit(2)
@@ -0,0 +1,143 @@
+"""Scalability analysis: scenario load (restaurant count) vs. performance.
+
+The OVR exports form a load sweep (a normal run, then 5, 15 and 25
+restaurants). This module reads each run's load from a sidecar manifest or
+its filename, takes per-run medians of the key metrics, fits each metric
+against load and predicts the load at which frame time passes the refresh
+budget (13.9 ms at 72 Hz).
+
+A manifest is a JSON object mapping export filenames to their load, e.g.
+    {"NormalGameRun1.csv": 0, "GameRun2 (5 Restaurants).csv": 5}
+"""
+
+import os
+import re
+import json
+import numpy as np
+import pandas as pd
+
+# Metrics fitted against load
+SCALING_METRICS = [
+    'average_frame_rate',
+    'app_gpu_time_microseconds',
+    'app_pss_MB',
+    'cpu_utilization_percentage',
+]
+
+DEFAULT_MANIFEST = 'scenarios.json'
+TARGET_REFRESH_HZ = 72.0
+
+LOAD_PATTERN = re.compile(r'(\d+)\s*restaurants?', re.IGNORECASE)
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    """Read a filename -> load manifest, or return an empty one if it does not exist."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {os.path.basename(name): float(load) for name, load in json.load(f).items()}
+
+def scenario_load(file_name, manifest=None):
+    """Load parameter of a run: from the manifest, else '<n> restaurants' in the name, else 0 for a normal run."""
+    name = os.path.basename(file_name)
+    if manifest and name in manifest:
+        return manifest[name]
+    match = LOAD_PATTERN.search(name)
+    if match:
+        return float(match.group(1))
+    if 'normal' in name.lower():
+        return 0.0
+    return float('nan')
+
+def run_medians(df, manifest=None, group_col='Source_File'):
+    """Per-run medians of the scaling metrics plus frame times, with each run's load."""
+    metrics = [m for m in SCALING_METRICS if m in df.columns]
+    runs = df.groupby(group_col, observed=True)[metrics].median().astype(np.float64)
+    runs['frame_time_ms'] = 1000 / runs['average_frame_rate']
+    if 'app_gpu_time_microseconds' in runs:
+        runs['gpu_frame_time_ms'] = runs['app_gpu_time_microseconds'] / 1000
+    runs.insert(0, 'load', [scenario_load(str(name), manifest) for name in runs.index])
+    return runs.sort_values('load')
+
+def fit_against_load(runs, degree=1):
+    """Least-squares polynomial fit of every metric column against 'load'.
+
+    Returns one row per metric with the coefficients (highest power first)
+    and R².
+    """
+    known = runs.dropna(subset=['load'])
+    x = known['load'].to_numpy()
+    fits = {}
+    for metric in known.columns.drop('load'):
+        y = known[metric].to_numpy()
+        ok = np.isfinite(y)
+        if ok.sum() <= degree or len(np.unique(x[ok])) <= degree:
+            continue
+        coeffs = np.polyfit(x[ok], y[ok], degree)
+        residual = y[ok] - np.polyval(coeffs, x[ok])
+        total = ((y[ok] - y[ok].mean()) ** 2).sum()
+        fits[metric] = {
+            'coefficients': coeffs,
+            'slope_per_unit': coeffs[-2],
+            'intercept': coeffs[-1],
+            'r2': 1 - (residual ** 2).sum() / total if total > 0 else float('nan'),
+        }
+    return pd.DataFrame.from_dict(fits, orient='index')
+
+def load_at_budget(fit, budget):
+    """Smallest non-negative load where the fitted value reaches `budget`.
+
+    Returns 0.0 if the fit is already over budget with no load, and inf if
+    it never reaches it.
+    """
+    coeffs = np.array(fit['coefficients'], dtype=np.float64)
+    if np.polyval(coeffs, 0.0) >= budget:
+        return 0.0
+    shifted = coeffs.copy()
+    shifted[-1] -= budget
+    roots = np.roots(shifted)
+    roots = roots[np.isreal(roots)].real
+    roots = roots[roots >= 0]
+    return float(roots.min()) if len(roots) else float('inf')
+
+def scaling_report(df, manifest=None, refresh_hz=TARGET_REFRESH_HZ, degree=1):
+    """Run medians, per-metric fits and the predicted load limits."""
+    runs = run_medians(df, manifest)
+    fits = fit_against_load(runs, degree)
+    budget_ms = 1000 / refresh_hz
+    limits = {
+        metric: load_at_budget(fits.loc[metric], budget_ms)
+        for metric in ('frame_time_ms', 'gpu_frame_time_ms') if metric in fits.index
+    }
+    return runs, fits, limits
+
+def print_scaling_report(runs, fits, limits, refresh_hz=TARGET_REFRESH_HZ):
+    """Prints the load sweep table, the fits and the predicted load limits."""
+    print("\n" + "="*50)
+    print("--- SCALABILITY: LOAD (RESTAURANTS) VS PERFORMANCE ---")
+    print("="*50)
+    print(runs.to_string(float_format="%.2f"))
+
+    if fits.empty:
+        print("\nNo fit: need >=2 runs with a known, distinct load (name them '<n> restaurants' or add "
+              "them to the manifest).")
+        if runs['load'].isna().any():
+            print(f"  Note: no load known for {', '.join(map(str, runs.index[runs['load'].isna()]))}")
+        print("="*50)
+        return
+
+    print("\nLinear fit against load (per restaurant):")
+    print(fits[['slope_per_unit', 'intercept', 'r2']].to_string(float_format="%.3f"))
+
+    budget_ms = 1000 / refresh_hz
+    print(f"\nFrame budget at {refresh_hz:g} Hz: {budget_ms:.2f} ms")
+    for metric, load in limits.items():
+        label = 'Frame time (1000/FPS)' if metric == 'frame_time_ms' else 'App GPU time'
+        if load == 0.0:
+            print(f"  {label}: already over budget with no extra load")
+        elif np.isinf(load):
+            print(f"  {label}: stays within budget at any load")
+        else:
+            print(f"  {label}: predicted to exceed budget at ~{load:.1f} restaurants")
+    if runs['load'].isna().any():
+        print(f"  Note: no load known for {', '.join(map(str, runs.index[runs['load'].isna()]))} (add to manifest)")
+    print("="*50)
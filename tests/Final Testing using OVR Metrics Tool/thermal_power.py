@@ -0,0 +1,174 @@
+"""Thermal, power and battery projection for OVR Metrics Tool exports.
+
+Each run's battery level and temperature are fitted over the whole series
+(see thermal_model) and projected to a fixed session length, so a scene
+configuration can be checked against the session it has to survive. Power
+draw comes from `power_wattage` (mW) and `battery_current_now_milliamps`,
+and throttling events are drops in `cpu_level`, `gpu_level` or the clock
+frequencies while the device is hot.
+
+The export writes placeholders for sensors a device does not report
+(9999 mA battery current, 0 °C sensor temperature); those are treated as
+missing, and the battery temperature is used when the sensor temperature is
+unavailable.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import thermal_model
+
+# Columns needed by thermal_summary
+THERMAL_COLUMNS = [
+    'battery_level_percentage',
+    'battery_temperature_celcius',
+    'battery_current_now_milliamps',
+    'sensor_temperature_celcius',
+    'power_wattage',
+    'power_current',
+    'cpu_level',
+    'gpu_level',
+    'cpu_frequency_MHz',
+    'gpu_frequency_MHz',
+]
+
+# Signals whose drops count as throttling
+THROTTLE_SIGNALS = ['cpu_level', 'gpu_level', 'gpu_frequency_MHz']
+
+# Values the export writes for sensors that are not reported
+SENSOR_PLACEHOLDERS = {
+    'battery_current_now_milliamps': 9999,
+    'sensor_temperature_celcius': 0,
+}
+
+def without_placeholders(df):
+    """Copy of `df` with sensor placeholder values replaced by NaN."""
+    df = df.copy()
+    for column, placeholder in SENSOR_PLACEHOLDERS.items():
+        if column in df.columns:
+            df[column] = df[column].astype(np.float64).where(lambda v: v != placeholder)
+    return df
+
+def temperature(df):
+    """Device temperature per sample: the sensor where reported, else the battery."""
+    battery = df['battery_temperature_celcius'].astype(np.float64)
+    if 'sensor_temperature_celcius' not in df.columns:
+        return battery
+    return df['sensor_temperature_celcius'].astype(np.float64).fillna(battery)
+
+def thermal_summary(df, group_col='Source_File', session_minutes=thermal_model.SESSION_MINUTES,
+                    thermal_limit=thermal_model.THERMAL_LIMIT_C):
+    """Per-run power statistics, fits and session projection.
+
+    Returns (runs, events): one row per run, and the throttling events.
+    """
+    df = without_placeholders(df.reset_index(drop=True))
+    df['Temperature'] = temperature(df)
+    groups = df[group_col]
+
+    rows = {}
+    for name, run in df.groupby(group_col, observed=True):
+        rows[name] = {
+            'duration_min': run['Time (Minutes)'].iloc[-1] - run['Time (Minutes)'].iloc[0],
+            'battery_start': run['battery_level_percentage'].iloc[0],
+            'temp_start': run['Temperature'].iloc[0],
+            'temp_max': run['Temperature'].max(),
+            **thermal_model.project_session(run['Time (Minutes)'], run['battery_level_percentage'],
+                                            run['Temperature'], session_minutes, thermal_limit),
+        }
+    runs = pd.DataFrame.from_dict(rows, orient='index')
+
+    if 'power_wattage' in df.columns:
+        watts = df['power_wattage'].astype(np.float64) / 1000
+        runs['power_w_mean'] = watts.groupby(groups, observed=True).mean()
+        runs['power_w_p95'] = watts.groupby(groups, observed=True).quantile(0.95)
+        runs['session_energy_wh'] = runs['power_w_mean'] * session_minutes / 60
+    current = df['battery_current_now_milliamps'] if 'battery_current_now_milliamps' in df.columns else None
+    if current is None or current.isna().all():
+        current = df['power_current'] if 'power_current' in df.columns else None
+    if current is not None:
+        runs['current_ma_mean'] = current.astype(np.float64).groupby(groups, observed=True).mean()
+
+    events = thermal_model.throttle_events(df, THROTTLE_SIGNALS, 'Temperature', 'Time (Minutes)', group_col)
+    counts = events.groupby(group_col, observed=True)['thermal'].agg(['size', 'sum']) if len(events) else None
+    runs['level_drops'] = counts['size'] if counts is not None else 0
+    runs['thermal_throttles'] = counts['sum'] if counts is not None else 0
+    runs[['level_drops', 'thermal_throttles']] = runs[['level_drops', 'thermal_throttles']].fillna(0).astype(int)
+
+    runs.index.name = group_col
+    return runs, events
+
+def describe_limit(minutes):
+    """Readable form of a minutes-until-limit projection."""
+    if np.isnan(minutes):
+        return 'n/a'
+    if minutes == 0:
+        return 'already reached'
+    if np.isinf(minutes):
+        return 'never'
+    return f"~{minutes:.0f} min"
+
+def print_thermal_report(runs, events, labels=None, session_minutes=thermal_model.SESSION_MINUTES,
+                         thermal_limit=thermal_model.THERMAL_LIMIT_C):
+    """Prints the fitted drain and heating per run and the session verdicts."""
+    print("\n" + "="*50)
+    print(f"--- THERMAL & BATTERY PROJECTION ({session_minutes:g}-MINUTE SESSION) ---")
+    print("="*50)
+
+    table = runs.drop(columns=['limited_by', 'survives', 'temp_model', 'minutes_to_empty',
+                               'minutes_to_thermal_limit']).copy()
+    if labels:
+        table.index = table.index.map(lambda x: labels.get(x, x))
+    table.rename(columns={
+        'duration_min': 'Run Length (min)',
+        'battery_start': 'Battery Start (%)',
+        'drain_pct_per_min': 'Fitted Drain (%/min)',
+        'battery_fit_r2': 'Drain Fit R²',
+        'battery_at_end': f'Battery at {session_minutes:g} min (%)',
+        'temp_start': 'Temp Start (°C)',
+        'temp_max': 'Temp Max (°C)',
+        'temp_rise_per_min': 'Temp Rise (°C/min)',
+        'temp_equilibrium': 'Temp Plateau (°C)',
+        'temp_tau_min': 'Heating Tau (min)',
+        'temp_fit_r2': 'Temp Fit R²',
+        'temp_at_end': f'Temp at {session_minutes:g} min (°C)',
+        'power_w_mean': 'Power Avg (W)',
+        'power_w_p95': 'Power P95 (W)',
+        'session_energy_wh': 'Session Energy (Wh)',
+        'current_ma_mean': 'Current Avg (mA)',
+        'level_drops': 'Clock/Level Drops',
+        'thermal_throttles': 'Thermal Throttles',
+    }, inplace=True)
+    print(table.T.to_string(float_format="%.2f"))
+    linear = runs.index[runs['temp_model'] == 'linear']
+    if len(linear):
+        names = [labels.get(n, n) if labels else n for n in linear]
+        print(f"  Temp Plateau is NaN for {', '.join(map(str, names))}: the temperature fits a straight "
+              "line (see Temp Rise), so no plateau is projected.")
+
+    print(f"\nSession verdicts (thermal limit {thermal_limit:g}°C, battery empty at "
+          f"{thermal_model.BATTERY_EMPTY_PCT:g}%):")
+    for name, row in runs.iterrows():
+        label = labels.get(name, name) if labels else name
+        if row['survives'] is None:
+            verdict = 'UNKNOWN (not enough data)'
+        elif row['survives']:
+            verdict = 'SURVIVES'
+        else:
+            verdict = f"FAILS ({row['limited_by']} limit)"
+        print(f"  {label}: {verdict} - empty {describe_limit(row['minutes_to_empty'])}, "
+              f"{thermal_limit:g}°C {describe_limit(row['minutes_to_thermal_limit'])}")
+
+    thermal = events[events['thermal']] if len(events) else events
+    if len(thermal):
+        print(f"\nThermal throttling events (level or clock drop at >= {thermal_model.THROTTLE_TEMP_C:g}°C):")
+        shown = thermal.rename(columns={'time': 'time_min', 'temperature': 'temperature_c'})
+        if labels:
+            run_col = shown.columns[0]
+            shown[run_col] = shown[run_col].astype(str).map(lambda x: labels.get(x, x))
+        print(shown.to_string(index=False, float_format="%.2f"))
+    print("="*50)
@@ -0,0 +1,116 @@
+"""Convert Quest performance text logs to the binary format (see quest_binary_log).
+
+Each input is parsed once with the batch reader, so multi-session logs keep
+their session boundaries and headers. With --verify the binary file is read
+back and compared with the text parse column by column.
+
+Usage:
+    python convert_quest_log.py QuestPerformanceLog.txt
+    python convert_quest_log.py logs/ -o binary_logs/ --verify
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+import quest_binary_log
+from quest_batch import collect_log_files, log_labels, read_quest_sessions
+
+COLUMNS = ['Time', 'Battery', 'Temperature', 'CPU_Level', 'GPU_Level',
+           'Memory_Allocated', 'Memory_Reserved', 'Scene', 'FPS', 'Frame_Spikes']
+
+def convert_text_log(text_path, binary_path):
+    """Write `text_path` as a binary log. Returns (samples, sessions) written."""
+    df, headers = read_quest_sessions(text_path)
+    if df is None:
+        raise ValueError(f"No samples in '{text_path}'.")
+
+    tmp_path = binary_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        writer = quest_binary_log.BinaryLogWriter(f)
+        for session, rows in df.groupby('Session', sort=True):
+            writer.begin_session(headers[session])
+            writer.append_frame(rows[COLUMNS])
+    os.replace(tmp_path, binary_path)
+    return len(df), len(headers)
+
+def verify(text_path, binary_path):
+    """True if the binary log reads back to the same sessions as the text log."""
+    expected, expected_headers = read_quest_sessions(text_path)
+    actual, actual_headers = quest_binary_log.read_binary_sessions(binary_path)
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+    except AssertionError as e:
+        print(f"  Mismatch: {e}")
+        return False
+    return expected_headers == actual_headers
+
+def output_paths(files, output):
+    """Binary log path of every text log.
+
+    Without `output` each binary log goes next to its text log. An output
+    directory mirrors the logs' directories below their common directory
+    (see quest_batch.log_labels), so logs with the same name in different
+    directories do not overwrite each other. Raises ValueError if two logs
+    would still map to one path.
+    """
+    to_directory = output is not None and (len(files) > 1 or os.path.isdir(output) or output.endswith(os.sep))
+    labels = log_labels(files)
+    paths = {}
+    for text_path in files:
+        if output is None:
+            paths[text_path] = os.path.splitext(text_path)[0] + '.qpl'
+        elif to_directory:
+            paths[text_path] = os.path.join(output, os.path.splitext(labels[text_path])[0] + '.qpl')
+        else:
+            paths[text_path] = output
+    targets = {}
+    for text_path, binary_path in paths.items():
+        other = targets.setdefault(os.path.abspath(binary_path), text_path)
+        if other != text_path:
+            raise ValueError(f"'{other}' and '{text_path}' would both be written to '{binary_path}'.")
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert Quest performance text logs to binary .qpl logs.")
+    parser.add_argument('paths', nargs='+', help="log files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default=None,
+                        help="output file (single input) or directory (default: next to each log)")
+    parser.add_argument('--verify', action='store_true', help="read each binary log back and compare")
+    args = parser.parse_args()
+
+    files = [f for f in collect_log_files(args.paths) if not quest_binary_log.is_binary_log(f)]
+    if not files:
+        print("No text logs found.")
+        sys.exit(1)
+    try:
+        binary_paths = output_paths(files, args.output)
+    except ValueError as e:
+        print(f"FATAL ERROR: {e}")
+        sys.exit(1)
+
+    failed = 0
+    for text_path in files:
+        binary_path = binary_paths[text_path]
+        try:
+            os.makedirs(os.path.dirname(binary_path) or '.', exist_ok=True)
+            start = time.perf_counter()
+            samples, sessions = convert_text_log(text_path, binary_path)
+            elapsed = time.perf_counter() - start
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            print(f"Error converting {text_path}: {e}")
+            failed += 1
+            continue
+        ratio = os.path.getsize(text_path) / os.path.getsize(binary_path)
+        print(f"{os.path.basename(text_path)} -> {binary_path}: {samples} samples, {sessions} session(s), "
+              f"{ratio:.1f}x smaller, {elapsed:.2f}s")
+        if args.verify:
+            if verify(text_path, binary_path):
+                print("  Verified: identical to the text parse.")
+            else:
+                print("  Verification FAILED.")
+                failed += 1
+    sys.exit(1 if failed else 0)
@@ -1,61 +1,185 @@
 # log_file_path = ".\QuestPerformanceLog_2025-10-19_15-45-15[1].txt"
 
 import re
+import os
+import sys
+import json
+import array
+import hashlib
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
 import numpy as np
 
-def parse_quest_log(file_path):
-    """Parse the Quest performance log file and extract metrics."""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import parse_cache
+import quest_binary_log
+import stage_profiler
+from stage_profiler import stage
+from decimation import decimate_frame, METHODS as DECIMATION_METHODS
+import thermal_model
+import memory_trend
+import anomaly_detection
+import html_report
+from scene_segments import SceneIndex, scene_breakdown, format_scene_breakdown
+
+# Parsed logs are cached here; bump QUEST_CACHE_KIND when the parser output changes
+CACHE_DIR = parse_cache.DEFAULT_CACHE_DIR
+QUEST_CACHE_KIND = 'quest-log-v2'
+
+# Time-series plots with more samples than this are decimated before drawing;
+# 'minmax' keeps every bucket's extremes so FPS dips and spikes stay visible
+MAX_PLOT_POINTS = 4000
+DECIMATION_METHOD = 'minmax'
+
+# Session header fields, matched against each line until first found
+SESSION_INFO_PATTERNS = {
+    'start_time': re.compile(r'Session Start Time: (.+)'),
+    'device': re.compile(r'Device Model: (.+)'),
+    'os': re.compile(r'Operating System: (.+)'),
+    'gpu': re.compile(r'GPU: (.+)'),
+    'refresh_rate': re.compile(r'Display Refresh Rate: ([\d.]+)'),
+}
+
+# One metrics line written by the on-device logger
+LOG_LINE_PATTERN = re.compile(r'Time: (\d{2}):(\d{2}):(\d{2}), Battery: (\d+)%, Temp: ([\d.]+)°C, CPU: (\d+), GPU: (\d+), MemAlloc: (\d+)MB, MemReserved: (\d+)MB, Scene: ([^,]+), FPS: ([\d.]+), FrameSpikes: (\d+)')
+
+# Numeric DataFrame columns: (column name, regex group, array typecode)
+NUMERIC_COLUMNS = [
+    ('Battery', 4, 'q'),
+    ('Temperature', 5, 'd'),
+    ('CPU_Level', 6, 'q'),
+    ('GPU_Level', 7, 'q'),
+    ('Memory_Allocated', 8, 'q'),
+    ('Memory_Reserved', 9, 'q'),
+    ('FPS', 11, 'd'),
+    ('Frame_Spikes', 12, 'q'),
+]
+
+COLUMN_ORDER = ['Time', 'Battery', 'Temperature', 'CPU_Level', 'GPU_Level',
+                'Memory_Allocated', 'Memory_Reserved', 'Scene', 'FPS', 'Frame_Spikes']
+
+def new_column_buffers():
+    """Create empty typed column buffers for streamed log samples."""
+    buffers = {name: array.array(typecode) for name, _, typecode in NUMERIC_COLUMNS}
+    buffers['Time'] = []
+    buffers['Scene'] = []
+    buffers['_clock'] = array.array('q')  # seconds since midnight
+    buffers['_scenes'] = {}               # interned scene names
+    return buffers
+
+def append_log_line(buffers, line):
+    """Parse one log line into the column buffers. Returns the number of samples added."""
+    added = 0
+    for m in LOG_LINE_PATTERN.finditer(line):
+        hours, minutes, seconds = m.group(1), m.group(2), m.group(3)
+        buffers['Time'].append(f"{hours}:{minutes}:{seconds}")
+        buffers['_clock'].append(int(hours) * 3600 + int(minutes) * 60 + int(seconds))
+        scene = m.group(10)
+        buffers['Scene'].append(buffers['_scenes'].setdefault(scene, scene))
+        for name, group, typecode in NUMERIC_COLUMNS:
+            value = m.group(group)
+            buffers[name].append(float(value) if typecode == 'd' else int(value))
+        added += 1
+    return added
+
+def buffers_to_dataframe(buffers):
+    """Build the log DataFrame (including 'Seconds') from filled column buffers."""
+    data = {}
+    for name in COLUMN_ORDER:
+        column = buffers[name]
+        data[name] = np.frombuffer(column, dtype=column.typecode) if isinstance(column, array.array) else column
+    df = pd.DataFrame(data)
+    
+    # Seconds from the first sample, taken from the already-parsed clock values
+    # and unwrapped where the log crosses midnight
+    clock = np.frombuffer(buffers['_clock'], dtype=np.int64)
+    df['Seconds'] = quest_binary_log.session_seconds(clock)
+    
+    return df
+
+def read_quest_log(file_path):
+    """Stream a Quest performance log into a DataFrame and session header matches.
+    
+    The file is read line by line into typed column buffers, so peak memory
+    follows the size of the parsed data rather than the size of the log.
+    """
+    
+    session_info = {key: None for key in SESSION_INFO_PATTERNS}
+    pending_info = dict(SESSION_INFO_PATTERNS)
+    buffers = new_column_buffers()
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open(file_path, 'r', encoding='utf-8') as f, stage('scan log lines'):
+            for line in f:
+                if pending_info:
+                    for key, info_pattern in list(pending_info.items()):
+                        match = info_pattern.search(line)
+                        if match:
+                            session_info[key] = match
+                            del pending_info[key]
+                append_log_line(buffers, line)
     except FileNotFoundError:
         print(f"Error: The file '{file_path}' was not found.")
         return None, None
     
-    # Extract session info
-    session_info = {}
-    session_info['start_time'] = re.search(r'Session Start Time: (.+)', content)
-    session_info['device'] = re.search(r'Device Model: (.+)', content)
-    session_info['os'] = re.search(r'Operating System: (.+)', content)
-    session_info['gpu'] = re.search(r'GPU: (.+)', content)
-    session_info['refresh_rate'] = re.search(r'Display Refresh Rate: ([\d.]+)', content)
+    if not buffers['Time']:
+        print("No data found in the log file! Please check the log format.")
+        return None, None
     
-    # Extract all metrics from log lines
-    pattern = r'Time: (\d{2}:\d{2}:\d{2}), Battery: (\d+)%, Temp: ([\d.]+)°C, CPU: (\d+), GPU: (\d+), MemAlloc: (\d+)MB, MemReserved: (\d+)MB, Scene: ([^,]+), FPS: ([\d.]+), FrameSpikes: (\d+)'
+    with stage('build DataFrame'):
+        df = buffers_to_dataframe(buffers)
     
-    matches = re.findall(pattern, content)
+    return df, session_info
+
+def session_info_to_lines(session_info):
+    """Reduce session header matches to their matched text (picklable and JSON-safe)."""
+    return {key: m.group(0) for key, m in session_info.items() if m}
+
+def session_info_from_lines(header_lines):
+    """Rebuild session header matches from text saved by session_info_to_lines."""
+    session_info = {key: None for key in SESSION_INFO_PATTERNS}
+    for key, line in header_lines.items():
+        session_info[key] = SESSION_INFO_PATTERNS[key].search(line)
+    return session_info
+
+def parse_quest_log(file_path, cache_dir=None):
+    """Parse the Quest performance log file and extract metrics.
+    
+    With `cache_dir` set, the parsed frame is stored in (and later memory-mapped
+    from) the columnar parse cache. Session header lines are cached as text and
+    re-matched, so `session_info` holds the same match objects either way.
+    Binary logs (see quest_binary_log) are memory-mapped directly and never
+    cached.
+    """
     
-    if not matches:
-        print("No data found in the log file! Please check the log format.")
-        return None, None
+    if quest_binary_log.is_binary_log(file_path):
+        df, header_lines = quest_binary_log.read_binary_log(file_path)
+        if df is None:
+            print("No data found in the log file! Please check the log format.")
+            return None, None
+        return df, session_info_from_lines(header_lines)
     
-    # Create DataFrame
-    data = {
-        'Time': [m[0] for m in matches],
-        'Battery': [int(m[1]) for m in matches],
-        'Temperature': [float(m[2]) for m in matches],
-        'CPU_Level': [int(m[3]) for m in matches],
-        'GPU_Level': [int(m[4]) for m in matches],
-        'Memory_Allocated': [int(m[5]) for m in matches],
-        'Memory_Reserved': [int(m[6]) for m in matches],
-        'Scene': [m[7] for m in matches],
-        'FPS': [float(m[8]) for m in matches],
-        'Frame_Spikes': [int(m[9]) for m in matches]
-    }
+    if cache_dir is None:
+        return read_quest_log(file_path)
     
-    df = pd.DataFrame(data)
+    def parse_for_cache(path):
+        df, session_info = read_quest_log(path)
+        if df is None:
+            return None, None
+        return df, session_info_to_lines(session_info)
     
-    # Convert time to seconds from start for easier plotting
-    times = pd.to_datetime(df['Time'], format='%H:%M:%S')
-    df['Seconds'] = (times - times.iloc[0]).dt.total_seconds()
+    df, header_lines = parse_cache.cached_parse(file_path, QUEST_CACHE_KIND, parse_for_cache, cache_dir)
+    if df is None:
+        return None, None
     
-    return df, session_info
+    return df, session_info_from_lines(header_lines)
 
-def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png'):
+def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png', dpi=300,
+                        max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
     """Figure 1: FPS Performance Analysis."""
     
     fig, axes = plt.subplots(2, 3, figsize=(18, 10))
@@ -68,13 +192,17 @@ def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png'
     fig.text(0.01, 0.98, info_text, fontsize=9, ha='left', 
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
-    x = df['Seconds'].values
+    ts = decimate_frame(df, 'Seconds', ['FPS', 'Frame_Spikes', 'Temperature'], max_points, decimation)
+    x = ts['Seconds'].values
+    # Detected on every sample, before decimation
+    events = anomaly_detection.detect_anomalies(df, 'Seconds', ['FPS', 'Frame_Spikes'])
     
-    # 1. FPS Over Time
+    # 1. FPS Over Time (anomalous drops shaded)
     ax = axes[0, 0]
-    ax.plot(x, df['FPS'], color='#2ecc71', linewidth=2, marker='o', markersize=4)
+    anomaly_detection.annotate_events(ax, events, 'FPS')
+    ax.plot(x, ts['FPS'], color='#2ecc71', linewidth=2, marker='o', markersize=4)
     ax.axhline(y=72, color='r', linestyle='--', label='Target (72 FPS)', alpha=0.7)
-    ax.fill_between(x, df['FPS'], alpha=0.3, color='#2ecc71')
+    ax.fill_between(x, ts['FPS'], alpha=0.3, color='#2ecc71')
     ax.set_title('FPS Performance', fontweight='bold')
     ax.set_xlabel('Time (seconds)')
     ax.set_ylabel('FPS')
@@ -93,7 +221,7 @@ def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png'
     
     # 3. FPS vs Temperature
     ax = axes[0, 2]
-    scatter = ax.scatter(df['Temperature'], df['FPS'], c=df['Frame_Spikes'], 
+    scatter = ax.scatter(ts['Temperature'], ts['FPS'], c=ts['Frame_Spikes'], 
                         cmap='RdYlGn_r', s=100, alpha=0.6, edgecolors='black')
     ax.set_title('FPS vs Temperature', fontweight='bold')
     ax.set_xlabel('Temperature (°C)')
@@ -102,10 +230,15 @@ def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png'
     cbar.set_label('Frame Spikes')
     ax.grid(True, alpha=0.3)
     
-    # 4. Frame Spikes
+    # 4. Frame Spikes (anomalous bursts shaded)
     ax = axes[1, 0]
-    colors = ['#e74c3c' if s > 10 else '#f39c12' if s > 5 else '#3498db' for s in df['Frame_Spikes']]
-    ax.bar(x, df['Frame_Spikes'], color=colors, alpha=0.7)
+    anomaly_detection.annotate_events(ax, events, 'Frame_Spikes')
+    colors = ['#e74c3c' if s > 10 else '#f39c12' if s > 5 else '#3498db' for s in ts['Frame_Spikes']]
+    if len(ts) == len(df):
+        ax.bar(x, ts['Frame_Spikes'], color=colors, alpha=0.7)
+    else:
+        # Bars would be sub-pixel wide on a decimated timeline; lines always show
+        ax.vlines(x, 0, ts['Frame_Spikes'], colors=colors, alpha=0.7)
     ax.set_title('Frame Spikes Count', fontweight='bold')
     ax.set_xlabel('Time (seconds)')
     ax.set_ylabel('Spike Count')
@@ -118,22 +251,24 @@ def create_fps_analysis(df, session_info, output_path='figure1_fps_analysis.png'
     axes[1, 2].axis('off')
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 1 saved to: {output_path}")
     plt.close()
 
-def create_cpu_gpu_analysis(df, output_path='figure2_cpu_gpu_analysis.png'):
+def create_cpu_gpu_analysis(df, output_path='figure2_cpu_gpu_analysis.png', dpi=300,
+                            max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
     """Figure 2: CPU and GPU Performance Levels."""
     
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     fig.suptitle('Figure 2: CPU & GPU Performance Levels', fontsize=16, fontweight='bold')
     
-    x = df['Seconds'].values
+    ts = decimate_frame(df, 'Seconds', ['CPU_Level', 'GPU_Level'], max_points, decimation)
+    x = ts['Seconds'].values
     
     # 1. CPU Level
     ax = axes[0]
-    ax.plot(x, df['CPU_Level'], color='#3498db', linewidth=2.5, marker='o', markersize=6)
-    ax.fill_between(x, df['CPU_Level'], alpha=0.3, color='#3498db')
+    ax.plot(x, ts['CPU_Level'], color='#3498db', linewidth=2.5, marker='o', markersize=6)
+    ax.fill_between(x, ts['CPU_Level'], alpha=0.3, color='#3498db')
     ax.set_title('CPU Performance Level', fontweight='bold', fontsize=14)
     ax.set_xlabel('Time (seconds)', fontsize=12)
     ax.set_ylabel('CPU Level', fontsize=12)
@@ -146,8 +281,8 @@ def create_cpu_gpu_analysis(df, output_path='figure2_cpu_gpu_analysis.png'):
     
     # 2. GPU Level
     ax = axes[1]
-    ax.plot(x, df['GPU_Level'], color='#e74c3c', linewidth=2.5, marker='s', markersize=6)
-    ax.fill_between(x, df['GPU_Level'], alpha=0.3, color='#e74c3c')
+    ax.plot(x, ts['GPU_Level'], color='#e74c3c', linewidth=2.5, marker='s', markersize=6)
+    ax.fill_between(x, ts['GPU_Level'], alpha=0.3, color='#e74c3c')
     ax.set_title('GPU Performance Level', fontweight='bold', fontsize=14)
     ax.set_xlabel('Time (seconds)', fontsize=12)
     ax.set_ylabel('GPU Level', fontsize=12)
@@ -159,25 +294,27 @@ def create_cpu_gpu_analysis(df, output_path='figure2_cpu_gpu_analysis.png'):
     ax.legend(fontsize=10)
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 2 saved to: {output_path}")
     plt.close()
 
-def create_memory_analysis(df, output_path='figure3_memory_analysis.png'):
+def create_memory_analysis(df, output_path='figure3_memory_analysis.png', dpi=300,
+                           max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
     """Figure 3: Memory Usage Analysis."""
     
     fig, ax = plt.subplots(1, 1, figsize=(12, 6))
     fig.suptitle('Figure 3: Memory Usage Analysis', fontsize=16, fontweight='bold')
     
-    x = df['Seconds'].values
+    ts = decimate_frame(df, 'Seconds', ['Memory_Allocated', 'Memory_Reserved'], max_points, decimation)
+    x = ts['Seconds'].values
     
     # Memory plot
-    ax.plot(x, df['Memory_Allocated'], label='Allocated', color='#1abc9c', 
+    ax.plot(x, ts['Memory_Allocated'], label='Allocated', color='#1abc9c', 
             linewidth=2.5, marker='o', markersize=6)
-    ax.plot(x, df['Memory_Reserved'], label='Reserved', color='#34495e', 
+    ax.plot(x, ts['Memory_Reserved'], label='Reserved', color='#34495e', 
             linewidth=2.5, marker='s', markersize=6)
-    ax.fill_between(x, df['Memory_Allocated'], alpha=0.2, color='#1abc9c')
-    ax.fill_between(x, df['Memory_Reserved'], alpha=0.2, color='#34495e')
+    ax.fill_between(x, ts['Memory_Allocated'], alpha=0.2, color='#1abc9c')
+    ax.fill_between(x, ts['Memory_Reserved'], alpha=0.2, color='#34495e')
     
     ax.set_title('Memory Allocation Over Time', fontweight='bold', fontsize=14)
     ax.set_xlabel('Time (seconds)', fontsize=12)
@@ -199,22 +336,26 @@ def create_memory_analysis(df, output_path='figure3_memory_analysis.png'):
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 3 saved to: {output_path}")
     plt.close()
 
-def create_thermal_battery_analysis(df, output_path='figure4_thermal_battery_analysis.png'):
+def create_thermal_battery_analysis(df, output_path='figure4_thermal_battery_analysis.png', dpi=300,
+                                    max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
     """Figure 4: Device Temperature and Battery Levels."""
     
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     fig.suptitle('Figure 4: Thermal & Battery Performance', fontsize=16, fontweight='bold')
     
-    x = df['Seconds'].values
+    ts = decimate_frame(df, 'Seconds', ['Temperature', 'Battery'], max_points, decimation)
+    x = ts['Seconds'].values
     
-    # 1. Temperature
+    # 1. Temperature (anomalous jumps shaded)
     ax = axes[0]
-    ax.plot(x, df['Temperature'], color='#e67e22', linewidth=2.5, marker='o', markersize=6)
-    ax.fill_between(x, df['Temperature'], alpha=0.3, color='#e67e22')
+    anomaly_detection.annotate_events(ax, anomaly_detection.detect_anomalies(df, 'Seconds', ['Temperature']),
+                                      'Temperature')
+    ax.plot(x, ts['Temperature'], color='#e67e22', linewidth=2.5, marker='o', markersize=6)
+    ax.fill_between(x, ts['Temperature'], alpha=0.3, color='#e67e22')
     ax.axhline(y=40, color='r', linestyle='--', linewidth=2, label='High Temp (40°C)', alpha=0.7)
     ax.axhline(y=35, color='orange', linestyle=':', linewidth=2, label='Caution (35°C)', alpha=0.7)
     ax.set_title('Device Temperature', fontweight='bold', fontsize=14)
@@ -234,8 +375,8 @@ def create_thermal_battery_analysis(df, output_path='figure4_thermal_battery_ana
     
     # 2. Battery
     ax = axes[1]
-    ax.plot(x, df['Battery'], color='#9b59b6', linewidth=2.5, marker='o', markersize=6)
-    ax.fill_between(x, df['Battery'], alpha=0.3, color='#9b59b6')
+    ax.plot(x, ts['Battery'], color='#9b59b6', linewidth=2.5, marker='o', markersize=6)
+    ax.fill_between(x, ts['Battery'], alpha=0.3, color='#9b59b6')
     ax.set_title('Battery Level', fontweight='bold', fontsize=14)
     ax.set_xlabel('Time (seconds)', fontsize=12)
     ax.set_ylabel('Battery (%)', fontsize=12)
@@ -258,11 +399,11 @@ def create_thermal_battery_analysis(df, output_path='figure4_thermal_battery_ana
             bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.5))
     
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 4 saved to: {output_path}")
     plt.close()
 
-def create_statistics_summary(df, output_path='figure5_statistics_summary.png'):
+def create_statistics_summary(df, output_path='figure5_statistics_summary.png', dpi=300):
     """Figure 5: A dedicated figure for the performance statistics summary."""
     
     fig, ax = plt.subplots(figsize=(8, 7))
@@ -302,29 +443,31 @@ def create_statistics_summary(df, output_path='figure5_statistics_summary.png'):
             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.4))
             
     plt.tight_layout(rect=[0, 0, 1, 0.95])
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 5 saved to: {output_path}")
     plt.close()
 
-def create_combined_performance_plot(df, output_path='figure6_combined_performance.png'):
+def create_combined_performance_plot(df, output_path='figure6_combined_performance.png', dpi=300,
+                                     max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
     """Figure 6: Combined timeline of FPS, Temperature, and Battery."""
     
     fig, ax1 = plt.subplots(figsize=(12, 7))
     
     fig.suptitle('Performance Metrics for Perceptual Pathways on Meta Quest: \nFramerate (FPS), Device Temperature, and Battery Consumption', fontsize=20, fontweight='bold')
     
-    x = df['Seconds'].values
+    ts = decimate_frame(df, 'Seconds', ['FPS', 'Battery', 'Temperature'], max_points, decimation)
+    x = ts['Seconds'].values
     
     ax2 = ax1.twinx()
     
-    p1, = ax1.plot(x, df['FPS'], color="#96d8f1", label='FPS', linewidth=3.5)
+    p1, = ax1.plot(x, ts['FPS'], color="#96d8f1", label='FPS', linewidth=3.5)
     ax1.set_xlabel('Time (seconds)', fontsize=20,  fontweight='bold')
     ax1.set_ylabel('FPS / Battery (%)', fontsize=20, color='black', fontweight='bold')
     ax1.set_ylim(0, 100)
     
-    p2, = ax1.plot(x, df['Battery'], color='#9b59b6', label='Battery', linewidth=3.5, linestyle='--')
+    p2, = ax1.plot(x, ts['Battery'], color='#9b59b6', label='Battery', linewidth=3.5, linestyle='--')
     
-    p3, = ax2.plot(x, df['Temperature'], color="#e6abdb", label='Temperature', linewidth=3.5)
+    p3, = ax2.plot(x, ts['Temperature'], color="#e6abdb", label='Temperature', linewidth=3.5)
     ax2.set_ylabel('Temperature (°C)', fontsize=17, color='black', fontweight='bold')
 
     # --- MODIFIED SECTION: Adjusting tick label properties ---
@@ -345,11 +488,135 @@ def create_combined_performance_plot(df, output_path='figure6_combined_performan
     ax1.grid(True, alpha=0.3)
     fig.tight_layout(rect=[0, 0.03, 1, 0.95])
     
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"Figure 6 saved to: {output_path}")
     plt.close()
 
 
+# --- Figure Rendering Pipeline ---
+
+# Figures drawn by render_figures:
+# (file stem, function, columns it reads, takes session_info, draws time series)
+FIGURES = [
+    ('figure1_fps_analysis', create_fps_analysis, ['Seconds', 'FPS', 'Temperature', 'Frame_Spikes'], True, True),
+    ('figure2_cpu_gpu_analysis', create_cpu_gpu_analysis, ['Seconds', 'CPU_Level', 'GPU_Level'], False, True),
+    ('figure3_memory_analysis', create_memory_analysis, ['Seconds', 'Memory_Allocated', 'Memory_Reserved'], False, True),
+    ('figure4_thermal_battery_analysis', create_thermal_battery_analysis, ['Seconds', 'Temperature', 'Battery'], False, True),
+    ('figure5_statistics_summary', create_statistics_summary,
+     ['FPS', 'Frame_Spikes', 'Temperature', 'Battery', 'Memory_Allocated', 'Memory_Reserved'], False, False),
+    ('figure6_combined_performance', create_combined_performance_plot, ['Seconds', 'FPS', 'Battery', 'Temperature'], False, True),
+]
+
+# Input hashes of the last render, kept next to the figures
+FIGURE_MANIFEST = '.figure_manifest.json'
+
+# Bump when figure code changes so existing renders are redrawn
+RENDER_VERSION = 3
+
+PREVIEW_DPI = 100
+PUBLICATION_DPI = 300
+
+def figure_input_hash(df, header_lines, dpi, fmt, options=None):
+    """Hash everything a figure is drawn from: its columns, header text and output settings."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(json.dumps([list(df.columns), header_lines, dpi, fmt, options, RENDER_VERSION],
+                             sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def render_figure(func, df, header_lines, output_path, dpi, options):
+    """Draw one figure on the headless Agg backend (runs inside a worker process)."""
+    plt.switch_backend('Agg')
+    if header_lines is None:
+        func(df, output_path=output_path, dpi=dpi, **options)
+    else:
+        func(df, session_info_from_lines(header_lines), output_path=output_path, dpi=dpi, **options)
+    return output_path
+
+def render_figures(df, session_info, output_dir='.', fmt='png', dpi=PUBLICATION_DPI, workers=None, force=False,
+                   max_points=MAX_PLOT_POINTS, decimation=DECIMATION_METHOD):
+    """Render all figures in parallel worker processes, skipping unchanged ones.
+    
+    A figure is skipped when its output file exists and the hash of its input
+    columns, session header and output settings matches the last render.
+    Returns the list of output paths.
+    """
+    manifest_path = os.path.join(output_dir, FIGURE_MANIFEST)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    
+    header_lines = session_info_to_lines(session_info)
+    output_paths, jobs = [], []
+    for stem, func, columns, needs_info, time_series in FIGURES:
+        output_path = os.path.join(output_dir, f"{stem}.{fmt}")
+        output_paths.append(output_path)
+        
+        fig_df = df[columns]
+        fig_header = header_lines if needs_info else None
+        options = {'max_points': max_points, 'decimation': decimation} if time_series else {}
+        input_hash = figure_input_hash(fig_df, fig_header, dpi, fmt, options)
+        if not force and manifest.get(output_path) == input_hash and os.path.exists(output_path):
+            print(f"Unchanged, skipping: {output_path}")
+            continue
+        jobs.append((output_path, input_hash, (func, fig_df, fig_header, output_path, dpi, options)))
+    
+    if workers == 1 or len(jobs) <= 1:
+        for output_path, input_hash, job in jobs:
+            with stage(os.path.basename(output_path)):
+                render_figure(*job)
+            manifest[output_path] = input_hash
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(output_path, input_hash, pool.submit(render_figure, *job))
+                       for output_path, input_hash, job in jobs]
+            for output_path, input_hash, future in futures:
+                future.result()
+                manifest[output_path] = input_hash
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return output_paths
+
+# Interactive HTML report panels: (title, unit, columns)
+HTML_PANELS = [
+    ('Frame Rate', 'FPS', ['FPS']),
+    ('Frame Spikes', 'count', ['Frame_Spikes']),
+    ('CPU / GPU Level', 'level', ['CPU_Level', 'GPU_Level']),
+    ('Memory', 'MB', ['Memory_Allocated', 'Memory_Reserved']),
+    ('Temperature', '°C', ['Temperature']),
+    ('Battery', '%', ['Battery']),
+]
+
+def create_html_report(df, session_info, report, output_path):
+    """Write an interactive HTML report: zoomable multi-resolution charts plus the text report.
+    
+    Anomaly events are shaded on the charts of their metric. Returns the file size.
+    """
+    events = anomaly_detection.detect_anomalies(df, 'Seconds')
+    seconds = df['Seconds'].to_numpy()
+    panels = []
+    for title, unit, columns in HTML_PANELS:
+        series = []
+        for column in columns:
+            metric_events = events[events['metric'] == column]
+            series.append({
+                'label': column.replace('_', ' '),
+                'x': seconds,
+                'y': df[column].to_numpy(),
+                'events': zip(metric_events['start_s'], metric_events['end_s'], metric_events['severity']),
+            })
+        panels.append({'title': title, 'unit': unit, 'series': series})
+
+    subtitle = ' | '.join(f"{label}: {session_info[key].group(1)}"
+                          for key, label in [('device', 'Device'), ('start_time', 'Session start'),
+                                             ('refresh_rate', 'Refresh rate (Hz)')] if session_info.get(key))
+    return html_report.write_report(output_path, 'Quest Performance Analysis', panels,
+                                    [('Analysis Report', report)], subtitle=subtitle)
+
 def generate_report(df, session_info):
     """Generate a text report with analysis."""
     
@@ -430,13 +697,58 @@ def generate_report(df, session_info):
             report += f"Estimated Time Remaining: {estimated_time:.0f} minutes\n"
     report += "\n"
     
+    # Session projection from fits over every sample
+    with stage('session projection'):
+        projection = thermal_model.project_session(df['Seconds'] / 60, df['Battery'], df['Temperature'])
+    session_minutes = thermal_model.SESSION_MINUTES
+    report += f"{session_minutes:g}-MINUTE SESSION PROJECTION:\n"
+    report += "─" * 60 + "\n"
+    if projection['survives'] is None:
+        report += "Not enough samples to fit battery drain and heating.\n\n"
+    else:
+        report += f"Fitted Drain Rate: {projection['drain_pct_per_min']:.2f}% per minute (R² {projection['battery_fit_r2']:.2f})\n"
+        report += f"Projected Battery at {session_minutes:g} min: {projection['battery_at_end']:.0f}%\n"
+        if projection['temp_model'] == 'newton':
+            report += (f"Heating Model: plateau {projection['temp_equilibrium']:.1f}°C, "
+                       f"time constant {projection['temp_tau_min']:.1f} min\n")
+        else:
+            report += f"Heating Model: linear, {projection['temp_rise_per_min']:+.2f}°C per minute\n"
+        report += f"Projected Temperature at {session_minutes:g} min: {projection['temp_at_end']:.1f}°C\n"
+        for label, minutes in (('Battery empty', projection['minutes_to_empty']),
+                               (f"{thermal_model.THERMAL_LIMIT_C:g}°C reached", projection['minutes_to_thermal_limit'])):
+            if minutes == 0:
+                report += f"{label}: already at the start of the session\n"
+            elif np.isinf(minutes):
+                report += f"{label}: not within the fitted trend\n"
+            else:
+                report += f"{label}: ~{minutes:.0f} minutes into the session\n"
+        if projection['survives']:
+            report += f"✓ A {session_minutes:g}-minute session is projected to complete.\n\n"
+        else:
+            report += (f"⚠️  WARNING: A {session_minutes:g}-minute session is projected to hit the "
+                       f"{projection['limited_by']} limit first.\n\n")
+    
     # Memory Analysis
     report += "MEMORY USAGE:\n"
     report += "─" * 60 + "\n"
     report += f"Average Allocated: {df['Memory_Allocated'].mean():.0f} MB\n"
     report += f"Average Reserved: {df['Memory_Reserved'].mean():.0f} MB\n"
     memory_efficiency = (df['Memory_Allocated'].mean() / df['Memory_Reserved'].mean()) * 100 if df['Memory_Reserved'].mean() > 0 else 0
-    report += f"Memory Efficiency: {memory_efficiency:.1f}%\n\n"
+    report += f"Memory Efficiency: {memory_efficiency:.1f}%\n"
+    
+    # Steady growth with scene-load steps taken out
+    for column, label in (('Memory_Allocated', 'Allocated'), ('Memory_Reserved', 'Reserved')):
+        with stage(f'memory trend {label}'):
+            trend = memory_trend.growth_trend(df['Seconds'] / 60, df[column], df['Scene'])
+        if trend is None:
+            continue
+        report += (f"{label} Growth: {trend['steady_mb_per_min']:+.2f} MB/min steady, "
+                   f"{trend['steps']} scene/load step(s) totalling {trend['step_total_mb']:+.0f} MB\n")
+        if memory_trend.leak_suspected(trend):
+            projected, _ = memory_trend.project_growth(trend, thermal_model.SESSION_MINUTES)
+            report += (f"⚠️  WARNING: {label} memory keeps growing between scene loads; "
+                       f"~{projected:.0f} MB projected at {thermal_model.SESSION_MINUTES:g} min.\n")
+    report += "\n"
     
     # Performance Levels
     report += "CPU/GPU PERFORMANCE LEVELS:\n"
@@ -444,6 +756,28 @@ def generate_report(df, session_info):
     report += f"Average CPU Level: {df['CPU_Level'].mean():.2f}\n"
     report += f"Average GPU Level: {df['GPU_Level'].mean():.2f}\n\n"
     
+    # Per-scene breakdown
+    with stage('scene breakdown'):
+        scenes = scene_breakdown(df, SceneIndex.from_frame(df), target_fps)
+    report += "PER-SCENE BREAKDOWN:\n"
+    report += "─" * 60 + "\n"
+    report += format_scene_breakdown(scenes, target_fps) + "\n"
+    
+    # Anomalies against each metric's own rolling baseline
+    with stage('anomaly detection'):
+        events = anomaly_detection.detect_anomalies(df, 'Seconds')
+    report += "ANOMALY EVENTS:\n"
+    report += "─" * 60 + "\n"
+    if not events.empty:
+        counts = events.groupby(['metric', 'severity']).size().unstack(fill_value=0)
+        for metric, row in counts.iterrows():
+            report += f"{metric}: " + ", ".join(f"{n} {grade}" for grade, n in row.items() if n) + "\n"
+        # Scene of each event from its first sample
+        first_rows = np.searchsorted(df['Seconds'].to_numpy(), events['start_s'].to_numpy())
+        events.insert(1, 'Scene', df['Scene'].to_numpy()[first_rows])
+        report += "Most severe:\n"
+    report += anomaly_detection.format_events(events) + "\n"
+    
     # Recommendations
     report += "RECOMMENDATIONS:\n"
     report += "─" * 60 + "\n"
@@ -461,6 +795,15 @@ def generate_report(df, session_info):
     if memory_efficiency > 85:
         report += "• Memory usage is high relative to reserved amount. Consider optimizing asset loading/unloading.\n"
         recommendations_found = True
+    critical_drops = events[(events['metric'] == 'FPS') & (events['severity'] == 'critical')]
+    if len(critical_drops):
+        report += (f"• {len(critical_drops)} sudden FPS collapse(s) detected, e.g. at {critical_drops['start_s'].iloc[0]:.0f}s "
+                   f"in '{critical_drops['Scene'].iloc[0]}'. Check for loading hitches or GC stalls there.\n")
+        recommendations_found = True
+    if len(scenes) > 1 and scenes['excess_ms'].iloc[0] > 0:
+        report += (f"• Scene '{scenes.index[0]}' is the most costly ({scenes['frame_time_ms'].iloc[0]:.1f} ms per frame). "
+                   "Start optimisation there.\n")
+        recommendations_found = True
     
     if not recommendations_found:
         report += "✓ Performance is stable! No major issues detected based on current thresholds.\n"
@@ -471,56 +814,97 @@ def generate_report(df, session_info):
 
 # Main execution
 if __name__ == "__main__":
-    # Change this to your log file path
-    log_file_path = "QuestPerformanceLog_2025-10-20_12-46-09[1].txt"
-    
-    print("Parsing Quest performance log...")
-    df, session_info = parse_quest_log(log_file_path)
-    
-    if df is not None:
-        print(f"Successfully parsed {len(df)} data points.\n")
-        
-        # Generate all figures
-        print("Creating Figure 1: FPS Performance Analysis...")
-        create_fps_analysis(df, session_info)
-        
-        print("Creating Figure 2: CPU & GPU Analysis...")
-        create_cpu_gpu_analysis(df)
-        
-        print("Creating Figure 3: Memory Usage Analysis...")
-        create_memory_analysis(df)
-        
-        print("Creating Figure 4: Thermal & Battery Analysis...")
-        create_thermal_battery_analysis(df)
-        
-        print("Creating Figure 5: Statistics Summary...")
-        create_statistics_summary(df)
-
-        print("Creating Figure 6: Combined Performance Timeline...")
-        create_combined_performance_plot(df)
-        
-        # Generate text report
-        print("\nGenerating analysis report...")
-        report = generate_report(df, session_info)
-        print(report)
+    parser = argparse.ArgumentParser(description="Analyse a Meta Quest performance log.")
+    # Change this default to your log file path
+    parser.add_argument('log_file', nargs='?', default="QuestPerformanceLog_2025-10-20_12-46-09[1].txt",
+                        help="Quest performance log to analyse")
+    parser.add_argument('--format', default='png', help="figure file format, e.g. png, svg or pdf")
+    parser.add_argument('--dpi', type=int, default=PUBLICATION_DPI, help="figure resolution")
+    parser.add_argument('--preview', action='store_true',
+                        help=f"fast {PREVIEW_DPI}-DPI preview render (overrides --dpi)")
+    parser.add_argument('--workers', type=int, default=None, help="figure rendering processes")
+    parser.add_argument('--force', action='store_true', help="re-render figures even if unchanged")
+    parser.add_argument('--max-points', type=int, default=MAX_PLOT_POINTS,
+                        help="decimate time-series plots above this many samples (0 = never)")
+    parser.add_argument('--decimation', choices=DECIMATION_METHODS, default=DECIMATION_METHOD,
+                        help="decimation method for large time-series plots")
+    parser.add_argument('--html', action='store_true',
+                        help="write an interactive HTML report (<log>_report.html) instead of rendering figures")
+    parser.add_argument('--follow', action='store_true',
+                        help="tail a live log and show a rolling console dashboard instead")
+    parser.add_argument('--interval', type=float, default=1.0, help="--follow polling interval in seconds")
+    parser.add_argument('--window', type=int, default=30, help="--follow rolling window in samples")
+    parser.add_argument('--from-end', action='store_true', help="--follow only samples written from now on")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every pipeline stage and write the breakdown to --profile-output")
+    parser.add_argument('--profile-output', default='quest_profile',
+                        help="--profile writes <prefix>.json (and <prefix>.trace.json with --chrome-trace)")
+    parser.add_argument('--chrome-trace', action='store_true',
+                        help="--profile also writes a Chrome trace-event file")
+    parser.add_argument('--pstats-dir', default=None,
+                        help="--profile also dumps a cProfile stats file per stage here")
+    args = parser.parse_args()
+    log_file_path = args.log_file
+    
+    if args.follow:
+        import quest_follow
+        quest_follow.follow_log(log_file_path, interval=args.interval, window=args.window, from_end=args.from_end)
+        sys.exit(0)
+    
+    profiler = stage_profiler.StageProfiler(pstats_dir=args.pstats_dir) if args.profile else None
+    with profiler.activate() if profiler else contextlib.nullcontext():
+        print("Parsing Quest performance log...")
+        with stage('parse'):
+            df, session_info = parse_quest_log(log_file_path, cache_dir=CACHE_DIR)
         
-        # Save report to file
-        report_path = log_file_path.replace('.txt', '_analysis_report.txt')
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(report)
-        print(f"Report saved to: {report_path}")
-        
-        # Save data to CSV for further analysis
-        csv_path = log_file_path.replace('.txt', '_data.csv')
-        df.to_csv(csv_path, index=False)
-        print(f"\nData exported to CSV: {csv_path}")
-        
-        print("\n✓ Analysis complete. All files generated successfully!")
-        print("  - figure1_fps_analysis.png")
-        print("  - figure2_cpu_gpu_analysis.png")
-        print("  - figure3_memory_analysis.png")
-        print("  - figure4_thermal_battery_analysis.png")
-        print("  - figure5_statistics_summary.png")
-        print("  - figure6_combined_performance.png")
-    else:
-        print("\nProcessing stopped due to parsing errors.")
\ No newline at end of file
+        if df is not None:
+            print(f"Successfully parsed {len(df)} data points.\n")
+            
+            # Generate all figures (the HTML report draws its charts in the browser instead)
+            figure_paths = []
+            if not args.html:
+                print("Rendering figures...")
+                with stage('render figures'):
+                    figure_paths = render_figures(df, session_info, fmt=args.format,
+                                                  dpi=PREVIEW_DPI if args.preview else args.dpi,
+                                                  workers=args.workers, force=args.force,
+                                                  max_points=args.max_points, decimation=args.decimation)
+            
+            # Generate text report
+            print("\nGenerating analysis report...")
+            with stage('report'):
+                report = generate_report(df, session_info)
+            print(report)
+            
+            # Save report to file
+            log_stem = os.path.splitext(log_file_path)[0]
+            report_path = log_stem + '_analysis_report.txt'
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write(report)
+            print(f"Report saved to: {report_path}")
+            
+            if args.html:
+                html_path = log_stem + '_report.html'
+                with stage('HTML report'):
+                    size = create_html_report(df, session_info, report, html_path)
+                figure_paths.append(html_path)
+                print(f"Interactive report saved to: {html_path} ({size / 1024:.0f} KB)")
+            
+            # Save data to CSV for further analysis
+            csv_path = log_stem + '_data.csv'
+            with stage('export CSV'):
+                df.to_csv(csv_path, index=False)
+            print(f"\nData exported to CSV: {csv_path}")
+            
+            print("\n✓ Analysis complete. All files generated successfully!")
+            for figure_path in figure_paths:
+                print(f"  - {os.path.basename(figure_path)}")
+        else:
+            print("\nProcessing stopped due to parsing errors.")
+    
+    if profiler:
+        print("\nStage profile:")
+        print(profiler.format_table())
+        paths = profiler.write(args.profile_output, args.chrome_trace, script='quest_analyzer',
+                               input=log_file_path, rows=None if df is None else len(df))
+        print(f"Profile saved to: {', '.join(paths)}")
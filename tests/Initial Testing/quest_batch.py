@@ -0,0 +1,271 @@
+"""Batch analysis of many Quest performance logs.
+
+Takes directories, files or glob patterns of Quest logs, splits multi-session
+files at their 'Session Start Time' headers and computes the statistics of
+`generate_report` for every session at once with grouped aggregations. The
+result is one tidy table (one row per session) written as CSV or Parquet.
+
+Each session's FPS and temperature are also sketched at parse time (see
+quantile_sketch) and the sketches kept with the parse cache entry, so
+--fleet reports percentiles over every session by merging them.
+
+Usage:
+    python quest_batch.py logs/ "archive/*.txt" -o session_summary.csv
+    python quest_batch.py logs/ --fleet
+"""
+
+import os
+import sys
+import glob
+import array
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import parse_cache
+import quantile_sketch
+import quest_binary_log
+from quest_analyzer import (SESSION_INFO_PATTERNS, new_column_buffers, append_log_line,
+                            buffers_to_dataframe, CACHE_DIR)
+
+# Bump when the session-tagged parse output changes
+SESSIONS_CACHE_KIND = 'quest-sessions-v3'
+
+# Logs are picked up from directories by these patterns (text and binary)
+LOG_GLOBS = ('QuestPerformanceLog*.txt', 'QuestPerformanceLog*.qpl')
+
+# Files written next to the logs by quest_analyzer.py
+DERIVED_SUFFIXES = ('_analysis_report.txt',)
+
+DEFAULT_TARGET_FPS = 72.0
+
+def collect_log_files(paths):
+    """Expand directories and glob patterns into a sorted, de-duplicated list of log files."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in LOG_GLOBS:
+                files.extend(glob.glob(os.path.join(path, pattern)))
+        elif os.path.exists(path):
+            # Checked before globbing: log names like 'Log[1].txt' look like patterns
+            files.append(path)
+        elif glob.has_magic(path):
+            files.extend(glob.glob(path))
+        else:
+            print(f"Warning: '{path}' not found, skipping.")
+    files = [f for f in files if not f.endswith(DERIVED_SUFFIXES)]
+    return sorted(set(files))
+
+def read_quest_sessions(file_path):
+    """Stream one log into a DataFrame with a 'Session' column, plus header text per session.
+
+    A session starts at each 'Session Start Time' line; header fields are read
+    from the lines between it and the session's first sample. Sessions without
+    samples (e.g. a header written twice) are dropped and the rest numbered
+    from 0. 'Seconds' counts from the first sample of each session, unwrapped
+    across midnight. Binary
+    logs are read with quest_binary_log instead.
+    """
+    if quest_binary_log.is_binary_log(file_path):
+        return quest_binary_log.read_binary_sessions(file_path)
+
+    buffers = new_column_buffers()
+    session_ids = array.array('q')
+    headers = []
+    in_header = False
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if SESSION_INFO_PATTERNS['start_time'].search(line):
+                headers.append({})
+                in_header = True
+            if in_header:
+                for key, info_pattern in SESSION_INFO_PATTERNS.items():
+                    if key not in headers[-1]:
+                        match = info_pattern.search(line)
+                        if match:
+                            headers[-1][key] = match.group(0)
+            added = append_log_line(buffers, line)
+            if added:
+                if not headers:
+                    headers.append({})
+                in_header = False
+                session_ids.extend([len(headers) - 1] * added)
+
+    if not buffers['Time']:
+        return None, []
+
+    df = buffers_to_dataframe(buffers)
+    raw_ids = np.frombuffer(session_ids, dtype=np.int64)
+    used, first_rows, dense_ids = np.unique(raw_ids, return_index=True, return_inverse=True)
+    df.insert(0, 'Session', dense_ids.astype(np.int32))
+
+    # Re-base Seconds on each session's first sample, unwrapping midnight per session
+    clock = np.frombuffer(buffers['_clock'], dtype=np.int64)
+    df['Seconds'] = quest_binary_log.session_seconds(clock, dense_ids)
+
+    return df, [headers[i] for i in used]
+
+def log_labels(files):
+    """Label of every log: its path relative to the logs' common directory.
+
+    Logs from one directory keep their file names, while logs that share a
+    name in different directories stay apart.
+    """
+    paths = [os.path.abspath(f) for f in files]
+    try:
+        root = os.path.commonpath([os.path.dirname(p) for p in paths]) if paths else ''
+    except ValueError:  # different drives
+        return dict(zip(files, paths))
+    return {f: os.path.relpath(p, root) for f, p in zip(files, paths)}
+
+def load_sessions(files, cache_dir=None, sketches=None):
+    """Parse every log and stack their sessions into one frame plus a header table.
+
+    Logs are named by log_labels in the 'Log_File' column. If a `sketches`
+    dict is passed, it is filled with each session's metric sketches, keyed
+    by (log label, session).
+    """
+    def parse_for_cache(path):
+        df, headers = read_quest_sessions(path)
+        if df is None:
+            return df, {'headers': headers, 'sketches': []}
+        session_sketches = [quantile_sketch.metric_sketches(rows) for _, rows in df.groupby('Session', sort=True)]
+        return df, {'headers': headers, 'sketches': session_sketches}
+
+    files = list(dict.fromkeys(files))
+    labels = log_labels(files)
+    frames, header_rows = [], []
+    for file_path in files:
+        try:
+            # Binary logs load faster than the cache would
+            file_cache = None if quest_binary_log.is_binary_log(file_path) else cache_dir
+            df, extra = parse_cache.cached_parse(file_path, SESSIONS_CACHE_KIND, parse_for_cache, file_cache)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            print(f"Error loading {file_path}: {e}")
+            continue
+        if df is None:
+            print(f"No data found in {file_path}, skipping.")
+            continue
+
+        df.insert(0, 'Log_File', labels[file_path])
+        frames.append(df)
+        for session, lines in enumerate(extra['headers']):
+            row = {'Log_File': labels[file_path], 'Session': session}
+            for key, pattern in SESSION_INFO_PATTERNS.items():
+                match = pattern.search(lines[key]) if key in lines else None
+                row[key] = match.group(1) if match else None
+            header_rows.append(row)
+        if sketches is not None:
+            for session, entry in enumerate(extra['sketches']):
+                sketches[(labels[file_path], session)] = entry
+
+    if not frames:
+        raise ValueError("No Quest performance logs with data were found.")
+
+    samples = pd.concat(frames, ignore_index=True)
+    samples['Log_File'] = samples['Log_File'].astype('category')
+    headers = pd.DataFrame(header_rows)
+    headers['refresh_rate'] = pd.to_numeric(headers['refresh_rate'], errors='coerce')
+    return samples, headers
+
+def summarize_sessions(samples, headers):
+    """Compute the generate_report statistics for all sessions in one grouped pass."""
+    keys = ['Log_File', 'Session']
+
+    # Per-row target FPS from each session's refresh rate
+    target = headers.set_index(keys)['refresh_rate'].fillna(DEFAULT_TARGET_FPS)
+    row_target = target.reindex(pd.MultiIndex.from_frame(samples[keys].astype({'Log_File': str}))).to_numpy()
+    work = samples[keys + ['Seconds', 'FPS', 'Frame_Spikes', 'Temperature', 'Battery',
+                           'Memory_Allocated', 'Memory_Reserved', 'CPU_Level', 'GPU_Level']].copy()
+    work['Below_Target'] = work['FPS'].to_numpy() < row_target
+    work['High_Spike'] = work['Frame_Spikes'] > 10
+
+    summary = work.groupby(keys, observed=True, sort=True).agg(
+        duration_s=('Seconds', 'last'),
+        samples=('FPS', 'size'),
+        fps_mean=('FPS', 'mean'),
+        fps_min=('FPS', 'min'),
+        fps_max=('FPS', 'max'),
+        fps_std=('FPS', 'std'),
+        samples_below_target=('Below_Target', 'sum'),
+        spikes_total=('Frame_Spikes', 'sum'),
+        spikes_mean=('Frame_Spikes', 'mean'),
+        spikes_max=('Frame_Spikes', 'max'),
+        high_spike_samples=('High_Spike', 'sum'),
+        temp_mean=('Temperature', 'mean'),
+        temp_max=('Temperature', 'max'),
+        temp_min=('Temperature', 'min'),
+        battery_start=('Battery', 'first'),
+        battery_end=('Battery', 'last'),
+        mem_allocated_mean=('Memory_Allocated', 'mean'),
+        mem_reserved_mean=('Memory_Reserved', 'mean'),
+        cpu_level_mean=('CPU_Level', 'mean'),
+        gpu_level_mean=('GPU_Level', 'mean'),
+    ).reset_index()
+    summary['Log_File'] = summary['Log_File'].astype(str)
+
+    summary = headers.merge(summary, on=keys, how='right')
+    summary['target_fps'] = summary['refresh_rate'].fillna(DEFAULT_TARGET_FPS)
+    summary['duration_min'] = summary['duration_s'] / 60
+    summary['fps_cv_pct'] = summary['fps_std'] / summary['fps_mean'] * 100
+    summary['pct_below_target'] = summary['samples_below_target'] / summary['samples'] * 100
+    summary['pct_high_spike'] = summary['high_spike_samples'] / summary['samples'] * 100
+    summary['temp_range'] = summary['temp_max'] - summary['temp_min']
+    summary['battery_drain'] = summary['battery_start'] - summary['battery_end']
+
+    has_duration = (summary['samples'] > 1) & (summary['duration_s'] > 0)
+    summary['drain_per_min'] = (summary['battery_drain'] / summary['duration_min']).where(has_duration)
+    summary['est_minutes_remaining'] = (summary['battery_end'] / summary['drain_per_min']).where(summary['drain_per_min'] > 0)
+    summary['memory_efficiency_pct'] = (summary['mem_allocated_mean'] / summary['mem_reserved_mean'] * 100).where(
+        summary['mem_reserved_mean'] > 0, 0.0)
+
+    summary['thermal_status'] = np.select(
+        [summary['temp_max'] > 40, summary['temp_max'] > 35], ['warning', 'caution'], 'safe')
+
+    # Recommendation thresholds from generate_report
+    summary['flag_low_fps'] = summary['fps_mean'] < summary['target_fps'] - 12
+    summary['flag_high_spikes'] = summary['spikes_mean'] > 5
+    summary['flag_hot'] = summary['temp_max'] > 38
+    summary['flag_high_memory'] = summary['memory_efficiency_pct'] > 85
+    summary['issues'] = summary[['flag_low_fps', 'flag_high_spikes', 'flag_hot', 'flag_high_memory']].sum(axis=1)
+
+    summary = summary.drop(columns=['temp_min']).rename(columns={'Log_File': 'log_file', 'Session': 'session'})
+    return summary
+
+def write_summary(summary, output_path):
+    """Write the summary table; the format follows the extension (.parquet or .csv)."""
+    if output_path.endswith('.parquet'):
+        summary.to_parquet(output_path, index=False)
+    else:
+        summary.to_csv(output_path, index=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise every session in a set of Quest performance logs.")
+    parser.add_argument('paths', nargs='+', help="log files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='session_summary.csv',
+                        help="summary table (.csv or .parquet)")
+    parser.add_argument('--no-cache', action='store_true', help="always re-parse the logs")
+    parser.add_argument('--fleet', action='store_true',
+                        help="print FPS and temperature percentiles over all sessions, merged from their sketches")
+    args = parser.parse_args()
+
+    files = collect_log_files(args.paths)
+    print(f"Found {len(files)} log file(s).")
+
+    try:
+        sketches = {} if args.fleet else None
+        samples, headers = load_sessions(files, cache_dir=None if args.no_cache else CACHE_DIR, sketches=sketches)
+        summary = summarize_sessions(samples, headers)
+        write_summary(summary, args.output)
+
+        print(f"Summarised {len(summary)} session(s) from {len(samples)} samples.\n")
+        print(summary[['log_file', 'session', 'duration_min', 'fps_mean', 'fps_min',
+                       'spikes_total', 'temp_max', 'thermal_status', 'issues']].to_string(index=False, float_format="%.2f"))
+        if args.fleet:
+            print(f"\nFleet distribution over {len(sketches)} session(s):")
+            print(quantile_sketch.format_fleet(quantile_sketch.merge_stored(sketches.values())), end='')
+        print(f"\nSummary saved to: {args.output}")
+    except ValueError as e:
+        print(f"\nFATAL ERROR: {e}")
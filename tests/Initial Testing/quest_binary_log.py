@@ -0,0 +1,270 @@
+"""Compact binary format for Quest performance logs.
+
+The text log spends ~140 bytes and a regex match per sample. A binary log
+(.qpl) holds the same data in fixed 32-byte little-endian records, so it is
+about four times smaller and loads by memory-mapping the file and viewing
+it as a numpy structured array. Convert existing text logs with
+convert_quest_log.py.
+
+Layout: a 16-byte file header (magic b'QPLB', uint16 version, uint16 record
+size, 8 reserved bytes), then records. Every record starts with a kind byte:
+
+    SAMPLE   kind u1, battery u1 (%), cpu_level u1, gpu_level u1,
+             clock u4 (seconds since midnight), temperature i2 (0.1 °C),
+             fps u2 (0.1 FPS), mem_alloc u4 (MB), mem_reserved u4 (MB),
+             frame_spikes u4, scene u2 (string id), 6 reserved bytes
+    STRING   kind u1, reserved u1, string id u2, byte length u4, then the
+             first 24 bytes of UTF-8 text; longer strings continue in
+             STRING_MORE records carrying 31 bytes each after the kind byte
+    SESSION  kind u1, reserved u1, header string id u2 (JSON of the session
+             header lines), 28 reserved bytes
+
+A string is written once, before the first record that uses it, so the file
+can be appended to record by record on the device and a truncated tail only
+loses the last partial record. Temperature and FPS are logged with one
+decimal, which the tenths fields keep exactly.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'QPLB'
+VERSION = 1
+RECORD_SIZE = 32
+FILE_HEADER = np.dtype([('magic', 'S4'), ('version', '<u2'), ('record_size', '<u2'), ('reserved', 'V8')])
+
+KIND_SAMPLE = 0
+KIND_STRING = 1
+KIND_STRING_MORE = 2
+KIND_SESSION = 3
+
+SAMPLE_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('battery', 'u1'),
+    ('cpu_level', 'u1'),
+    ('gpu_level', 'u1'),
+    ('clock', '<u4'),
+    ('temperature', '<i2'),
+    ('fps', '<u2'),
+    ('mem_alloc', '<u4'),
+    ('mem_reserved', '<u4'),
+    ('frame_spikes', '<u4'),
+    ('scene', '<u2'),
+    ('reserved', 'V6'),
+])
+STRING_DTYPE = np.dtype([('kind', 'u1'), ('reserved', 'u1'), ('string_id', '<u2'), ('length', '<u4'),
+                         ('text', 'V24')])
+STRING_MORE_DTYPE = np.dtype([('kind', 'u1'), ('text', 'V31')])
+SESSION_DTYPE = np.dtype([('kind', 'u1'), ('reserved', 'u1'), ('header', '<u2'), ('reserved2', 'V28')])
+
+STRING_INLINE = STRING_DTYPE['text'].itemsize
+STRING_MORE_INLINE = STRING_MORE_DTYPE['text'].itemsize
+
+COLUMN_ORDER = ['Time', 'Battery', 'Temperature', 'CPU_Level', 'GPU_Level',
+                'Memory_Allocated', 'Memory_Reserved', 'Scene', 'FPS', 'Frame_Spikes']
+
+# Record fields behind each log DataFrame column: (field, scale)
+SAMPLE_COLUMNS = {
+    'Battery': ('battery', None),
+    'Temperature': ('temperature', 10),
+    'CPU_Level': ('cpu_level', None),
+    'GPU_Level': ('gpu_level', None),
+    'Memory_Allocated': ('mem_alloc', None),
+    'Memory_Reserved': ('mem_reserved', None),
+    'FPS': ('fps', 10),
+    'Frame_Spikes': ('frame_spikes', None),
+}
+
+_clock_strings = None
+
+def clock_strings():
+    """'HH:MM:SS' for every second of the day, so 'Time' is a lookup rather than formatting."""
+    global _clock_strings
+    if _clock_strings is None:
+        hours = [f"{h:02d}" for h in range(24)]
+        sixty = [f"{m:02d}" for m in range(60)]
+        _clock_strings = np.array([f"{h}:{m}:{s}" for h in hours for m in sixty for s in sixty], dtype=object)
+    return _clock_strings
+
+# A step back of more than half a day between samples is the clock passing
+# midnight (late evening to early morning); smaller steps are clock
+# corrections and are left as they are
+DAY_S = 86400
+MIDNIGHT_STEP_S = -43200
+
+def crosses_midnight(previous_clock, clock):
+    """True where the clock stepped from `previous_clock` to `clock` across midnight (scalars or arrays)."""
+    return (clock - previous_clock) < MIDNIGHT_STEP_S
+
+def session_seconds(clock, session_ids=None):
+    """Seconds since the first sample of each session, from seconds-since-midnight clock values.
+
+    The logger's clock wraps at midnight, so every step that crosses_midnight
+    within a session adds a day (as quest_follow does while tailing).
+    Returns float64.
+    """
+    clock = np.asarray(clock, dtype=np.int64)
+    if not len(clock):
+        return np.zeros(0, dtype=np.float64)
+    if session_ids is None:
+        session_ids = np.zeros(len(clock), dtype=np.int64)
+    wrapped = crosses_midnight(clock[:-1], clock[1:]) & (np.diff(session_ids) == 0)
+    unwrapped = clock + DAY_S * np.concatenate(([0], np.cumsum(wrapped)))
+    _, first_rows, dense_ids = np.unique(session_ids, return_index=True, return_inverse=True)
+    return (unwrapped - unwrapped[first_rows][dense_ids]).astype(np.float64)
+
+def is_binary_log(file_path):
+    """True if the file starts with the binary log magic."""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def string_records(string_id, text):
+    """Encode one string as a STRING record plus STRING_MORE continuations."""
+    data = text.encode('utf-8')
+    head = np.zeros(1, dtype=STRING_DTYPE)
+    head['kind'], head['string_id'], head['length'] = KIND_STRING, string_id, len(data)
+    first = data[:STRING_INLINE]
+    head['text'] = np.void(first.ljust(STRING_INLINE, b'\0'))
+    parts = [head.tobytes()]
+    for offset in range(STRING_INLINE, len(data), STRING_MORE_INLINE):
+        chunk = data[offset:offset + STRING_MORE_INLINE]
+        parts.append(bytes([KIND_STRING_MORE]) + chunk.ljust(STRING_MORE_INLINE, b'\0'))
+    return b''.join(parts)
+
+class BinaryLogWriter:
+    """Appends sessions and samples to a binary log, defining each string before its first use."""
+
+    def __init__(self, f):
+        self.f = f
+        self.strings = {}
+        if f.tell() == 0:
+            header = np.zeros(1, dtype=FILE_HEADER)
+            header['magic'], header['version'], header['record_size'] = MAGIC, VERSION, RECORD_SIZE
+            f.write(header.tobytes())
+
+    def string_id(self, text):
+        """Id of `text`, writing its definition the first time it is seen."""
+        if text not in self.strings:
+            if len(self.strings) >= np.iinfo(np.uint16).max:
+                raise ValueError("Binary log string table is full.")
+            self.strings[text] = len(self.strings)
+            self.f.write(string_records(self.strings[text], text))
+        return self.strings[text]
+
+    def begin_session(self, header_lines):
+        """Start a session whose header fields are `header_lines` (key -> header line text)."""
+        record = np.zeros(1, dtype=SESSION_DTYPE)
+        record['kind'] = KIND_SESSION
+        record['header'] = self.string_id(json.dumps(header_lines, sort_keys=True))
+        self.f.write(record.tobytes())
+
+    def append_frame(self, df):
+        """Append every row of a log frame (COLUMN_ORDER columns) as SAMPLE records."""
+        records = np.zeros(len(df), dtype=SAMPLE_DTYPE)
+        records['kind'] = KIND_SAMPLE
+        for column, (field, scale) in SAMPLE_COLUMNS.items():
+            values = df[column].to_numpy()
+            records[field] = np.round(values * scale) if scale else values
+        clock = df['Time'].str.slice(0, 2).astype(int) * 3600 + df['Time'].str.slice(3, 5).astype(int) * 60 \
+            + df['Time'].str.slice(6, 8).astype(int)
+        records['clock'] = clock.to_numpy()
+        codes, names = pd.factorize(df['Scene'])
+        ids = np.array([self.string_id(str(name)) for name in names], dtype=np.uint16)
+        records['scene'] = ids[codes] if len(codes) else 0
+        self.f.write(records.tobytes())
+
+def map_records(file_path):
+    """Memory-map a binary log's records as a SAMPLE_DTYPE array (a trailing partial record is ignored)."""
+    size = os.path.getsize(file_path)
+    if size < FILE_HEADER.itemsize:
+        raise ValueError(f"'{file_path}' is not a binary Quest log.")
+    header = np.fromfile(file_path, dtype=FILE_HEADER, count=1)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f"'{file_path}' is not a binary Quest log.")
+    if header['version'] != VERSION or header['record_size'] != RECORD_SIZE:
+        raise ValueError(f"'{file_path}' uses binary log version {header['version']}, "
+                         f"this reader supports version {VERSION}.")
+    count = (size - FILE_HEADER.itemsize) // RECORD_SIZE
+    if count == 0:
+        return np.zeros(0, dtype=SAMPLE_DTYPE)
+    return np.memmap(file_path, dtype=SAMPLE_DTYPE, mode='r', offset=FILE_HEADER.itemsize, shape=(count,))
+
+def read_strings(records, kinds):
+    """Decode the string table from STRING and STRING_MORE records."""
+    strings = {}
+    for position in np.flatnonzero(kinds == KIND_STRING):
+        head = records[position:position + 1].view(STRING_DTYPE)[0]
+        length = int(head['length'])
+        data = bytes(head['text'])[:length]
+        more = position + 1
+        while len(data) < length and more < len(records) and kinds[more] == KIND_STRING_MORE:
+            data += bytes(records[more:more + 1].view(STRING_MORE_DTYPE)[0]['text'])
+            more += 1
+        strings[int(head['string_id'])] = data[:length].decode('utf-8')
+    return strings
+
+def load_samples(file_path):
+    """Decode a binary log's samples.
+
+    Returns (df of COLUMN_ORDER columns, clock seconds, session number of each
+    sample, header lines per session), or (None, None, None, []) without samples.
+    """
+    records = map_records(file_path)
+    kinds = np.asarray(records['kind'])
+    is_sample = kinds == KIND_SAMPLE
+    if not is_sample.any():
+        return None, None, None, []
+    strings = read_strings(records, kinds)
+
+    # Samples before the first SESSION record belong to an unnamed session
+    session_starts = kinds == KIND_SESSION
+    sessions = np.asarray(records[session_starts]).view(SESSION_DTYPE)
+    headers = [{}] + [json.loads(strings[int(h)]) for h in sessions['header']]
+    session_ids = np.cumsum(session_starts)[is_sample]
+
+    samples = records[is_sample]
+    clock = samples['clock'].astype(np.int64)
+    names = np.array([strings.get(i, '') for i in range(max(strings, default=0) + 1)], dtype=object)
+    data = {'Time': clock_strings()[clock % 86400]}
+    for column, (field, scale) in SAMPLE_COLUMNS.items():
+        data[column] = samples[field] / scale if scale else samples[field].astype(np.int64)
+    data['Scene'] = names[samples['scene']]
+    df = pd.DataFrame(data)[COLUMN_ORDER]
+    return df, clock, session_ids, headers
+
+def read_binary_sessions(file_path):
+    """Load a binary log as a DataFrame with a 'Session' column, plus header lines per session.
+
+    Mirrors quest_batch.read_quest_sessions: sessions without samples are
+    dropped and 'Seconds' counts from the first sample of each session,
+    unwrapped across midnight.
+    """
+    df, clock, session_ids, headers = load_samples(file_path)
+    if df is None:
+        return None, []
+    used, first_rows, dense_ids = np.unique(session_ids, return_index=True, return_inverse=True)
+    df.insert(0, 'Session', dense_ids.astype(np.int32))
+    df['Seconds'] = session_seconds(clock, dense_ids)
+    return df, [headers[i] for i in used]
+
+def read_binary_log(file_path):
+    """Load a binary log like read_quest_log: one frame, 'Seconds' from the first sample.
+
+    Returns (df, header_lines), each header field taken from the first
+    session that has it; (None, None) without samples.
+    """
+    df, clock, _, headers = load_samples(file_path)
+    if df is None:
+        return None, None
+    df['Seconds'] = session_seconds(clock)
+    header_lines = {}
+    for header in headers:
+        for key, line in header.items():
+            header_lines.setdefault(key, line)
+    return df, header_lines
@@ -0,0 +1,292 @@
+"""Live tail-follow mode for QuestPerformanceLogger output.
+
+Used by `quest_analyzer.py --follow`. The log is re-opened on every poll and
+only the bytes after the last saved offset are parsed; every sample updates
+the rolling statistics in O(1) (amortised for the window minimum), so the
+file is never re-read and memory does not grow with session length.
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+from quest_analyzer import LOG_LINE_PATTERN, SESSION_INFO_PATTERNS
+import anomaly_detection
+import quest_binary_log
+
+# Same thresholds as the figures and the text report
+CAUTION_TEMP = 35.0
+HIGH_TEMP = 40.0
+DEFAULT_TARGET_FPS = 72.0
+
+class LogTail:
+    """Reads only the bytes appended to a file since the last call."""
+
+    def __init__(self, file_path, from_end=False):
+        self.file_path = file_path
+        self.offset = 0
+        self.remainder = b''
+        if from_end and os.path.exists(file_path):
+            self.offset = os.path.getsize(file_path)
+
+    def read_new_lines(self):
+        """Return complete new lines; a trailing partial line is held until finished."""
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # Truncated or replaced (e.g. a fresh adb pull): start over
+            self.offset, self.remainder = 0, b''
+        if size == self.offset:
+            return []
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        self.offset += len(chunk)
+
+        *lines, self.remainder = (self.remainder + chunk).split(b'\n')
+        return [line.decode('utf-8', errors='replace') for line in lines]
+
+class RollingWindow:
+    """Last `size` (x, y) points with O(1) mean, least-squares slope and amortised O(1) minimum.
+
+    The running sums use x relative to an origin near the window's first
+    point, and are recomputed from the window once every `size` evictions,
+    so hours of adding and removing large x values cannot cancel out the
+    slope or let the sums drift.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.points = deque()
+        self.minima = deque()
+        self.origin = None
+        self.evicted = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+
+    def _recompute(self):
+        self.origin = self.points[0][0]
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+        for x, y in self.points:
+            x -= self.origin
+            self.sum_x += x
+            self.sum_y += y
+            self.sum_xx += x * x
+            self.sum_xy += x * y
+        self.evicted = 0
+
+    def push(self, x, y):
+        if self.origin is None:
+            self.origin = x
+        self.points.append((x, y))
+        dx = x - self.origin
+        self.sum_x += dx
+        self.sum_y += y
+        self.sum_xx += dx * dx
+        self.sum_xy += dx * y
+        while self.minima and self.minima[-1] > y:
+            self.minima.pop()
+        self.minima.append(y)
+
+        if len(self.points) > self.size:
+            old_x, old_y = self.points.popleft()
+            old_dx = old_x - self.origin
+            self.sum_x -= old_dx
+            self.sum_y -= old_y
+            self.sum_xx -= old_dx * old_dx
+            self.sum_xy -= old_dx * old_y
+            if self.minima[0] == old_y:
+                self.minima.popleft()
+            self.evicted += 1
+            if self.evicted >= self.size:
+                self._recompute()
+
+    def __len__(self):
+        return len(self.points)
+
+    def mean(self):
+        return self.sum_y / len(self.points) if self.points else float('nan')
+
+    def minimum(self):
+        return self.minima[0] if self.minima else float('nan')
+
+    def slope(self):
+        """Least-squares slope of y over x for the points in the window."""
+        n = len(self.points)
+        denominator = n * self.sum_xx - self.sum_x ** 2
+        if n < 2 or denominator <= 0:
+            return 0.0
+        return (n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+class LiveSessionStats:
+    """Running FPS, spike and thermal statistics for one logging session."""
+
+    def __init__(self, window=30, target_fps=DEFAULT_TARGET_FPS):
+        self.window = window
+        self.target_fps = target_fps
+        self.count = 0
+        self.fps_mean = 0.0
+        self.fps_m2 = 0.0
+        self.fps_min = float('inf')
+        self.below_target = 0
+        self.total_spikes = 0
+        self.peak_temp = float('-inf')
+        self.throttle_events = 0
+        self.last_event = None
+        self.first_clock = None
+        self.last_clock = None
+        self.day_offset = 0
+        self.last = None
+        self.fps_window = RollingWindow(window)
+        self.temp_window = RollingWindow(window)
+        self.spike_window = deque(maxlen=window)
+        self.window_spikes = 0
+        self.anomalies = anomaly_detection.StreamingDetector(['FPS', 'Frame_Spikes', 'Temperature'])
+        self.last_anomaly = None
+
+    def update(self, sample):
+        """Fold one parsed sample into the statistics."""
+        # Unwrapped like quest_binary_log.session_seconds, so --follow and batch analysis agree
+        raw_clock = sample['clock']
+        if self.last_clock is not None and quest_binary_log.crosses_midnight(self.last_clock, raw_clock):
+            self.day_offset += quest_binary_log.DAY_S
+        self.last_clock = raw_clock
+        clock = raw_clock + self.day_offset
+        sample['clock'] = clock
+        if self.first_clock is None:
+            self.first_clock = clock
+        seconds = float(clock - self.first_clock)
+        sample['seconds'] = seconds
+
+        # Welford running mean/variance for FPS
+        fps = sample['fps']
+        self.count += 1
+        delta = fps - self.fps_mean
+        self.fps_mean += delta / self.count
+        self.fps_m2 += delta * (fps - self.fps_mean)
+        self.fps_min = min(self.fps_min, fps)
+        self.below_target += fps < self.target_fps
+
+        if len(self.spike_window) == self.window:
+            self.window_spikes -= self.spike_window[0]
+        self.spike_window.append(sample['spikes'])
+        self.window_spikes += sample['spikes']
+        self.total_spikes += sample['spikes']
+
+        self.peak_temp = max(self.peak_temp, sample['temp'])
+        self.fps_window.push(seconds, fps)
+        self.temp_window.push(seconds, sample['temp'])
+
+        # A CPU/GPU level drop while the headset is warm is treated as throttling
+        if self.last is not None and sample['temp'] >= CAUTION_TEMP:
+            if sample['cpu'] < self.last['cpu'] or sample['gpu'] < self.last['gpu']:
+                self.throttle_events += 1
+                self.last_event = (f"{sample['time']} CPU {self.last['cpu']}→{sample['cpu']}, "
+                                   f"GPU {self.last['gpu']}→{sample['gpu']} at {sample['temp']:.1f}°C")
+        for event in self.anomalies.update(seconds, {'FPS': fps, 'Frame_Spikes': sample['spikes'],
+                                                     'Temperature': sample['temp']}):
+            self.last_anomaly = event
+        self.last = sample
+
+    def anomaly_line(self):
+        """Open and completed anomaly events, for the dashboard."""
+        open_events = self.anomalies.open_events()
+        line = f"Anomalies: {len(self.anomalies.events)} ended"
+        if open_events:
+            line += "  |  NOW: " + ", ".join(f"{e['metric']} {e['peak_value']:g} (baseline {e['baseline']:.1f})"
+                                           for e in open_events)
+        elif self.last_anomaly:
+            e = self.last_anomaly
+            line += (f"  |  last: {e['metric']} {e['severity']} at {e['start_s']:.0f}s, "
+                     f"{e['peak_value']:g} vs baseline {e['baseline']:.1f}")
+        return line
+
+    def fps_std(self):
+        return (self.fps_m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    def temp_slope_per_min(self):
+        return self.temp_window.slope() * 60
+
+    def minutes_to_high_temp(self):
+        """Projected minutes until HIGH_TEMP at the current windowed warming rate, or None."""
+        slope = self.temp_slope_per_min()
+        if self.last is None or slope <= 0 or self.last['temp'] >= HIGH_TEMP:
+            return None
+        return (HIGH_TEMP - self.last['temp']) / slope
+
+    def dashboard(self):
+        """Render a compact multi-line console dashboard."""
+        s = self.last
+        eta = self.minutes_to_high_temp()
+        lines = [
+            f"LIVE QUEST PERFORMANCE  |  {s['time']}  |  {s['scene']}  |  samples: {self.count}",
+            "─" * 60,
+            f"FPS now {s['fps']:.1f}  |  window avg {self.fps_window.mean():.1f}, min {self.fps_window.minimum():.1f}"
+            f"  |  session avg {self.fps_mean:.1f} ± {self.fps_std():.1f}, min {self.fps_min:.1f}",
+            f"Below {self.target_fps:g} FPS: {self.below_target}/{self.count} ({self.below_target / self.count * 100:.1f}%)",
+            f"Spikes now {s['spikes']}  |  window {self.window_spikes}  |  total {self.total_spikes}",
+            f"Temp {s['temp']:.1f}°C (peak {self.peak_temp:.1f}°C)  |  trend {self.temp_slope_per_min():+.2f}°C/min"
+            + (f"  |  {HIGH_TEMP:.0f}°C in ~{eta:.0f} min" if eta is not None else ""),
+            f"CPU/GPU level {s['cpu']}/{s['gpu']}  |  battery {s['battery']}%  |  throttle events: {self.throttle_events}",
+            self.anomaly_line(),
+        ]
+        if s['temp'] > HIGH_TEMP:
+            lines.append(f"⚠️  WARNING: temperature above {HIGH_TEMP:.0f}°C")
+        elif s['temp'] > CAUTION_TEMP:
+            lines.append(f"⚠️  CAUTION: temperature above {CAUTION_TEMP:.0f}°C")
+        if self.last_event:
+            lines.append(f"Last throttle: {self.last_event}")
+        return "\n".join(lines)
+
+def sample_from_match(m):
+    """Convert a LOG_LINE_PATTERN match to a sample dict."""
+    hours, minutes, seconds = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    return {
+        'time': f"{m.group(1)}:{m.group(2)}:{m.group(3)}",
+        'clock': hours * 3600 + minutes * 60 + seconds,
+        'battery': int(m.group(4)),
+        'temp': float(m.group(5)),
+        'cpu': int(m.group(6)),
+        'gpu': int(m.group(7)),
+        'scene': m.group(10),
+        'fps': float(m.group(11)),
+        'spikes': int(m.group(12)),
+    }
+
+def follow_log(file_path, interval=1.0, window=30, from_end=False, max_polls=None):
+    """Tail a growing Quest log and refresh a console dashboard as samples arrive.
+
+    Stops on Ctrl+C (or after `max_polls` polls) and returns the final stats.
+    """
+    tail = LogTail(file_path, from_end=from_end)
+    target_fps = DEFAULT_TARGET_FPS
+    stats = LiveSessionStats(window, target_fps)
+    clear = "\033[H\033[J" if sys.stdout.isatty() else ""
+
+    print(f"Following {file_path} (Ctrl+C to stop)...")
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            updated = False
+            for line in tail.read_new_lines():
+                if SESSION_INFO_PATTERNS['start_time'].search(line) and stats.count:
+                    print("\nNew logging session started, resetting statistics.")
+                    stats = LiveSessionStats(window, target_fps)
+                refresh = SESSION_INFO_PATTERNS['refresh_rate'].search(line)
+                if refresh:
+                    target_fps = stats.target_fps = float(refresh.group(1))
+                for m in LOG_LINE_PATTERN.finditer(line):
+                    stats.update(sample_from_match(m))
+                    updated = True
+
+            if updated:
+                print(clear + stats.dashboard(), flush=True)
+            polls += 1
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped following.")
+
+    return stats
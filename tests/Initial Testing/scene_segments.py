@@ -0,0 +1,161 @@
+"""Per-scene breakdown of a Quest performance log.
+
+The session report averages over every scene, which hides the one scene that
+blows the frame budget. `SceneIndex` run-length encodes the 'Scene' column
+once into visits (contiguous intervals of one scene) and keeps each scene's
+visits as row ranges, so taking a scene's samples is a handful of `iloc`
+slices rather than a filter over the whole frame. `scene_breakdown` computes
+the report metrics per scene from that index and ranks scenes by cost: the
+mean frame time beyond the refresh budget.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import memory_trend
+
+DEFAULT_TARGET_FPS = 72.0
+FPS_PERCENTILES = [1, 5, 50]
+
+class SceneIndex:
+    """Run-length index of scene visits over a log frame's rows."""
+
+    def __init__(self, scenes):
+        codes, self.names = pd.factorize(pd.Series(scenes), use_na_sentinel=False)
+        self.names = [str(name) for name in self.names]
+        n = len(codes)
+        self.starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if n else np.array([], dtype=np.int64)
+        self.stops = np.r_[self.starts[1:], n].astype(np.int64)
+        self.visit_scene = codes[self.starts] if n else np.array([], dtype=np.int64)
+        self.visits_by_scene = {name: np.flatnonzero(self.visit_scene == code)
+                                for code, name in enumerate(self.names)}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Index a log frame by its 'Scene' column."""
+        return cls(df['Scene'].to_numpy())
+
+    def __len__(self):
+        return len(self.starts)
+
+    def visit_ids(self):
+        """Visit number of every row, for grouped aggregation."""
+        return np.repeat(np.arange(len(self.starts)), self.stops - self.starts)
+
+    def slices(self, scene):
+        """Row ranges of every visit to `scene`."""
+        return [slice(self.starts[v], self.stops[v]) for v in self.visits_by_scene.get(scene, [])]
+
+    def frame(self, df, scene):
+        """Rows of `scene` (every visit, in order) without scanning the other rows."""
+        parts = [df.iloc[s] for s in self.slices(scene)]
+        return pd.concat(parts) if len(parts) > 1 else (parts[0] if parts else df.iloc[0:0])
+
+    def visits(self, df):
+        """One row per visit: scene, row range and first/last 'Seconds'."""
+        seconds = df['Seconds'].to_numpy()
+        return pd.DataFrame({
+            'Scene': [self.names[c] for c in self.visit_scene],
+            'start_row': self.starts,
+            'stop_row': self.stops,
+            'start_s': seconds[self.starts] if len(self) else [],
+            'end_s': seconds[self.stops - 1] if len(self) else [],
+        })
+
+def scene_breakdown(df, index=None, target_fps=DEFAULT_TARGET_FPS):
+    """Report metrics per scene, most costly first.
+
+    Durations count each sample's interval up to the next sample; missing
+    or non-positive intervals count as the median interval. Memory
+    deltas are last minus first sample of each visit, summed over visits.
+    The temperature slope is the Theil-Sen slope over pairs within the same
+    visit, so moving between scenes does not count as heating.
+    """
+    if index is None:
+        index = SceneIndex.from_frame(df)
+    visit = index.visit_ids()
+    seconds = df['Seconds'].to_numpy(dtype=np.float64)
+    dt = np.diff(seconds, append=np.nan)
+    # A clock that steps back or stalls must not cancel other samples' time
+    valid = np.isfinite(dt) & (dt > 0)
+    dt[~valid] = np.median(dt[valid]) if valid.any() else 0.0
+
+    budget_ms = 1000 / target_fps
+    fps = df['FPS'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        frame_ms = np.where(fps > 0, 1000 / fps, np.nan)
+    work = pd.DataFrame({
+        'Scene': pd.Categorical.from_codes(index.visit_scene[visit], categories=index.names),
+        'visit': visit,
+        'dt': dt,
+        'FPS': fps,
+        'frame_ms': frame_ms,
+        'excess_ms': np.clip(frame_ms - budget_ms, 0, None),
+        'below_target': fps < target_fps,
+        'Frame_Spikes': df['Frame_Spikes'].to_numpy(),
+        'Temperature': df['Temperature'].to_numpy(dtype=np.float64),
+    })
+
+    by_scene = work.groupby('Scene', observed=True)
+    summary = by_scene.agg(
+        visits=('visit', 'nunique'),
+        samples=('FPS', 'size'),
+        duration_s=('dt', 'sum'),
+        fps_mean=('FPS', 'mean'),
+        frame_time_ms=('frame_ms', 'mean'),
+        excess_ms=('excess_ms', 'mean'),
+        pct_below_target=('below_target', 'mean'),
+        spikes_total=('Frame_Spikes', 'sum'),
+        temp_max=('Temperature', 'max'),
+    )
+    summary['pct_below_target'] *= 100
+    quantiles = by_scene['FPS'].quantile([p / 100 for p in FPS_PERCENTILES]).unstack()
+    quantiles.columns = [f'fps_p{p}' for p in FPS_PERCENTILES]
+    summary = summary.join(quantiles)
+    summary['spikes_per_min'] = summary['spikes_total'] / (summary['duration_s'] / 60)
+
+    # Memory change on entry to exit of every visit, summed per scene
+    visit_names = [index.names[c] for c in index.visit_scene]
+    for column, name in (('Memory_Allocated', 'alloc_delta_mb'), ('Memory_Reserved', 'reserved_delta_mb')):
+        values = df[column].to_numpy(dtype=np.float64)
+        summary[name] = pd.Series(values[index.stops - 1] - values[index.starts]).groupby(visit_names).sum()
+
+    minutes = seconds / 60
+    temps = work['Temperature'].to_numpy()
+    slopes = []
+    for scene in summary.index:
+        rows = np.concatenate([np.arange(s.start, s.stop) for s in index.slices(scene)])
+        if len(rows) > memory_trend.MAX_TREND_POINTS:
+            rows = rows[np.linspace(0, len(rows) - 1, memory_trend.MAX_TREND_POINTS).astype(np.int64)]
+        slopes.append(memory_trend.theil_sen(minutes[rows], temps[rows], visit[rows])[0])
+    summary['temp_slope_c_per_min'] = slopes
+
+    summary['time_share_pct'] = summary['duration_s'] / summary['duration_s'].sum() * 100
+    summary = summary.sort_values(['excess_ms', 'frame_time_ms'], ascending=False)
+    summary.insert(0, 'cost_rank', np.arange(1, len(summary) + 1))
+    return summary
+
+def format_scene_breakdown(summary, target_fps=DEFAULT_TARGET_FPS):
+    """Text block for the analysis report."""
+    budget_ms = 1000 / target_fps
+    table = summary[['cost_rank', 'visits', 'duration_s', 'fps_mean', 'fps_p1', 'frame_time_ms', 'excess_ms',
+                     'pct_below_target', 'spikes_per_min', 'alloc_delta_mb', 'temp_slope_c_per_min']].rename(columns={
+        'cost_rank': 'Rank',
+        'visits': 'Visits',
+        'duration_s': 'Time (s)',
+        'fps_mean': 'Avg FPS',
+        'fps_p1': 'P1 FPS',
+        'frame_time_ms': 'Frame (ms)',
+        'excess_ms': 'Over Budget (ms)',
+        'pct_below_target': 'Below Target (%)',
+        'spikes_per_min': 'Spikes/min',
+        'alloc_delta_mb': 'Alloc Δ (MB)',
+        'temp_slope_c_per_min': 'Temp (°C/min)',
+    })
+    text = f"Frame budget: {budget_ms:.2f} ms at {target_fps:g} Hz; scenes ranked by mean time over budget.\n"
+    text += table.to_string(float_format="%.2f") + "\n"
+    return text
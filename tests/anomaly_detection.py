@@ -0,0 +1,226 @@
+"""Rolling-baseline anomaly detection for performance time series.
+
+Shared by quest_analyzer.py, quest_follow.py and auto_plot_metrics.py. Each
+metric keeps an exponentially weighted mean and variance of its past
+samples; a sample is scored by how many standard deviations it lies from
+that baseline in the metric's bad direction (FPS down, GPU time, spikes and
+temperature up). Consecutive flagged samples form one event, graded by its
+worst score. A floor on the standard deviation keeps flat traces (e.g. a
+steady 72 FPS) from flagging sub-frame jitter.
+
+The batch path (`detect_anomalies`, via pandas' ewm) and the streaming path
+(`StreamingDetector`, one O(1) update per sample) run the same recurrence,
+so a followed log yields the same events as analysing the finished file.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Baseline half-life and warm-up, in samples
+HALFLIFE_SAMPLES = 30
+WARMUP_SAMPLES = 10
+
+# Scores at or above these are flagged / graded critical
+WARNING_Z = 3.0
+CRITICAL_Z = 6.0
+
+# Metric: (bad direction, smallest baseline standard deviation in its units)
+ANOMALY_METRICS = {
+    'FPS': ('low', 2.0),
+    'Frame_Spikes': ('high', 2.0),
+    'Temperature': ('high', 0.3),
+    'average_frame_rate': ('low', 2.0),
+    'app_gpu_time_microseconds': ('high', 500.0),
+    'battery_temperature_celcius': ('high', 0.5),
+}
+
+EVENT_COLUMNS = ['metric', 'start_s', 'end_s', 'duration_s', 'samples', 'peak_value', 'baseline', 'peak_z',
+                 'severity']
+
+def ewma_alpha(halflife):
+    """Smoothing factor for a half-life given in samples."""
+    return 1 - math.exp(math.log(0.5) / halflife)
+
+def ewma_scores(values, direction='high', min_std=0.0, halflife=HALFLIFE_SAMPLES, warmup=WARMUP_SAMPLES):
+    """Score every sample against the EWMA baseline of the samples before it.
+
+    Returns (scores, baselines); scores are signed so that positive means the
+    bad direction, and NaN during warm-up. Values must be finite.
+    """
+    x = pd.Series(np.asarray(values, dtype=np.float64))
+    a = ewma_alpha(halflife)
+    baseline = x.ewm(alpha=a, adjust=False).mean().shift(1)
+    innovation = x - baseline
+    # var_t = (1 - a) * (var_{t-1} + a * d_t^2), an ewm of (1 - a) * d^2
+    variance = ((1 - a) * innovation ** 2).fillna(0.0).ewm(alpha=a, adjust=False).mean().shift(1)
+    std = np.maximum(np.sqrt(variance.to_numpy()), min_std)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = innovation.to_numpy() / std
+    if direction == 'low':
+        scores = -scores
+    scores[:warmup] = np.nan
+    return scores, baseline.to_numpy()
+
+def severity(peak_z, critical=CRITICAL_Z):
+    """Grade of an event from its peak score."""
+    return 'critical' if peak_z >= critical else 'warning'
+
+def score_events(seconds, values, scores, baselines, metric, threshold=WARNING_Z, critical=CRITICAL_Z):
+    """Event table from per-sample scores: one row per run of consecutive flagged samples."""
+    flagged = np.nan_to_num(scores, nan=-np.inf) >= threshold
+    if not flagged.any():
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    edges = np.diff(np.r_[False, flagged, False].astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    run = np.repeat(np.arange(len(starts)), stops - starts)
+    rows = np.flatnonzero(flagged)
+
+    # Peak sample of each run: highest score, first on ties
+    order = np.lexsort((-scores[rows], run))
+    peaks = rows[order[np.r_[0, np.flatnonzero(np.diff(run[order])) + 1]]]
+    seconds = np.asarray(seconds, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    events = pd.DataFrame({
+        'metric': metric,
+        'start_s': seconds[starts],
+        'end_s': seconds[stops - 1],
+        'samples': stops - starts,
+        'peak_value': values[peaks],
+        'baseline': baselines[peaks],
+        'peak_z': scores[peaks],
+    })
+    events.insert(3, 'duration_s', events['end_s'] - events['start_s'])
+    events['severity'] = np.where(events['peak_z'] >= critical, 'critical', 'warning')
+    return events
+
+def detect_anomalies(df, time_col, metrics=None, group_col=None, threshold=WARNING_Z, critical=CRITICAL_Z,
+                     halflife=HALFLIFE_SAMPLES, warmup=WARMUP_SAMPLES):
+    """Event table for every metric in `metrics` (default: those of ANOMALY_METRICS present in `df`).
+
+    Baselines restart for every `group_col` value (e.g. per run). Samples
+    with a missing value are skipped. Events are ordered by start time.
+    """
+    if metrics is None:
+        metrics = [m for m in ANOMALY_METRICS if m in df.columns]
+    groups = df.groupby(group_col, observed=True, sort=False) if group_col else [(None, df)]
+
+    tables = []
+    for name, run in groups:
+        seconds = run[time_col].to_numpy(dtype=np.float64)
+        for metric in metrics:
+            direction, min_std = ANOMALY_METRICS[metric]
+            values = run[metric].to_numpy(dtype=np.float64)
+            ok = np.isfinite(values) & np.isfinite(seconds)
+            scores, baselines = ewma_scores(values[ok], direction, min_std, halflife, warmup)
+            events = score_events(seconds[ok], values[ok], scores, baselines, metric, threshold, critical)
+            if group_col and len(events):
+                events.insert(0, group_col, name)
+            tables.append(events)
+
+    events = pd.concat([t for t in tables if len(t)], ignore_index=True) if any(len(t) for t in tables) else \
+        pd.DataFrame(columns=([group_col] if group_col else []) + EVENT_COLUMNS)
+    sort_cols = ([group_col] if group_col else []) + ['start_s', 'metric']
+    return events.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+
+class MetricBaseline:
+    """Streaming EWMA baseline and event state for one metric."""
+
+    def __init__(self, metric, halflife=HALFLIFE_SAMPLES, warmup=WARMUP_SAMPLES):
+        self.metric = metric
+        self.direction, self.min_std = ANOMALY_METRICS[metric]
+        self.alpha = ewma_alpha(halflife)
+        self.warmup = warmup
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+        self.event = None
+
+    def score(self, value):
+        """Score `value` against the baseline, then fold it in. NaN during warm-up."""
+        if self.count == 0:
+            self.mean, self.count = value, 1
+            return float('nan'), float('nan')
+        baseline = self.mean
+        std = max(math.sqrt(self.variance), self.min_std)
+        innovation = value - baseline
+        z = innovation / std if std > 0 else math.copysign(math.inf, innovation) if innovation else 0.0
+        if self.direction == 'low':
+            z = -z
+        self.mean += self.alpha * innovation
+        self.variance = (1 - self.alpha) * (self.variance + self.alpha * innovation * innovation)
+        self.count += 1
+        return (z if self.count > self.warmup else float('nan')), baseline
+
+class StreamingDetector:
+    """Sample-at-a-time anomaly detection with the same results as `detect_anomalies`."""
+
+    def __init__(self, metrics=None, threshold=WARNING_Z, critical=CRITICAL_Z,
+                 halflife=HALFLIFE_SAMPLES, warmup=WARMUP_SAMPLES):
+        self.baselines = {m: MetricBaseline(m, halflife, warmup) for m in (metrics or ANOMALY_METRICS)}
+        self.threshold = threshold
+        self.critical = critical
+        self.events = []
+
+    def update(self, seconds, sample):
+        """Fold one sample (metric -> value) in. Returns the events that ended with it."""
+        closed = []
+        for metric, state in self.baselines.items():
+            value = sample.get(metric)
+            if value is None or not math.isfinite(value):
+                continue
+            z, baseline = state.score(float(value))
+            if z >= self.threshold:
+                if state.event is None:
+                    state.event = {'metric': metric, 'start_s': seconds, 'samples': 0, 'peak_z': -math.inf}
+                event = state.event
+                event['end_s'] = seconds
+                event['samples'] += 1
+                if z > event['peak_z']:
+                    event.update(peak_z=z, peak_value=float(value), baseline=baseline)
+            elif state.event is not None:
+                closed.append(self._close(state))
+        return closed
+
+    def _close(self, state):
+        event, state.event = state.event, None
+        event['duration_s'] = event['end_s'] - event['start_s']
+        event['severity'] = severity(event['peak_z'], self.critical)
+        event = {column: event[column] for column in EVENT_COLUMNS}
+        self.events.append(event)
+        return event
+
+    def open_events(self):
+        """Events still in progress."""
+        return [state.event for state in self.baselines.values() if state.event is not None]
+
+    def finish(self):
+        """Close events still in progress and return the full event table."""
+        for state in self.baselines.values():
+            if state.event is not None:
+                self._close(state)
+        events = pd.DataFrame(self.events, columns=EVENT_COLUMNS)
+        return events.sort_values(['start_s', 'metric'], kind='stable').reset_index(drop=True)
+
+def annotate_events(ax, events, metric, time_scale=1.0):
+    """Shade a metric's events on a time-series axis (x in seconds * time_scale).
+
+    Single-sample events get a line rather than a zero-width span.
+    """
+    colors = {'warning': '#f39c12', 'critical': '#e74c3c'}
+    for _, event in events[events['metric'] == metric].iterrows():
+        start, end = event['start_s'] * time_scale, event['end_s'] * time_scale
+        if end > start:
+            ax.axvspan(start, end, color=colors[event['severity']], alpha=0.2, linewidth=0)
+        else:
+            ax.axvline(start, color=colors[event['severity']], alpha=0.5, linewidth=1)
+
+def format_events(events, limit=10):
+    """Text table of the most severe events (highest scores first)."""
+    if events.empty:
+        return "No anomalies detected.\n"
+    worst = events.sort_values('peak_z', ascending=False).head(limit)
+    return worst.to_string(index=False, float_format="%.2f") + "\n"
@@ -0,0 +1,310 @@
+"""Throughput benchmarks for the Quest log and OVR Metrics analysis pipelines.
+
+Seeded generators write synthetic inputs in the exact on-disk formats: Quest
+logger text (session header blocks followed by 'Time: ..., FrameSpikes: ...'
+lines, several sessions per file) and OVR Metrics exports (all 77 columns,
+semicolon-separated, decimal commas, UTF-8 BOM). Each pipeline stage (parse,
+cache store/load, aggregate, report, render) is timed for wall and CPU time
+over --repeat runs, then run once more under tracemalloc for its peak
+allocation. Results are written as JSON so throughput can be compared across
+versions.
+
+Usage:
+    python benchmark_pipeline.py --sizes 1000 10000 100000
+    python benchmark_pipeline.py --pipeline ovr --sizes 1000000 --repeat 1 -o bench_results/ovr_1m.json
+
+Synthetic clocks wrap at midnight like the real logger's. Sessions start
+around 12:46 and advance 5 s per sample, so a session of more than about
+8,000 samples crosses midnight; the parsers unwrap the clock, so 'Seconds'
+stays monotonic within a session.
+"""
+
+import io
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, 'Initial Testing'))
+sys.path.insert(0, os.path.join(TESTS_DIR, 'Final Testing using OVR Metrics Tool'))
+import quest_analyzer
+import quest_batch
+import auto_plot_metrics
+import frame_pacing
+import cpu_cores
+from stage_profiler import peak_rss_mb
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_SESSIONS = 3
+DEFAULT_REPEAT = 3
+
+# Rows written per generator chunk
+CHUNK_ROWS = 200_000
+
+# The OVR render stage draws every sample into a heatmap; skip it above this
+OVR_RENDER_MAX_ROWS = 1_000_000
+
+SCENES = ['MainMenu', 'AvatarCustomisation', 'Mirror', 'Restaurant']
+
+SESSION_HEADER = """--- Meta Quest Performance Log ---
+
+Session Start Time: {start}
+Device Model: Oculus Quest
+Operating System: Android OS 14 / API-34 (UP1A.231005.007.A1/51716910141200150)
+Graphics API: Vulkan
+GPU: Adreno (TM) 650
+Display Refresh Rate: 71.97844 Hz
+Processor: ARM64 FP ASIMD AES (3 cores @ 1804MHz)
+System Memory: 5832 MB
+
+
+--- Real-time Metrics Log ---
+"""
+
+# --- Generators ---
+
+def generate_quest_log(path, rows, sessions=DEFAULT_SESSIONS, seed=0, interval_s=5):
+    """Write a Quest performance log of `rows` samples split over `sessions` sessions."""
+    rng = np.random.default_rng(seed)
+    per_session = np.diff(np.linspace(0, rows, sessions + 1).astype(np.int64))
+    with open(path, 'w', encoding='utf-8') as f:
+        for session, count in enumerate(per_session):
+            start = 12 * 3600 + 46 * 60 + session * 1800
+            f.write(SESSION_HEADER.format(start=f"2025-10-20 {start // 3600:02d}:{start // 60 % 60:02d}:00"))
+            for offset in range(0, count, CHUNK_ROWS):
+                n = min(CHUNK_ROWS, count - offset)
+                i = np.arange(offset, offset + n)
+                clock = (start + 6 + i * interval_s) % 86400
+                battery = np.clip(90 - i * interval_s // 60 // 2, 1, 100)
+                temp = np.round(35 + 5 * (1 - np.exp(-i / 400)) + rng.normal(0, 0.2, n), 1)
+                cpu = rng.integers(1, 5, n)
+                gpu = rng.integers(1, 5, n)
+                alloc = 300 + i // 1000 + rng.integers(0, 3, n)
+                reserved = alloc + 130
+                scene = np.take(SCENES, (i // 120) % len(SCENES))
+                fps = np.round(np.clip(rng.normal(60, 8, n), 5, 90), 1)
+                spikes = rng.poisson(3, n)
+                f.write(''.join(
+                    f"Time: {c // 3600:02d}:{c // 60 % 60:02d}:{c % 60:02d}, Battery: {b}%, Temp: {t:.1f}°C, "
+                    f"CPU: {cl}, GPU: {gl}, MemAlloc: {a}MB, MemReserved: {r}MB, Scene: {s}, "
+                    f"FPS: {fp:.1f}, FrameSpikes: {sp}\n"
+                    for c, b, t, cl, gl, a, r, s, fp, sp in zip(
+                        clock.tolist(), battery.tolist(), temp.tolist(), cpu.tolist(), gpu.tolist(),
+                        alloc.tolist(), reserved.tolist(), scene.tolist(), fps.tolist(), spikes.tolist())))
+        f.write("--- Session Ended: 2025-10-20 23:59:59 ---\n")
+
+def ovr_chunk(rng, start, n):
+    """One chunk of synthetic OVR samples with every export column, in export order."""
+    i = np.arange(start, start + n)
+    columns = {}
+    for name, dtype in auto_plot_metrics.OVR_COLUMN_DTYPES.items():
+        if dtype.startswith('int'):
+            columns[name] = rng.integers(0, 100, n)
+        else:
+            columns[name] = np.round(rng.uniform(0, 100, n), 2)
+
+    columns['Time Stamp'] = 1001 + i * 1000 + rng.integers(0, 40, n)
+    columns['Time (Seconds)'] = np.round(columns['Time Stamp'] / 1000, 2)
+    columns['battery_level_percentage'] = np.clip(95 - i // 90, 1, 100)
+    columns['battery_temperature_celcius'] = np.round(36 + 4 * (1 - np.exp(-i / 600)), 0)
+    columns['battery_current_now_milliamps'] = np.full(n, 9999)
+    columns['sensor_temperature_celcius'] = np.zeros(n)
+    columns['power_wattage'] = rng.integers(3000, 6000, n)
+    columns['cpu_level'] = rng.choice([3, 4, 5], n, p=[0.05, 0.15, 0.8])
+    columns['gpu_level'] = rng.choice([3, 4], n, p=[0.1, 0.9])
+    columns['cpu_frequency_MHz'] = rng.choice([1478, 1766, 2419], n)
+    columns['gpu_frequency_MHz'] = np.full(n, 525)
+    columns['average_frame_rate'] = np.clip(np.round(rng.normal(60, 10, n)), 5, 90).astype(np.int64)
+    columns['display_refresh_rate'] = np.full(n, 72)
+    columns['app_gpu_time_microseconds'] = rng.integers(9000, 30000, n)
+    columns['app_pss_MB'] = 2500 + i // 600 + rng.integers(0, 5, n)
+    columns['available_memory_MB'] = 900 - i // 1200 + rng.integers(0, 20, n)
+    for core in range(8):
+        columns[f'cpu_utilization_percentage_core{core}'] = rng.integers(5, 100 if core < 4 else 60, n)
+    columns['cpu_utilization_percentage'] = np.round(
+        np.mean([columns[f'cpu_utilization_percentage_core{c}'] for c in range(8)], axis=0), 0)
+    return pd.DataFrame(columns)
+
+def generate_ovr_csv(path, rows, seed=0):
+    """Write an OVR Metrics export of `rows` samples (semicolons, decimal commas, BOM header)."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('﻿')
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = ovr_chunk(rng, start, min(CHUNK_ROWS, rows - start))
+            chunk.to_csv(f, sep=';', decimal=',', index=False, header=(start == 0), float_format='%.2f')
+
+# --- Measurement ---
+
+def measure(fn, repeat=DEFAULT_REPEAT, trace_memory=True):
+    """Run `fn` `repeat` times for timings, then once under tracemalloc.
+
+    Returns (result of the last timed run, stats dict with best/mean wall and
+    CPU seconds, peak traced allocation and peak-RSS growth in MB). Output
+    printed by `fn` is swallowed.
+    """
+    walls, cpus = [], []
+    rss_before = peak_rss_mb()
+    result = None
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        wall, cpu = time.perf_counter(), time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    rss_after = peak_rss_mb()
+
+    stats = {
+        'wall_s': min(walls),
+        'wall_mean_s': sum(walls) / len(walls),
+        'cpu_s': min(cpus),
+        'repeat': len(walls),
+        'peak_rss_growth_mb': None if rss_before is None else rss_after - rss_before,
+        'peak_alloc_mb': None,
+    }
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+            stats['peak_alloc_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+# --- Pipelines ---
+
+def bench_quest(rows, workdir, repeat, trace_memory, seed, sessions):
+    """Generate a Quest log and benchmark its stages. Returns one result dict per stage."""
+    path = os.path.join(workdir, f'QuestPerformanceLog_bench_{rows}.txt')
+    cache_dir = os.path.join(workdir, 'cache')
+    figures_dir = os.path.join(workdir, 'figures')
+    os.makedirs(figures_dir, exist_ok=True)
+
+    stages = {}
+    _, stages['generate'] = measure(lambda: generate_quest_log(path, rows, sessions, seed), 1, False)
+    (df, info), stages['parse'] = measure(lambda: quest_analyzer.read_quest_log(path), repeat, trace_memory)
+
+    def store():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return quest_analyzer.parse_quest_log(path, cache_dir)
+    _, stages['cache_store'] = measure(store, repeat, trace_memory)
+    _, stages['cache_load'] = measure(lambda: quest_analyzer.parse_quest_log(path, cache_dir), repeat, trace_memory)
+
+    samples, headers = quest_batch.load_sessions([path])
+    _, stages['aggregate'] = measure(lambda: quest_batch.summarize_sessions(samples, headers), repeat, trace_memory)
+    _, stages['report'] = measure(lambda: quest_analyzer.generate_report(df, info), repeat, trace_memory)
+    _, stages['render'] = measure(lambda: quest_analyzer.render_figures(
+        df, info, figures_dir, dpi=quest_analyzer.PREVIEW_DPI, workers=1, force=True), repeat, trace_memory)
+
+    return [dict(pipeline='quest', stage=stage, rows=rows, file_mb=os.path.getsize(path) / (1024 * 1024),
+                 rows_per_s=rows / s['wall_s'] if s['wall_s'] else None, **s)
+            for stage, s in stages.items()]
+
+def bench_ovr(rows, workdir, repeat, trace_memory, seed):
+    """Generate an OVR export and benchmark its stages. Returns one result dict per stage."""
+    path = os.path.join(workdir, f'OvrBenchRun_{rows}.csv')
+    cache_dir = os.path.join(workdir, 'cache')
+    needed = list(dict.fromkeys(auto_plot_metrics.AVERAGE_METRICS + frame_pacing.PACING_COLUMNS
+                                + cpu_cores.CORE_ANALYSIS_COLUMNS))
+
+    stages = {}
+    _, stages['generate'] = measure(lambda: generate_ovr_csv(path, rows, seed), 1, False)
+    _, stages['parse_all_columns'] = measure(lambda: auto_plot_metrics.load_and_merge_data([path]),
+                                             repeat, trace_memory)
+    df, stages['parse'] = measure(lambda: auto_plot_metrics.load_and_merge_data([path], needed),
+                                  repeat, trace_memory)
+
+    def store():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return auto_plot_metrics.load_and_merge_data([path], needed, cache_dir)
+    _, stages['cache_store'] = measure(store, repeat, trace_memory)
+    _, stages['cache_load'] = measure(lambda: auto_plot_metrics.load_and_merge_data([path], needed, cache_dir),
+                                      repeat, trace_memory)
+
+    def aggregate():
+        averages = df.groupby('Source_File', observed=True)[auto_plot_metrics.AVERAGE_METRICS].mean()
+        return averages, frame_pacing.frame_pacing_summary(df), cpu_cores.core_summary(df)
+    _, stages['aggregate'] = measure(aggregate, repeat, trace_memory)
+    _, stages['report'] = measure(lambda: auto_plot_metrics.calculate_and_print_averages(
+        df, auto_plot_metrics.AVERAGE_METRICS), repeat, trace_memory)
+    if rows <= OVR_RENDER_MAX_ROWS:
+        _, stages['render'] = measure(lambda: cpu_cores.plot_core_heatmap(
+            df, os.path.join(workdir, 'core_heatmap.png'), dpi=100), repeat, trace_memory)
+
+    return [dict(pipeline='ovr', stage=stage, rows=rows, file_mb=os.path.getsize(path) / (1024 * 1024),
+                 rows_per_s=rows / s['wall_s'] if s['wall_s'] else None, **s)
+            for stage, s in stages.items()]
+
+def environment():
+    """Versions and revision the results were measured with."""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=TESTS_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def print_results(results):
+    table = pd.DataFrame(results)[['pipeline', 'rows', 'stage', 'wall_s', 'cpu_s', 'rows_per_s', 'peak_alloc_mb']]
+    print(table.to_string(index=False, float_format="%.3f"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipelines on synthetic inputs.")
+    parser.add_argument('--pipeline', choices=['quest', 'ovr', 'all'], default='all')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="rows per generated input")
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS, help="sessions per Quest log")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per stage (best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', metavar='DIR', help="generate inputs in DIR and keep them")
+    parser.add_argument('-o', '--output', default=None,
+                        help="results JSON (default: bench_results/benchmark_<timestamp>.json)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join('bench_results', f"benchmark_{datetime.now():%Y%m%d-%H%M%S}.json")
+    workdir = args.keep or tempfile.mkdtemp(prefix='perf_bench_')
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    try:
+        for rows in args.sizes:
+            if args.pipeline in ('quest', 'all'):
+                print(f"Quest log, {rows} rows...")
+                results += bench_quest(rows, workdir, args.repeat, not args.no_memory, args.seed, args.sessions)
+            if args.pipeline in ('ovr', 'all'):
+                print(f"OVR export, {rows} rows...")
+                results += bench_ovr(rows, workdir, args.repeat, not args.no_memory, args.seed)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_results(results)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'created': datetime.now().isoformat(timespec='seconds'),
+                   'environment': environment(), 'results': results}, f, indent=2)
+    print(f"\nResults saved to: {output}")
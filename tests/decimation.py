@@ -0,0 +1,91 @@
+"""Point decimation for large time-series plots.
+
+Two reducers are provided. `minmax_indices` keeps the first, last, minimum
+and maximum sample of every equal-width x bucket, so every spike and every
+dip survives exactly. `lttb_indices` (Largest-Triangle-Three-Buckets) keeps
+the visually most significant point per bucket and gives smoother lines, but
+may merge neighbouring extremes. Both return sorted row indices, so all
+columns of a frame can be sliced together.
+"""
+
+import numpy as np
+
+METHODS = ('minmax', 'lttb')
+
+def _bucket_ids(x, n_buckets):
+    """Assign each point to one of n_buckets equal-width x buckets (equal-count if x is not sorted)."""
+    n = len(x)
+    span = x[-1] - x[0] if n else 0
+    if n < 2 or not np.isfinite(span) or span <= 0 or np.any(np.diff(x) < 0):
+        return np.arange(n) * n_buckets // max(n, 1)
+    return np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+
+def _first_extreme(values, starts, lengths, reducer):
+    """Index of the first occurrence of each segment's extreme (NaNs ignored)."""
+    extremes = reducer.reduceat(values, starts)
+    hits = np.flatnonzero(values == np.repeat(extremes, lengths))
+    segment = np.repeat(np.arange(len(starts)), lengths)[hits]
+    _, first = np.unique(segment, return_index=True)
+    return hits[first]
+
+def minmax_indices(x, ys, n_buckets):
+    """Indices of the first, last, minimum and maximum point per x bucket for every series in `ys`."""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    buckets = _bucket_ids(x, n_buckets)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lengths = np.diff(np.r_[starts, n])
+
+    keep = [starts, starts + lengths - 1]
+    for y in ys:
+        y = np.asarray(y, dtype=np.float64)
+        keep.append(_first_extreme(y, starts, lengths, np.fmin))
+        keep.append(_first_extreme(y, starts, lengths, np.fmax))
+    return np.unique(np.concatenate(keep))
+
+def lttb_indices(x, y, n_out):
+    """Indices chosen by Largest-Triangle-Three-Buckets for one series."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_lo:max(next_hi, next_lo + 1)].mean()
+        avg_y = y[next_lo:max(next_hi, next_lo + 1)].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.nanargmax(area)) if not np.all(np.isnan(area)) else lo
+        selected[i + 1] = a
+    return np.unique(selected)
+
+def decimate_frame(df, x_col, y_cols, max_points, method='minmax'):
+    """Return the rows of `df` needed to draw `y_cols` against `x_col` with at most ~max_points points.
+
+    Frames at or below `max_points` rows (or with `max_points` falsy) are
+    returned unchanged.
+    """
+    if not max_points or len(df) <= max_points:
+        return df
+
+    x = df[x_col].to_numpy()
+    if method == 'lttb':
+        per_series = max(3, max_points // len(y_cols))
+        idx = np.unique(np.concatenate([lttb_indices(x, df[c].to_numpy(), per_series) for c in y_cols]))
+    elif method == 'minmax':
+        # Each bucket costs its first and last row plus a min and max per series
+        n_buckets = max(1, max_points // (2 + 2 * len(y_cols)))
+        idx = minmax_indices(x, [df[c].to_numpy() for c in y_cols], n_buckets)
+    else:
+        raise ValueError(f"Unknown decimation method '{method}', expected one of {METHODS}.")
+    return df.iloc[idx]
@@ -0,0 +1,338 @@
+"""Self-contained interactive HTML reports for performance time series.
+
+Shared by quest_analyzer.py and auto_plot_metrics.py as a fast alternative
+to the matplotlib figures. Every series is stored as a pyramid of levels:
+level k splits the series' time range into 2**k equal tiles, each reduced
+with decimation.minmax_indices to about TILE_POINTS points, so spikes and
+dips survive at every zoom; the last level holds the raw samples. Tiles are
+float32, deflate-compressed and base64-encoded into one HTML file that
+needs no server or network.
+
+In the browser only level 0 (one tile per series) is decoded when the page
+opens. Zooming picks the level whose tiles hold ~TILE_POINTS points across
+the view and decodes just the visible tiles, drawing the coarser level
+until they are ready. Wheel zooms, drag pans, double-click resets; all
+panels share the time axis.
+"""
+
+import os
+import json
+import html
+import math
+import zlib
+import base64
+
+import numpy as np
+
+from decimation import minmax_indices
+
+TILE_POINTS = 2048
+
+PALETTE = ['#2E86AB', '#A23B72', '#F18F01', '#06A77D', '#C73E1D', '#6A4C93', '#1B998B', '#8D6A9F']
+
+def encode_tile(x, y, x0):
+    """Deflate + base64 of the tile's x offsets from x0 then its y values, both float32."""
+    raw = np.concatenate([np.asarray(x, dtype=np.float64) - x0, np.asarray(y, dtype=np.float64)])
+    return base64.b64encode(zlib.compress(raw.astype('<f4').tobytes(), 6)).decode('ascii')
+
+def series_levels(x, y, tile_points=TILE_POINTS):
+    """Multi-resolution tiles of one series: {'x0', 'x1', 'n', 'levels': [[tile, ...], ...]}.
+
+    Levels stop at the first one that keeps more than half of the samples,
+    which is stored raw instead, so the pyramid costs at most about twice
+    the raw series.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x)
+    x, y = x[ok], y[ok]
+    order = np.argsort(x, kind='stable')
+    x, y = x[order], y[order]
+    if not len(x):
+        return {'x0': 0.0, 'x1': 0.0, 'n': 0, 'levels': []}
+
+    # Coarsest level first is decimated from the next finer one: its buckets
+    # are unions of the finer buckets, so it keeps the same extremes
+    n = len(x)
+    finest = max(0, math.ceil(math.log2(n / tile_points)))
+    kept = [np.arange(n)]
+    for k in range(finest - 1, -1, -1):
+        idx = kept[0]
+        kept.insert(0, idx[minmax_indices(x[idx], [y[idx]], 2 ** k * max(1, tile_points // 4))])
+    for k, idx in enumerate(kept):
+        if len(idx) * 2 > n:
+            kept = kept[:k] + [np.arange(n)]
+            break
+
+    x0, x1 = float(x[0]), float(x[-1])
+    levels = []
+    for k, idx in enumerate(kept):
+        edges = np.linspace(x0, x1, 2 ** k + 1)
+        parts = np.split(idx, np.searchsorted(x[idx], edges[1:-1], side='left'))
+        levels.append([encode_tile(x[p], y[p], x0) for p in parts])
+    return {'x0': x0, 'x1': x1, 'n': int(n), 'levels': levels}
+
+def build_report(title, panels, sections=(), subtitle='', x_label='Time (s)', tile_points=TILE_POINTS):
+    """HTML document for `panels` (interactive charts) followed by `sections`.
+
+    Each panel is a dict with 'title', optional 'unit' and 'series'; each
+    series a dict with 'label', 'x' and 'y' arrays and optional 'events'
+    ([(start, end, severity), ...] shaded on the chart). Each section is
+    (heading, text) and is shown preformatted.
+    """
+    data = {'title': title, 'x_label': x_label, 'panels': []}
+    color = 0
+    for panel in panels:
+        series_data = []
+        for series in panel['series']:
+            entry = series_levels(series['x'], series['y'], tile_points)
+            entry['label'] = series['label']
+            entry['color'] = series.get('color') or PALETTE[color % len(PALETTE)]
+            entry['events'] = [[float(s), float(e), str(sev)] for s, e, sev in series.get('events', [])]
+            color += 1
+            if entry['n']:
+                series_data.append(entry)
+        if series_data:
+            data['panels'].append({'title': panel['title'], 'unit': panel.get('unit', ''), 'series': series_data})
+
+    payload = json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
+    body = ''.join(f"<h2>{html.escape(heading)}</h2><pre>{html.escape(text)}</pre>" for heading, text in sections)
+    return (HTML_TEMPLATE
+            .replace('{{title}}', html.escape(title))
+            .replace('{{subtitle}}', html.escape(subtitle))
+            .replace('{{sections}}', body)
+            .replace('{{data}}', payload))
+
+def write_report(output_path, title, panels, sections=(), subtitle='', x_label='Time (s)'):
+    """Write the report (see build_report) atomically and return its size in bytes."""
+    document = build_report(title, panels, sections, subtitle, x_label)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    os.replace(tmp_path, output_path)
+    return os.path.getsize(output_path)
+
+HTML_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{title}}</title>
+<style>
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 24px; color: #222; background: #fafafa; }
+h1 { margin: 0 0 4px; font-size: 22px; }
+h2 { font-size: 16px; margin: 28px 0 8px; }
+.subtitle, .hint { color: #666; font-size: 13px; }
+.panel { background: #fff; border: 1px solid #ddd; border-radius: 6px; padding: 8px 12px; margin: 12px 0; }
+.panel-head { display: flex; justify-content: space-between; align-items: baseline; font-size: 14px; }
+.panel-title { font-weight: bold; }
+.legend span { margin-left: 12px; font-size: 12px; }
+.legend i { display: inline-block; width: 12px; height: 3px; margin-right: 4px; vertical-align: middle; }
+.readout { font-size: 12px; color: #444; min-height: 16px; font-variant-numeric: tabular-nums; }
+canvas { width: 100%; height: 220px; display: block; cursor: crosshair; }
+pre { background: #fff; border: 1px solid #ddd; border-radius: 6px; padding: 12px; overflow-x: auto; font-size: 12px; }
+</style>
+</head>
+<body>
+<h1>{{title}}</h1>
+<div class="subtitle">{{subtitle}}</div>
+<div class="hint">Scroll to zoom, drag to pan, double-click to reset. <span id="status"></span></div>
+<div id="panels"></div>
+{{sections}}
+<script type="application/json" id="report-data">{{data}}</script>
+<script>
+"use strict";
+const data = JSON.parse(document.getElementById('report-data').textContent);
+const statusLine = document.getElementById('status');
+const tiles = new Map();
+const pending = new Set();
+let full = [Infinity, -Infinity];
+for (const p of data.panels) for (const s of p.series) { full[0] = Math.min(full[0], s.x0); full[1] = Math.max(full[1], s.x1); }
+if (full[1] <= full[0]) full[1] = full[0] + 1;
+let view = full.slice();
+
+async function decode(b64, x0) {
+  const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+  const f = new Float32Array(await new Response(stream).arrayBuffer());
+  const n = f.length / 2, x = new Float64Array(n);
+  for (let i = 0; i < n; i++) x[i] = f[i] + x0;
+  return {x: x, y: f.subarray(n)};
+}
+
+function request(s, key, level, t) {
+  if (tiles.has(key) || pending.has(key)) return;
+  pending.add(key);
+  statusLine.textContent = 'loading detail...';
+  decode(s.levels[level][t], s.x0).then(tile => {
+    tiles.set(key, tile);
+    pending.delete(key);
+    if (!pending.size) statusLine.textContent = '';
+    schedule();
+  });
+}
+
+// Tiles of the finest ready level for the view; requests the wanted level's tiles
+function visibleTiles(s, pi, si) {
+  const span = (s.x1 - s.x0) || 1;
+  const wanted = Math.max(0, Math.min(s.levels.length - 1, Math.ceil(Math.log2(span / (view[1] - view[0])))));
+  for (let level = wanted; level >= 0; level--) {
+    const count = s.levels[level].length, width = span / count;
+    const first = Math.max(0, Math.floor((view[0] - s.x0) / width) - 1);
+    const last = Math.min(count - 1, Math.floor((view[1] - s.x0) / width) + 1);
+    const found = [];
+    for (let t = first; t <= last; t++) {
+      const key = pi + '/' + si + '/' + level + '/' + t;
+      if (tiles.has(key)) found.push(tiles.get(key));
+      else request(s, key, level, t);
+    }
+    if (found.length === last - first + 1) return found;
+  }
+  return [];
+}
+
+function niceTicks(lo, hi, count) {
+  const step0 = (hi - lo) / count, mag = Math.pow(10, Math.floor(Math.log10(step0)));
+  const step = [1, 2, 5, 10].map(m => m * mag).find(s => s >= step0);
+  const ticks = [];
+  for (let v = Math.ceil(lo / step) * step; v <= hi + step * 1e-9; v += step) ticks.push(+v.toFixed(10));
+  return ticks;
+}
+
+const charts = [];
+function drawPanel(chart) {
+  const {canvas, panel, pi} = chart;
+  const dpr = window.devicePixelRatio || 1;
+  const w = canvas.clientWidth, h = canvas.clientHeight;
+  canvas.width = w * dpr; canvas.height = h * dpr;
+  const ctx = canvas.getContext('2d');
+  ctx.scale(dpr, dpr);
+  ctx.clearRect(0, 0, w, h);
+  const left = 56, right = 8, top = 6, bottom = 22;
+  const pw = w - left - right, ph = h - top - bottom;
+
+  const drawn = panel.series.map((s, si) => visibleTiles(s, pi, si));
+  let lo = Infinity, hi = -Infinity;
+  drawn.forEach(ts => ts.forEach(t => {
+    for (let i = 0; i < t.x.length; i++) {
+      if (t.x[i] < view[0] || t.x[i] > view[1] || !isFinite(t.y[i])) continue;
+      lo = Math.min(lo, t.y[i]); hi = Math.max(hi, t.y[i]);
+    }
+  }));
+  if (!isFinite(lo)) { lo = 0; hi = 1; }
+  if (hi === lo) { lo -= 1; hi += 1; }
+  const pad = (hi - lo) * 0.05; lo -= pad; hi += pad;
+  const sx = v => left + (v - view[0]) / (view[1] - view[0]) * pw;
+  const sy = v => top + (hi - v) / (hi - lo) * ph;
+  chart.scale = {sx: sx, left: left, pw: pw, drawn: drawn};
+
+  ctx.font = '11px sans-serif'; ctx.fillStyle = '#666'; ctx.strokeStyle = '#eee'; ctx.lineWidth = 1;
+  ctx.textAlign = 'right'; ctx.textBaseline = 'middle';
+  for (const v of niceTicks(lo, hi, 5)) {
+    ctx.beginPath(); ctx.moveTo(left, sy(v)); ctx.lineTo(left + pw, sy(v)); ctx.stroke();
+    ctx.fillText(v.toLocaleString(), left - 4, sy(v));
+  }
+  ctx.textAlign = 'center'; ctx.textBaseline = 'top';
+  for (const v of niceTicks(view[0], view[1], 8)) {
+    ctx.beginPath(); ctx.moveTo(sx(v), top); ctx.lineTo(sx(v), top + ph); ctx.stroke();
+    ctx.fillText(v.toLocaleString(), sx(v), top + ph + 4);
+  }
+
+  ctx.save();
+  ctx.beginPath(); ctx.rect(left, top, pw, ph); ctx.clip();
+  const shade = {warning: 'rgba(243,156,18,0.2)', critical: 'rgba(231,76,60,0.2)'};
+  for (const s of panel.series) for (const [start, end, sev] of s.events) {
+    ctx.fillStyle = shade[sev] || 'rgba(0,0,0,0.1)';
+    ctx.fillRect(sx(start), top, Math.max(1, sx(end) - sx(start)), ph);
+  }
+  panel.series.forEach((s, si) => {
+    ctx.strokeStyle = s.color; ctx.lineWidth = 1.2; ctx.beginPath();
+    let pen = false;
+    for (const t of drawn[si]) for (let i = 0; i < t.x.length; i++) {
+      if (!isFinite(t.y[i])) { pen = false; continue; }
+      const px = sx(t.x[i]), py = sy(t.y[i]);
+      if (pen) ctx.lineTo(px, py); else ctx.moveTo(px, py);
+      pen = true;
+    }
+    ctx.stroke();
+  });
+  if (chart.cursor !== undefined) {
+    ctx.strokeStyle = '#999'; ctx.beginPath(); ctx.moveTo(chart.cursor, top); ctx.lineTo(chart.cursor, top + ph); ctx.stroke();
+  }
+  ctx.restore();
+  ctx.strokeStyle = '#ccc'; ctx.strokeRect(left, top, pw, ph);
+}
+
+let frame = null;
+function schedule() {
+  if (frame === null) frame = requestAnimationFrame(() => { frame = null; charts.forEach(drawPanel); });
+}
+
+function readout(chart, px) {
+  const {sx, left, pw, drawn} = chart.scale;
+  const x = view[0] + (px - left) / pw * (view[1] - view[0]);
+  const parts = chart.panel.series.map((s, si) => {
+    let best = null, dist = Infinity;
+    for (const t of drawn[si]) for (let i = 0; i < t.x.length; i++) {
+      const d = Math.abs(t.x[i] - x);
+      if (d < dist) { dist = d; best = t.y[i]; }
+    }
+    return best === null ? '' : s.label + ': ' + (+best.toFixed(2)).toLocaleString();
+  });
+  chart.readout.textContent = data.x_label + ' ' + (+x.toFixed(2)).toLocaleString() + '   ' + parts.join('   ');
+}
+
+function zoom(center, factor) {
+  let span = Math.min((view[1] - view[0]) * factor, full[1] - full[0]);
+  span = Math.max(span, (full[1] - full[0]) * 1e-6);
+  let lo = center - (center - view[0]) / (view[1] - view[0]) * span;
+  lo = Math.max(full[0], Math.min(lo, full[1] - span));
+  view = [lo, lo + span];
+  schedule();
+}
+
+const container = document.getElementById('panels');
+data.panels.forEach((panel, pi) => {
+  const div = document.createElement('div');
+  div.className = 'panel';
+  const legend = panel.series.map(s => '<span><i style="background:' + s.color + '"></i>' +
+    s.label.replace(/[&<>]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;'}[c])) + '</span>').join('');
+  div.innerHTML = '<div class="panel-head"><span class="panel-title"></span><span class="legend">' + legend +
+    '</span></div><canvas></canvas><div class="readout"></div>';
+  div.querySelector('.panel-title').textContent = panel.title + (panel.unit ? ' (' + panel.unit + ')' : '');
+  container.appendChild(div);
+  const chart = {canvas: div.querySelector('canvas'), readout: div.querySelector('.readout'), panel: panel, pi: pi};
+  charts.push(chart);
+
+  const c = chart.canvas;
+  let drag = null;
+  c.addEventListener('wheel', e => {
+    e.preventDefault();
+    const {left, pw} = chart.scale;
+    const center = view[0] + (e.offsetX - left) / pw * (view[1] - view[0]);
+    zoom(center, e.deltaY < 0 ? 1 / 1.25 : 1.25);
+  }, {passive: false});
+  c.addEventListener('mousedown', e => { drag = {x: e.clientX, view: view.slice()}; });
+  window.addEventListener('mouseup', () => { drag = null; });
+  window.addEventListener('mousemove', e => {
+    if (!drag) return;
+    const span = drag.view[1] - drag.view[0];
+    let lo = drag.view[0] - (e.clientX - drag.x) / chart.scale.pw * span;
+    lo = Math.max(full[0], Math.min(lo, full[1] - span));
+    view = [lo, lo + span];
+    schedule();
+  });
+  c.addEventListener('mousemove', e => { charts.forEach(ch => { ch.cursor = e.offsetX; }); readout(chart, e.offsetX); schedule(); });
+  c.addEventListener('mouseleave', () => { charts.forEach(ch => { ch.cursor = undefined; }); schedule(); });
+  c.addEventListener('dblclick', () => { view = full.slice(); schedule(); });
+});
+window.addEventListener('resize', schedule);
+
+if (typeof DecompressionStream === 'undefined') {
+  statusLine.textContent = 'This browser cannot decompress the embedded data (DecompressionStream is unavailable).';
+} else {
+  charts.forEach(ch => ch.panel.series.forEach((s, si) => request(s, ch.pi + '/' + si + '/0/0', 0, 0)));
+}
+</script>
+</body>
+</html>
+"""
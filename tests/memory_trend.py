@@ -0,0 +1,135 @@
+"""Robust memory growth trends for leak detection.
+
+A leak shows up as slow, steady growth, while loading a scene shows up as a
+step; averages hide the first and a plain regression line mistakes the
+second for it. Each series is split into segments at scene changes and at
+jumps much larger than its usual sample-to-sample change, and the steady
+growth rate is the Theil-Sen slope (median of pairwise slopes) using only
+pairs inside the same segment. Steps are reported separately, and the
+current level is projected forward at the steady rate to check a memory
+budget over the session length.
+"""
+
+import numpy as np
+
+# A jump counts as a step when it exceeds this many MADs of the sample-to-sample change...
+STEP_MADS = 8.0
+# ...and at least this many MB
+MIN_STEP_MB = 50.0
+
+# Steady growth at or above this rate (MB per minute) is reported as a suspected leak
+LEAK_MB_PER_MIN = 1.0
+
+# Theil-Sen is O(n^2) in pairs; longer series are strided down to this many points
+MAX_TREND_POINTS = 1500
+
+def theil_sen(t, y, segments=None):
+    """Median pairwise slope of y against t, optionally only over pairs within the same segment.
+
+    Returns (slope, intercept), with the intercept the median of y - slope * t;
+    NaNs if there are no usable pairs.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    i, j = np.triu_indices(len(t), 1)
+    if segments is not None:
+        same = np.asarray(segments)[i] == np.asarray(segments)[j]
+        i, j = i[same], j[same]
+    dt = t[j] - t[i]
+    usable = dt > 0
+    if not usable.any():
+        return float('nan'), float('nan')
+    slope = float(np.median((y[j][usable] - y[i][usable]) / dt[usable]))
+    return slope, float(np.median(y - slope * t))
+
+def step_boundaries(values, scenes=None, min_step=MIN_STEP_MB, mads=STEP_MADS):
+    """Boolean array marking samples that start a new segment (scene change or step jump)."""
+    y = np.asarray(values, dtype=np.float64)
+    boundaries = np.zeros(len(y), dtype=bool)
+    if len(y) < 2:
+        return boundaries
+
+    diff = np.diff(y)
+    mad = np.median(np.abs(diff - np.median(diff)))
+    boundaries[1:] = np.abs(diff) > max(min_step, mads * 1.4826 * mad)
+    if scenes is not None:
+        scenes = np.asarray(scenes)
+        boundaries[1:] |= scenes[1:] != scenes[:-1]
+    return boundaries
+
+def growth_trend(minutes, values, scenes=None, min_step=MIN_STEP_MB):
+    """Split one series into segments and measure steady growth and step changes.
+
+    Returns a dict with the overall rate (net change from the first sample
+    to the fitted end level, steps included) and the steady (within-segment)
+    slope in MB per minute, the number and total size of steps, the fitted
+    level at the last sample and the number of samples used; None for fewer
+    than three finite samples.
+    """
+    t = np.asarray(minutes, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    scenes = None if scenes is None else np.asarray(scenes)
+    ok = np.isfinite(t) & np.isfinite(y)
+    t, y = t[ok], y[ok]
+    scenes = None if scenes is None else scenes[ok]
+    if len(t) < 3:
+        return None
+
+    boundaries = step_boundaries(y, scenes, min_step)
+    segments = np.cumsum(boundaries)
+    starts = np.flatnonzero(boundaries)
+    steps = y[starts] - y[starts - 1]
+
+    # Stride long series; segment ids travel with the kept samples
+    keep = np.unique(np.linspace(0, len(t) - 1, min(len(t), MAX_TREND_POINTS)).astype(np.int64))
+    steady, _ = theil_sen(t[keep], y[keep], segments[keep])
+    if np.isnan(steady):
+        steady = 0.0
+
+    last = segments == segments[-1]
+    level_end = float(np.median(y[last] - steady * t[last]) + steady * t[-1])
+    elapsed = float(t[-1] - t[0])
+    return {
+        'overall_mb_per_min': (level_end - y[0]) / elapsed if elapsed > 0 else float('nan'),
+        'steady_mb_per_min': steady,
+        'steps': int(len(starts)),
+        'step_total_mb': float(steps.sum()),
+        'largest_step_mb': float(steps[np.argmax(np.abs(steps))]) if len(steps) else 0.0,
+        'start_mb': float(y[0]),
+        'level_end_mb': level_end,
+        'elapsed_min': elapsed,
+        'samples': int(len(t)),
+    }
+
+def project_growth(trend, session_minutes, budget=None, rising=True):
+    """Project a growth_trend to the end of a session of `session_minutes`.
+
+    Returns (projected level at the session end, minutes into the session at
+    which `budget` is crossed). The crossing is 0.0 if the level is already
+    past the budget, inf if the steady trend never reaches it, and NaN
+    without a budget. With rising=False the budget is a floor (e.g. free
+    memory).
+    """
+    if trend is None:
+        return float('nan'), float('nan')
+    slope = trend['steady_mb_per_min']
+    projected = trend['level_end_mb'] + slope * max(session_minutes - trend['elapsed_min'], 0.0)
+    if budget is None:
+        return projected, float('nan')
+
+    level = trend['level_end_mb']
+    if (level >= budget) if rising else (level <= budget):
+        return projected, 0.0
+    if (slope <= 0) if rising else (slope >= 0):
+        return projected, float('inf')
+    return projected, trend['elapsed_min'] + (budget - level) / slope
+
+def leak_suspected(trend, rate=LEAK_MB_PER_MIN, rising=True):
+    """True when a series' steady (step-free) growth is at least `rate` MB per minute.
+
+    With rising=False, shrinking at that rate counts instead (e.g. free memory).
+    """
+    if trend is None:
+        return False
+    steady = trend['steady_mb_per_min'] if rising else -trend['steady_mb_per_min']
+    return bool(steady >= rate)
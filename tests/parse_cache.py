@@ -0,0 +1,126 @@
+"""On-disk columnar cache for parsed performance logs.
+
+Shared by quest_analyzer.py and auto_plot_metrics.py. Each parsed run is stored
+as an uncompressed Feather (Arrow IPC) file named after the content hash of its
+source, so later runs memory-map it instead of re-parsing the text. A small JSON
+index entry per source file records its size, mtime and hash; the entry is
+reused while size and mtime match, and the hash decides when they do not.
+"""
+
+import hashlib
+import json
+import os
+
+# Default cache location, relative to the directory the scripts are run from
+DEFAULT_CACHE_DIR = '.perf_cache'
+
+_warned_no_arrow = False
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """Returns the BLAKE2b hex digest of a file's contents, read in chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _index_path(cache_dir, source_path, kind):
+    key = hashlib.sha1(f"{os.path.abspath(source_path)}|{kind}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, 'index', f"{key}.json")
+
+def _data_path(cache_dir, digest, kind):
+    return os.path.join(cache_dir, f"{digest}-{kind}.feather")
+
+def _write_json(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+def lookup(source_path, kind, cache_dir):
+    """Returns the index entry for a source file if its cached frame is still valid."""
+    index_path = _index_path(cache_dir, source_path, kind)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(source_path)
+    if stat.st_size != entry['size']:
+        return None
+    if stat.st_mtime_ns != entry['mtime_ns']:
+        # Touched but possibly unchanged: the content hash decides
+        if file_digest(source_path) != entry['digest']:
+            return None
+        entry['mtime_ns'] = stat.st_mtime_ns
+        _write_json(index_path, entry)
+
+    if not os.path.exists(_data_path(cache_dir, entry['digest'], kind)):
+        return None
+    return entry
+
+def read_frame(entry, kind, cache_dir, columns=None):
+    """Memory-maps a cached frame, optionally reading only some of its columns."""
+    from pyarrow import feather
+
+    if columns is not None:
+        columns = [c for c in entry['columns'] if c in set(columns)]
+    table = feather.read_table(_data_path(cache_dir, entry['digest'], kind),
+                               columns=columns, memory_map=True)
+    return table.to_pandas()
+
+def store(source_path, kind, cache_dir, df, extra=None):
+    """Writes a parsed frame to the cache and records it in the index."""
+    os.makedirs(os.path.join(cache_dir, 'index'), exist_ok=True)
+
+    stat = os.stat(source_path)
+    digest = file_digest(source_path)
+    data_path = _data_path(cache_dir, digest, kind)
+
+    tmp_path = data_path + '.tmp'
+    df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+    os.replace(tmp_path, data_path)
+
+    entry = {
+        'source': os.path.abspath(source_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'digest': digest,
+        'columns': list(df.columns),
+        'extra': extra or {},
+    }
+    _write_json(_index_path(cache_dir, source_path, kind), entry)
+    return entry
+
+def cached_parse(source_path, kind, parse_fn, cache_dir=DEFAULT_CACHE_DIR, columns=None):
+    """Loads a parsed frame from the cache, or parses and caches it.
+
+    `parse_fn(source_path)` must return `(df, extra)`, where `extra` is a
+    JSON-serialisable dict kept alongside the frame. A `None` frame is passed
+    through without being cached. `kind` names the parser and its version, so
+    changing a parser only needs a new kind string to invalidate old entries.
+    """
+    global _warned_no_arrow
+
+    if cache_dir is None or not os.path.exists(source_path):
+        return parse_fn(source_path)
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        if not _warned_no_arrow:
+            print("Note: pyarrow is not installed, parse cache disabled.")
+            _warned_no_arrow = True
+        return parse_fn(source_path)
+
+    entry = lookup(source_path, kind, cache_dir)
+    if entry is not None:
+        return read_frame(entry, kind, cache_dir, columns), entry['extra']
+
+    df, extra = parse_fn(source_path)
+    if df is not None:
+        store(source_path, kind, cache_dir, df, extra)
+        if columns is not None:
+            df = df[[c for c in df.columns if c in set(columns)]]
+    return df, extra
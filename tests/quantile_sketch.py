@@ -0,0 +1,249 @@
+"""Mergeable quantile sketches and histograms for performance metrics.
+
+Shared by run_catalog.py and quest_batch.py. Each run (or session) is
+summarised once, at ingestion, into a `QuantileSketch` and a fixed-bucket
+`Histogram` per metric. Both merge by adding bucket counts, so merging is
+associative and order-independent. A fleet-wide P1/P50/P99 over any subset
+of runs is therefore computed by folding stored sketches one at a time,
+without loading a single sample.
+
+`QuantileSketch` is a DDSketch: values fall into logarithmic buckets
+gamma^(i-1) < |x| <= gamma^i with gamma = (1 + a) / (1 - a), so every
+quantile it returns is within relative error `a` (1% by default) of a true
+sample value. Its size grows with the log of the value range, not the
+sample count (a few hundred buckets for FPS or GPU time).
+"""
+
+import math
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01
+
+# Values at or below this magnitude count as zero
+MIN_MAGNITUDE = 1e-9
+
+FLEET_QUANTILES = [0.01, 0.05, 0.5, 0.95, 0.99]
+
+# Metric: fixed histogram bucket edges, in the metric's units
+SKETCH_METRICS = {
+    'average_frame_rate': np.arange(0, 121, 2.0),
+    # Up to 66 ms: the counter saturates at 65,535 µs on heavy scenes
+    'app_gpu_time_microseconds': np.arange(0, 66001, 1000.0),
+    'battery_temperature_celcius': np.arange(20, 56, 1.0),
+    'FPS': np.arange(0, 121, 2.0),
+    'Temperature': np.arange(20, 56, 1.0),
+}
+
+class _Buckets:
+    """Dense bucket counts from index `offset` upwards."""
+
+    def __init__(self, offset=0, counts=None):
+        self.offset = offset
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def _extend(self, low, high):
+        if not len(self.counts):
+            self.offset, self.counts = low, np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_low, new_high = min(low, self.offset), max(high, self.offset + len(self.counts) - 1)
+        if new_low == self.offset and new_high == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        counts[self.offset - new_low:self.offset - new_low + len(self.counts)] = self.counts
+        self.offset, self.counts = new_low, counts
+
+    def add(self, indices, counts):
+        if not len(indices):
+            return
+        self._extend(int(indices[0]), int(indices[-1]))
+        self.counts[indices - self.offset] += counts
+
+    def merge(self, other):
+        if len(other.counts):
+            self.add(np.arange(other.offset, other.offset + len(other.counts)), other.counts)
+
+    def to_dict(self):
+        return {'offset': self.offset, 'counts': self.counts.tolist()}
+
+class QuantileSketch:
+    """Relative-error quantile sketch (DDSketch) with exact count, sum, min and max."""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = _Buckets()
+        self.negative = _Buckets()
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def add(self, values):
+        """Fold an array of values in; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+        for buckets, magnitudes in ((self.positive, values[values > MIN_MAGNITUDE]),
+                                    (self.negative, -values[values < -MIN_MAGNITUDE])):
+            indices, counts = np.unique(self._index(magnitudes), return_counts=True)
+            buckets.add(indices, counts)
+        self.zero += int((np.abs(values) <= MIN_MAGNITUDE).sum())
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch of the same accuracy in (in place)."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Estimate of the q-quantile (0..1), NaN for an empty sketch."""
+        if self.count == 0:
+            return float('nan')
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        negative = self.negative.counts[::-1]
+        for i, n in enumerate(negative):
+            seen += n
+            if seen > rank:
+                index = self.negative.offset + len(negative) - 1 - i
+                return min(max(-self._value(index), self.min), self.max)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        cumulative = seen + np.cumsum(self.positive.counts)
+        i = int(np.searchsorted(cumulative, rank, side='right'))
+        return min(max(self._value(self.positive.offset + i), self.min), self.max)
+
+    def quantiles(self, qs=FLEET_QUANTILES):
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else float('nan')
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': self.positive.to_dict(),
+            'negative': self.negative.to_dict(),
+            'zero': self.zero,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['relative_accuracy'])
+        sketch.positive = _Buckets(**data['positive'])
+        sketch.negative = _Buckets(**data['negative'])
+        sketch.zero, sketch.count, sketch.sum = data['zero'], data['count'], data['sum']
+        if sketch.count:
+            sketch.min, sketch.max = data['min'], data['max']
+        return sketch
+
+class Histogram:
+    """Counts per fixed bucket, plus one underflow and one overflow bucket.
+
+    Bucket i (1..len(edges)-1) holds edges[i-1] <= x < edges[i]; bucket 0
+    holds x < edges[0] and the last bucket x >= edges[-1].
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        self.counts += np.bincount(np.searchsorted(self.edges, values, side='right'), minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bucket edges.")
+        self.counts += other.counts
+        return self
+
+    def share_below(self, edge):
+        """Fraction of values below `edge`, which must be one of the bucket edges."""
+        position = np.flatnonzero(self.edges == edge)
+        if not len(position):
+            raise ValueError(f"{edge} is not a bucket edge.")
+        total = self.counts.sum()
+        return self.counts[:position[0] + 1].sum() / total if total else float('nan')
+
+    def to_dict(self):
+        return {'edges': self.edges.tolist(), 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['edges'])
+        histogram.counts = np.asarray(data['counts'], dtype=np.int64)
+        return histogram
+
+def metric_sketches(df, metrics=None):
+    """{metric: {'sketch': ..., 'histogram': ...}} as dicts, for the SKETCH_METRICS present in `df`."""
+    metrics = [m for m in (metrics or SKETCH_METRICS) if m in df.columns]
+    return {
+        metric: {
+            'sketch': QuantileSketch().add(df[metric].to_numpy(dtype=np.float64)).to_dict(),
+            'histogram': Histogram(SKETCH_METRICS[metric]).add(df[metric].to_numpy(dtype=np.float64)).to_dict(),
+        }
+        for metric in metrics
+    }
+
+def merge_stored(stored):
+    """Fold an iterable of metric_sketches() dicts into {metric: (QuantileSketch, Histogram)}.
+
+    Only one stored entry is held at a time, so memory stays constant in the
+    number of runs.
+    """
+    merged = {}
+    for entry in stored:
+        for metric, data in entry.items():
+            sketch = QuantileSketch.from_dict(data['sketch'])
+            histogram = Histogram.from_dict(data['histogram'])
+            if metric in merged:
+                merged[metric][0].merge(sketch)
+                merged[metric][1].merge(histogram)
+            else:
+                merged[metric] = (sketch, histogram)
+    return merged
+
+def format_fleet(merged, qs=FLEET_QUANTILES):
+    """Text table of count, mean, min/max and quantiles per merged metric."""
+    header = f"{'Metric':<30} {'Samples':>9} {'Mean':>9} {'Min':>9} " + \
+        ' '.join(f"{'P' + format(q * 100, 'g'):>9}" for q in qs) + f" {'Max':>9}"
+    lines = [header]
+    for metric, (sketch, _) in merged.items():
+        values = [sketch.mean, sketch.min, *sketch.quantiles(qs), sketch.max]
+        lines.append(f"{metric:<30} {sketch.count:>9} " + ' '.join(f"{v:>9.2f}" for v in values))
+    return '\n'.join(lines) + '\n'
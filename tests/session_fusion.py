@@ -0,0 +1,235 @@
+"""Time-aligned fusion of Quest logger output with OVR Metrics exports.
+
+The in-app logger (QuestPerformanceLogger.cs, parsed by `parse_quest_log`)
+and the OVR Metrics Tool record the same session on different clocks: the
+log has wall-clock times every few seconds, the export has milliseconds
+since its capture started, once a second. Both record the frame rate, so
+the clock offset is estimated by cross-correlating the two FPS series on a
+common one-second grid (all lags at once via FFT, Pearson-normalised over
+each lag's overlap). The export is then shifted onto the log's timeline and
+joined with `merge_asof`, so every OVR sample carries the scene name and
+spike count of the log sample that covers it.
+
+Usage:
+    python session_fusion.py QuestPerformanceLog.txt NormalGameRun1.csv -o fused.csv
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, 'Initial Testing'))
+sys.path.insert(0, os.path.join(TESTS_DIR, 'Final Testing using OVR Metrics Tool'))
+from quest_analyzer import parse_quest_log, CACHE_DIR
+from auto_plot_metrics import load_ovr_run
+
+# Offsets (s) searched either side of the hint
+DEFAULT_MAX_LAG_S = 600
+
+# Lags whose overlap is shorter than this (s), or than this fraction of the
+# shorter recording, are not considered
+MIN_OVERLAP_S = 30
+MIN_OVERLAP_FRACTION = 0.5
+
+# Below this FPS correlation the offset is reported as unreliable; flat FPS
+# traces carry little timing information, so pass --hint for those
+LOW_CORRELATION = 0.5
+
+# Log columns carried onto the OVR samples, and their names in the fused frame
+QUEST_COLUMNS = {
+    'Time': 'Quest_Time',
+    'Seconds': 'Quest_Seconds',
+    'Scene': 'Scene',
+    'FPS': 'Quest_FPS',
+    'Frame_Spikes': 'Frame_Spikes',
+    'Memory_Allocated': 'Memory_Allocated',
+    'Memory_Reserved': 'Memory_Reserved',
+    'Temperature': 'Quest_Temperature',
+}
+
+def grid_series(seconds, values, length, smooth=1):
+    """Bin samples onto a 1 s grid of `length` (mean per second, gaps interpolated inside the span).
+
+    Returns (series, mask) with mask False outside the sampled span. `smooth`
+    applies a centred moving average of that many seconds.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    ok = np.isfinite(seconds) & np.isfinite(values) & (seconds >= 0) & (seconds < length - 0.5)
+    bins = np.round(seconds[ok]).astype(np.int64)
+    values = values[ok]
+
+    sums = np.bincount(bins, weights=values, minlength=length)
+    counts = np.bincount(bins, minlength=length)
+    filled = np.flatnonzero(counts)
+    series = np.zeros(length)
+    mask = np.zeros(length, dtype=bool)
+    if len(filled) == 0:
+        return series, mask
+
+    span = np.arange(filled[0], filled[-1] + 1)
+    series[span] = np.interp(span, filled, sums[filled] / counts[filled])
+    mask[span] = True
+    if smooth > 1:
+        kernel = np.ones(int(smooth)) / int(smooth)
+        weight = np.convolve(mask.astype(np.float64), kernel, mode='same')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            series = np.where(mask, np.convolve(series, kernel, mode='same') / weight, 0.0)
+    return series, mask
+
+def _cross(x, y, n):
+    """c[k] = sum_i x[i + k] * y[i] for every circular lag k, via FFT of size n."""
+    return np.fft.irfft(np.fft.rfft(x, n) * np.conj(np.fft.rfft(y, n)), n)
+
+def estimate_offset(quest_seconds, quest_fps, ovr_seconds, ovr_fps, hint=0.0,
+                    max_lag=DEFAULT_MAX_LAG_S, min_overlap=MIN_OVERLAP_S):
+    """Clock offset (s) with quest_time = ovr_time + offset, from FPS cross-correlation.
+
+    Searches `hint` +/- `max_lag`; a short overlap can correlate well by
+    chance, so lags must also cover MIN_OVERLAP_FRACTION of the shorter
+    recording. The best lag is refined to sub-second precision with a
+    parabola through its neighbours. Returns (offset, correlation, overlap in
+    seconds); the offset is NaN if no lag qualifies.
+    """
+    quest_seconds = np.asarray(quest_seconds, dtype=np.float64)
+    ovr_seconds = np.asarray(ovr_seconds, dtype=np.float64) + hint
+
+    # Shift both onto a shared non-negative grid
+    origin = min(np.nanmin(quest_seconds), np.nanmin(ovr_seconds)) - max_lag
+    length = int(np.ceil(max(np.nanmax(quest_seconds), np.nanmax(ovr_seconds)) - origin + max_lag)) + 1
+    interval = np.median(np.diff(quest_seconds)) if len(quest_seconds) > 1 else 1.0
+    q, qm = grid_series(quest_seconds - origin, quest_fps, length)
+    o, om = grid_series(ovr_seconds - origin, ovr_fps, length, smooth=max(1, round(interval)))
+
+    # Pearson correlation over each lag's overlap, every term from one FFT product
+    n = 2 * length
+    qm_f, om_f = qm.astype(np.float64), om.astype(np.float64)
+    overlap = np.round(_cross(qm_f, om_f, n))
+    sum_q = _cross(q, om_f, n)
+    sum_o = _cross(qm_f, o, n)
+    sum_qq = _cross(q * q, om_f, n)
+    sum_oo = _cross(qm_f, o * o, n)
+    sum_qo = _cross(q, o, n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = overlap * sum_qo - sum_q * sum_o
+        var = (overlap * sum_qq - sum_q ** 2) * (overlap * sum_oo - sum_o ** 2)
+        corr = cov / np.sqrt(var)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    candidates = corr[lags % n]
+    min_overlap = max(min_overlap, MIN_OVERLAP_FRACTION * min(qm.sum(), om.sum()))
+    candidates[(overlap[lags % n] < min_overlap) | ~np.isfinite(candidates)] = -np.inf
+    if not np.isfinite(candidates).any():
+        return float('nan'), float('nan'), 0
+    best = int(np.argmax(candidates))
+
+    shift = 0.0
+    if 0 < best < len(lags) - 1 and np.isfinite(candidates[best - 1:best + 2]).all():
+        left, peak, right = candidates[best - 1:best + 2]
+        curvature = left - 2 * peak + right
+        if curvature < 0:
+            shift = 0.5 * (left - right) / curvature
+    return float(hint + lags[best] + shift), float(candidates[best]), int(overlap[lags[best] % n])
+
+def fuse(quest_df, ovr_df, offset, direction='forward', tolerance=None):
+    """Join log samples onto OVR samples shifted by `offset` seconds.
+
+    'forward' pairs each OVR sample with the next log sample, the one whose
+    counters cover it (the logger reports spikes since its previous line).
+    `tolerance` (s) defaults to twice the log interval; OVR samples with no
+    log sample that close get NaN.
+    """
+    quest = quest_df[[c for c in QUEST_COLUMNS if c in quest_df.columns]].rename(columns=QUEST_COLUMNS)
+    quest = quest.sort_values('Quest_Seconds', kind='stable')
+    if tolerance is None:
+        tolerance = 2 * float(np.median(np.diff(quest['Quest_Seconds']))) if len(quest) > 1 else 1.0
+
+    ovr = ovr_df.copy()
+    ovr['Aligned_Seconds'] = ovr['Time Stamp'].to_numpy(dtype=np.float64) / 1000 + offset
+    ovr = ovr.sort_values('Aligned_Seconds', kind='stable')
+
+    fused = pd.merge_asof(ovr, quest, left_on='Aligned_Seconds', right_on='Quest_Seconds',
+                          direction=direction, tolerance=tolerance)
+    fused.attrs['clock_offset_s'] = offset
+    return fused
+
+def fuse_session(quest_path, ovr_path, hint=0.0, max_lag=DEFAULT_MAX_LAG_S, cache_dir=CACHE_DIR):
+    """Parse one log/export pair, estimate their offset and return the fused frame and alignment stats."""
+    quest_df, _ = parse_quest_log(quest_path, cache_dir)
+    if quest_df is None:
+        raise ValueError(f"No samples in Quest log '{quest_path}'.")
+    ovr_df = load_ovr_run(ovr_path, cache_dir=cache_dir)
+
+    offset, correlation, overlap = estimate_offset(
+        quest_df['Seconds'], quest_df['FPS'],
+        ovr_df['Time Stamp'] / 1000, ovr_df['average_frame_rate'], hint, max_lag)
+    if np.isnan(offset):
+        raise ValueError(f"'{os.path.basename(quest_path)}' and '{os.path.basename(ovr_path)}' do not overlap.")
+
+    fused = fuse(quest_df, ovr_df, offset)
+    stats = {
+        'quest_log': os.path.basename(quest_path),
+        'ovr_file': os.path.basename(ovr_path),
+        'offset_s': offset,
+        'correlation': correlation,
+        'overlap_s': overlap,
+        'matched_pct': fused['Scene'].notna().mean() * 100,
+    }
+    return fused, stats
+
+def fuse_sessions(pairs, max_lag=DEFAULT_MAX_LAG_S, cache_dir=CACHE_DIR):
+    """Fuse many (quest_log, ovr_export) pairs into one frame plus a per-pair alignment table."""
+    frames, rows = [], []
+    for quest_path, ovr_path in pairs:
+        try:
+            fused, stats = fuse_session(quest_path, ovr_path, max_lag=max_lag, cache_dir=cache_dir)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {quest_path} + {ovr_path}: {e}")
+            continue
+        fused.insert(0, 'Pair', len(rows))
+        frames.append(fused)
+        rows.append(stats)
+    if not frames:
+        raise ValueError("No session pairs could be fused.")
+    return pd.concat(frames, ignore_index=True), pd.DataFrame(rows)
+
+def gpu_time_by_scene(fused):
+    """App GPU time and spike counts per scene from a fused frame."""
+    return fused.dropna(subset=['Scene']).groupby('Scene').agg(
+        samples=('Aligned_Seconds', 'size'),
+        ovr_fps_mean=('average_frame_rate', 'mean'),
+        gpu_time_mean_us=('app_gpu_time_microseconds', 'mean'),
+        gpu_time_p95_us=('app_gpu_time_microseconds', lambda v: v.quantile(0.95)),
+        spikes_mean=('Frame_Spikes', 'mean'),
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Align a Quest performance log with an OVR Metrics export.")
+    parser.add_argument('quest_log')
+    parser.add_argument('ovr_csv')
+    parser.add_argument('-o', '--output', default='fused_session.csv', help="fused frame (.csv or .parquet)")
+    parser.add_argument('--hint', type=float, default=0.0,
+                        help="approximate offset (s) of the log clock relative to the export")
+    parser.add_argument('--max-lag', type=int, default=DEFAULT_MAX_LAG_S,
+                        help="search this many seconds either side of --hint")
+    args = parser.parse_args()
+
+    try:
+        fused, stats = fuse_session(args.quest_log, args.ovr_csv, args.hint, args.max_lag)
+        print(f"Clock offset: {stats['offset_s']:+.0f} s (FPS correlation {stats['correlation']:.2f} "
+              f"over {stats['overlap_s']} s)")
+        if stats['correlation'] < LOW_CORRELATION:
+            print("Warning: weak FPS correlation, the offset may be wrong; try --hint with a rough offset.")
+        print(f"OVR samples matched to a log sample: {stats['matched_pct']:.1f}%\n")
+        print(gpu_time_by_scene(fused).to_string(float_format="%.2f"))
+        if args.output.endswith('.parquet'):
+            fused.to_parquet(args.output, index=False)
+        else:
+            fused.to_csv(args.output, index=False)
+        print(f"\nFused frame saved to: {args.output}")
+    except (OSError, ValueError) as e:
+        print(f"\nFATAL ERROR: {e}")
@@ -0,0 +1,187 @@
+"""Stage-level timing and memory instrumentation for the analysis scripts.
+
+Shared by quest_analyzer.py, auto_plot_metrics.py and benchmark_pipeline.py.
+A `StageProfiler` times named stages (wall and CPU), records each stage's
+peak traced allocation (tracemalloc) and peak-RSS growth, and can keep a
+cProfile dump per top-level stage. Stages nest; the breakdown is written as
+JSON or as a Chrome trace-event file (open in chrome://tracing or Perfetto).
+
+Library code marks its stages with the module-level `stage(name)`, which
+records into the active profiler and costs nothing when none is active:
+
+    profiler = StageProfiler(pstats_dir='profiles')
+    with profiler.activate():
+        with stage('parse'):
+            ...
+
+Work done in worker processes is only seen as wall time of the stage that
+waits for it.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import cProfile
+import tracemalloc
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active = None
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (MB), or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def stage(name):
+    """Context manager recording `name` as a stage of the active profiler, if any."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
+
+class StageProfiler:
+    """Collects nested stage timings, allocation peaks and optional cProfile dumps."""
+
+    def __init__(self, trace_memory=True, pstats_dir=None):
+        self.trace_memory = trace_memory
+        self.pstats_dir = pstats_dir
+        self.stages = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the profiler `stage()` records into, tracing allocations meanwhile."""
+        global _active
+        previous, _active = _active, self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        try:
+            yield self
+        finally:
+            _active = previous
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def _fold_peak(self):
+        """Credit the allocation peak since the last reset to every open stage, then reset it."""
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame['peak'] = max(frame['peak'], peak)
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time one stage. Stages opened inside it are recorded as its children."""
+        self._fold_peak()
+        tracing = tracemalloc.is_tracing()
+        frame = {
+            'name': name,
+            'depth': len(self._stack),
+            'peak': 0,
+            'start_alloc': tracemalloc.get_traced_memory()[0] if tracing else 0,
+        }
+        self._stack.append(frame)
+
+        # cProfile cannot nest, so only top-level stages get a dump
+        profile = None
+        if self.pstats_dir and frame['depth'] == 0:
+            profile = cProfile.Profile()
+
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            wall_end, cpu_end = time.perf_counter(), time.process_time()
+            rss_after = peak_rss_mb()
+            self._fold_peak()
+            self._stack.pop()
+
+            record = {
+                'name': name,
+                'depth': frame['depth'],
+                'start_s': wall - self._origin,
+                'wall_s': wall_end - wall,
+                'cpu_s': cpu_end - cpu,
+                'peak_alloc_mb': (frame['peak'] - frame['start_alloc']) / (1024 * 1024) if tracing else None,
+                'peak_rss_growth_mb': None if rss_before is None else rss_after - rss_before,
+            }
+            if profile:
+                record['pstats'] = self._dump(profile, name)
+            self.stages.append(record)
+
+    def _dump(self, profile, name):
+        os.makedirs(self.pstats_dir, exist_ok=True)
+        slug = re.sub(r'[^\w.-]+', '_', name).strip('_') or 'stage'
+        index = sum(1 for s in self.stages if s['depth'] == 0) + 1
+        path = os.path.join(self.pstats_dir, f"{index:02d}_{slug}.pstats")
+        profile.dump_stats(path)
+        return path
+
+    def records(self):
+        """Stage records in start order."""
+        return sorted(self.stages, key=lambda s: s['start_s'])
+
+    def to_json(self, path, **metadata):
+        """Write the stage breakdown (plus any `metadata` fields) as JSON."""
+        payload = {**metadata, 'stages': self.records()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+
+    def to_chrome_trace(self, path):
+        """Write the stages as Chrome trace 'complete' events (microseconds)."""
+        pid = os.getpid()
+        events = []
+        for record in self.records():
+            args = {k: record[k] for k in ('cpu_s', 'peak_alloc_mb', 'peak_rss_growth_mb') if record[k] is not None}
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'ts': record['start_s'] * 1e6,
+                'dur': record['wall_s'] * 1e6,
+                'pid': pid,
+                'tid': 0,
+                'args': args,
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def format_table(self):
+        """Indented text table of the stages."""
+        lines = [f"{'Stage':<40} {'Wall (s)':>9} {'CPU (s)':>9} {'Peak alloc (MB)':>16}"]
+        for record in self.records():
+            name = '  ' * record['depth'] + record['name']
+            alloc = '-' if record['peak_alloc_mb'] is None else f"{record['peak_alloc_mb']:.1f}"
+            lines.append(f"{name:<40} {record['wall_s']:>9.3f} {record['cpu_s']:>9.3f} {alloc:>16}")
+        return "\n".join(lines)
+
+    def write(self, output_prefix, chrome_trace=False, **metadata):
+        """Write <prefix>.json (and <prefix>.trace.json) and return the paths written."""
+        directory = os.path.dirname(output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = [output_prefix + '.json']
+        self.to_json(paths[0], **metadata)
+        if chrome_trace:
+            paths.append(output_prefix + '.trace.json')
+            self.to_chrome_trace(paths[1])
+        return paths
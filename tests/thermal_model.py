@@ -0,0 +1,197 @@
+"""Thermal and battery projection for fixed-length sessions.
+
+Battery level is fitted with least squares over every sample rather than from
+the first and last reading, so integer-quantised levels and a noisy start do
+not dominate the drain rate. Temperature is fitted with Newton's law of
+heating, T(t) = T_eq - (T_eq - T_0) * exp(-t / tau), by scanning tau on a
+log grid and solving the two linear parameters in closed form for every tau
+at once; a straight line is kept when it fits better (no plateau in sight).
+Both fits project how long a session can run before the battery empties or
+the temperature reaches a limit.
+
+Throttling events are drops in a clock or performance level while the
+device is hot.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default session length and limits
+SESSION_MINUTES = 45.0
+THERMAL_LIMIT_C = 40.0
+BATTERY_EMPTY_PCT = 0.0
+
+# Level drops at or above this temperature count as thermal throttling
+THROTTLE_TEMP_C = 38.0
+
+# Heating time constants (minutes) scanned by fit_heating
+TAU_GRID = np.geomspace(0.5, 600.0, 80)
+
+def fit_linear(minutes, values):
+    """Least-squares line through (minutes, values), ignoring NaNs.
+
+    Returns a dict with slope (per minute), intercept, r2 and n, or None with
+    fewer than two distinct times.
+    """
+    t = np.asarray(minutes, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    ok = np.isfinite(t) & np.isfinite(y)
+    t, y = t[ok], y[ok]
+    if len(t) < 2 or np.ptp(t) == 0:
+        return None
+
+    slope, intercept = np.polyfit(t, y, 1)
+    residual = y - (slope * t + intercept)
+    total = ((y - y.mean()) ** 2).sum()
+    return {
+        'slope': float(slope),
+        'intercept': float(intercept),
+        'r2': float(1 - (residual ** 2).sum() / total) if total > 0 else float('nan'),
+        'sse': float((residual ** 2).sum()),
+        'n': int(len(t)),
+    }
+
+def fit_heating(minutes, temps, taus=TAU_GRID):
+    """Fit T(t) = T_eq + b * exp(-t / tau) over the whole series.
+
+    Returns a dict with model ('newton' or 'linear'), equilibrium (T_eq, or
+    NaN for a line, which has no plateau), tau, the linear fit's slope and
+    r2, or None if there is too little data.
+    """
+    t = np.asarray(minutes, dtype=np.float64)
+    y = np.asarray(temps, dtype=np.float64)
+    ok = np.isfinite(t) & np.isfinite(y)
+    t, y = t[ok], y[ok]
+    if len(t):
+        t = t - t.min()
+    line = fit_linear(t, y)
+    if line is None:
+        return None
+
+    # For every tau the model is linear in (T_eq, b): solve all of them at once
+    x = np.exp(-t[None, :] / np.asarray(taus)[:, None])
+    x_mean = x.mean(axis=1, keepdims=True)
+    x_var = ((x - x_mean) ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b = ((x - x_mean) * (y - y.mean())).sum(axis=1) / x_var
+    a = y.mean() - b * x_mean[:, 0]
+    sse = ((y[None, :] - (a[:, None] + b[:, None] * x)) ** 2).sum(axis=1)
+    sse[~np.isfinite(sse) | (x_var < 1e-12)] = np.inf
+
+    result = {'linear_slope': line['slope'], 'linear_intercept': line['intercept'], 'r2': line['r2'],
+              'start': float(line['intercept'])}
+    best = int(np.argmin(sse))
+    # A heating curve must rise towards a plateau (b < 0) and beat the line
+    if np.isfinite(sse[best]) and b[best] < 0 and sse[best] < line['sse']:
+        total = ((y - y.mean()) ** 2).sum()
+        result.update(model='newton', equilibrium=float(a[best]), tau=float(taus[best]),
+                      start=float(a[best] + b[best]),
+                      r2=float(1 - sse[best] / total) if total > 0 else float('nan'))
+    else:
+        result.update(model='linear', tau=float('nan'), equilibrium=float('nan'))
+    return result
+
+def minutes_to_line_limit(fit, limit, rising=True):
+    """Minutes from t=0 until a fit_linear line crosses `limit` (0.0 if already past, inf if never)."""
+    if fit is None:
+        return float('nan')
+    start, slope = fit['intercept'], fit['slope']
+    if (start >= limit) if rising else (start <= limit):
+        return 0.0
+    if (slope <= 0) if rising else (slope >= 0):
+        return float('inf')
+    return (limit - start) / slope
+
+def minutes_to_heat_limit(fit, limit):
+    """Minutes from t=0 until a fit_heating curve reaches `limit` (0.0 if already past, inf if never)."""
+    if fit is None:
+        return float('nan')
+    if fit['start'] >= limit:
+        return 0.0
+    if fit['model'] == 'linear':
+        slope = fit['linear_slope']
+        return (limit - fit['start']) / slope if slope > 0 else float('inf')
+    if fit['equilibrium'] <= limit:
+        return float('inf')
+    return float(-fit['tau'] * np.log((fit['equilibrium'] - limit) / (fit['equilibrium'] - fit['start'])))
+
+def project_session(minutes, battery, temps, session_minutes=SESSION_MINUTES,
+                    thermal_limit=THERMAL_LIMIT_C, battery_empty=BATTERY_EMPTY_PCT):
+    """Fit battery and temperature over one run and project a session of `session_minutes`.
+
+    Times are counted from the run's first sample. Returns a dict with the
+    fitted drain (% per minute), temperature model, projected battery and
+    temperature at the end of the session, minutes until empty and until the
+    thermal limit, and whether the session survives.
+    """
+    t = np.asarray(minutes, dtype=np.float64)
+    t = t - np.nanmin(t)
+    battery_fit = fit_linear(t, battery)
+    heat_fit = fit_heating(t, temps)
+
+    to_empty = minutes_to_line_limit(battery_fit, battery_empty, rising=False)
+    to_limit = minutes_to_heat_limit(heat_fit, thermal_limit)
+    projection = {
+        'drain_pct_per_min': -battery_fit['slope'] if battery_fit else float('nan'),
+        'battery_fit_r2': battery_fit['r2'] if battery_fit else float('nan'),
+        'battery_at_end': (battery_fit['intercept'] + battery_fit['slope'] * session_minutes)
+        if battery_fit else float('nan'),
+        'minutes_to_empty': to_empty,
+        'temp_model': heat_fit['model'] if heat_fit else None,
+        'temp_rise_per_min': heat_fit['linear_slope'] if heat_fit else float('nan'),
+        'temp_equilibrium': heat_fit['equilibrium'] if heat_fit else float('nan'),
+        'temp_tau_min': heat_fit['tau'] if heat_fit else float('nan'),
+        'temp_fit_r2': heat_fit['r2'] if heat_fit else float('nan'),
+        'minutes_to_thermal_limit': to_limit,
+    }
+    if heat_fit and heat_fit['model'] == 'newton':
+        projection['temp_at_end'] = float(heat_fit['equilibrium'] - (heat_fit['equilibrium'] - heat_fit['start'])
+                                          * np.exp(-session_minutes / heat_fit['tau']))
+    elif heat_fit:
+        projection['temp_at_end'] = heat_fit['start'] + heat_fit['linear_slope'] * session_minutes
+    else:
+        projection['temp_at_end'] = float('nan')
+
+    known = [m for m in (to_empty, to_limit) if not np.isnan(m)]
+    first = min(known) if known else float('nan')
+    projection['limited_by'] = None
+    if np.isfinite(first):
+        projection['limited_by'] = 'battery' if first == to_empty else 'thermal'
+    projection['survives'] = bool(first >= session_minutes) if known else None
+    return projection
+
+def throttle_events(df, level_cols, temp_col, time_col, group_col=None, hot_temp=THROTTLE_TEMP_C):
+    """One row per drop in any of `level_cols` (clock levels or frequencies).
+
+    Returns the group (if any), time, signal, the value before and after the
+    drop, the temperature at the drop and whether it was thermal (at or
+    above `hot_temp`).
+    """
+    events = []
+    keys = df[group_col] if group_col else pd.Series(0, index=df.index)
+    for column in level_cols:
+        if column not in df.columns:
+            continue
+        values = df[column].astype(np.float64)
+        previous = values.groupby(keys, observed=True).shift()
+        dropped = values < previous
+        if not dropped.any():
+            continue
+        hits = df.loc[dropped]
+        event = pd.DataFrame({
+            'time': hits[time_col].to_numpy(),
+            'signal': column,
+            'before': previous[dropped].to_numpy(),
+            'after': values[dropped].to_numpy(),
+            'temperature': hits[temp_col].to_numpy(dtype=np.float64) if temp_col in df.columns else np.nan,
+        })
+        if group_col:
+            event.insert(0, group_col, hits[group_col].to_numpy())
+        events.append(event)
+
+    columns = ([group_col] if group_col else []) + ['time', 'signal', 'before', 'after', 'temperature', 'thermal']
+    if not events:
+        return pd.DataFrame(columns=columns)
+    events = pd.concat(events, ignore_index=True)
+    events['thermal'] = events['temperature'] >= hot_temp
+    return events.sort_values(([group_col] if group_col else []) + ['time'], kind='stable').reset_index(drop=True)